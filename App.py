@@ -1,18 +1,38 @@
+import os
+import time
+
+# Marca de inicio del script para medir el tiempo hasta el primer render
+_inicio_script = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
-from pulp import *
+import numpy as np
 from io import BytesIO
-import time
-import matplotlib
+
+import optimizacion
+import perfiles
+
+# NOTA: pulp, plotly, matplotlib (usado por background_gradient) y el escritor de
+# Excel se importan de forma diferida, solo cuando se necesitan, para que el
+# arranque de cada sesión no pague el costo de cargar el solver y las gráficas.
 
 # Configuración de la página
 st.set_page_config(page_title="Modelo de Sacrificio de Reses", layout="wide")
 st.title("Optimización de Sacrificio de Reses")
 
+# Tablas con más celdas que este límite se envían al navegador sin Styler:
+# el HTML de estilos por celda es lo que más tarda en tablas semanales anchas.
+LIMITE_CELDAS_ESTILO = 20000
+
+# Vista previa de los datos: solo la página visible se envía al editor
+FILAS_POR_PAGINA = (50, 100, 500)
+COLUMNAS_FILTRO = ('ZONA', 'PLANTA', 'SEMANA')
+
 def aplicar_estilos_financiera(df):
     """
     Aplica estilos condicionales a la tabla financiera.
-    CORRECCIÓN: Devuelve un DataFrame de estilos compatible con axis=None.
+    Devuelve un DataFrame de estilos compatible con axis=None, calculado con
+    máscaras por fila (sin iterar celda por celda).
     """
     # 1. Crear un DataFrame de estilos vacío con la misma estructura que df
     styles = pd.DataFrame('', index=df.index, columns=df.columns)
@@ -21,35 +41,46 @@ def aplicar_estilos_financiera(df):
     if 'Concepto' not in df.columns or df.empty:
         return styles
 
-    # 2. Iterar sobre las filas para aplicar lógica
-    for idx, row in df.iterrows():
-        # Convertimos a string para evitar errores si hay valores nulos
-        concepto = str(row['Concepto'])
-        estilo_fila = ''
-        
-        # Determinar el estilo base según el texto en 'Concepto'
-        if 'SUBTOTAL' in concepto:
-            estilo_fila = 'font-weight: bold; background-color: #f0f0f0; color: black'
-        elif 'Costo' in concepto and 'Ingreso' not in concepto:
-            estilo_fila = 'color: #d62728'  # Rojo
-        elif 'Ingreso' in concepto:
-            estilo_fila = 'color: #2ca02c'  # Verde
-            
-        # Aplicar el estilo a toda la fila
-        if estilo_fila:
-            styles.loc[idx, :] = estilo_fila
-            
-        # Refinar: añadir negrita extra solo a la celda del título 'Concepto' si es Costo o Ingreso
-        if ('Costo' in concepto or 'Ingreso' in concepto) and 'SUBTOTAL' not in concepto:
-            styles.loc[idx, 'Concepto'] = f"{estilo_fila}; font-weight: bold"
+    # 2. Máscaras según el texto en 'Concepto' (convertido a string por si hay nulos)
+    concepto = df['Concepto'].astype(str)
+    es_subtotal = concepto.str.contains('SUBTOTAL', regex=False)
+    es_ingreso = concepto.str.contains('Ingreso', regex=False)
+    es_costo = concepto.str.contains('Costo', regex=False)
+
+    # Determinar el estilo base de cada fila
+    estilo_fila = pd.Series(np.select(
+        [es_subtotal, es_costo & ~es_ingreso, es_ingreso],
+        ['font-weight: bold; background-color: #f0f0f0; color: black',
+         'color: #d62728',   # Rojo
+         'color: #2ca02c'],  # Verde
+        default=''
+    ), index=df.index)
+
+    # Aplicar el estilo a toda la fila
+    styles[:] = np.repeat(estilo_fila.to_numpy()[:, None], len(df.columns), axis=1)
+
+    # Refinar: añadir negrita extra solo a la celda del título 'Concepto' si es Costo o Ingreso
+    refinar = (es_costo | es_ingreso) & ~es_subtotal
+    styles.loc[refinar, 'Concepto'] = estilo_fila[refinar] + '; font-weight: bold'
 
     return styles
 
+def mostrar_styler(styler, **kwargs):
+    """
+    Muestra un Styler con st.dataframe. Si la tabla supera LIMITE_CELDAS_ESTILO
+    se muestran los datos sin estilos para no enviar HTML enorme al navegador.
+    """
+    if styler.data.size > LIMITE_CELDAS_ESTILO:
+        st.caption(f"Tabla de {styler.data.shape[0]:,} filas: se muestra sin formato para agilizar la carga.")
+        st.dataframe(styler.data, **kwargs)
+    else:
+        st.dataframe(styler, **kwargs)
+
 def mostrar_dataframe_con_estilos(df, height=400):
     """Muestra un DataFrame con estilos aplicados y maneja errores."""
     try:
         # Aplicamos la función de estilos
-        st.dataframe(
+        mostrar_styler(
             df.style.apply(aplicar_estilos_financiera, axis=None),
             use_container_width=True, 
             height=height
@@ -62,193 +93,621 @@ def mostrar_dataframe_con_estilos(df, height=400):
 # --- FIN BLOQUE DE ESTILOS ---
 
 # Función para cargar y procesar el archivo Excel
+# (cacheada por contenido del archivo: los reruns no vuelven a leer el libro)
+@st.cache_data(show_spinner="Leyendo archivo Excel...")
 def procesar_archivo(uploaded_file):
     try:
-        excel_data = pd.ExcelFile(uploaded_file)
-        dfs = {}
-        
-        for sheet_name in excel_data.sheet_names:
-            dfs[sheet_name] = pd.read_excel(excel_data, sheet_name=sheet_name)
-        
-        return dfs
+        return optimizacion.leer_libro(uploaded_file)
     except Exception as e:
         st.error(f"Error al leer el archivo Excel: {str(e)}")
         return None
 
-# Función para crear diccionarios de parámetros
-def crear_diccionario(df, columnas_clave, columna_valor):
-    diccionario = {}
-    for index, row in df.iterrows():
-        if len(columnas_clave) == 1:
-            clave = row[columnas_clave[0]]
+# Plan de una corrida anterior para re-planificar el horizonte móvil
+@st.cache_data(show_spinner="Leyendo plan anterior...")
+def procesar_plan_anterior(archivo_plan):
+    from horizonte import leer_plan
+    try:
+        return leer_plan(archivo_plan)
+    except Exception as e:
+        st.error(f"Error al leer el plan anterior: {str(e)}")
+        return None
+
+# Planificador de soluciones compartido por todas las sesiones del servidor.
+# MAX_SOLUCIONES_SIMULTANEAS limita las soluciones en paralelo (por defecto, una
+# por cada dos núcleos)
+@st.cache_resource
+def obtener_planificador():
+    from planificador import PlanificadorSolver
+    return PlanificadorSolver(max_simultaneos=int(os.environ.get('MAX_SOLUCIONES_SIMULTANEAS', 0)) or None)
+
+# Soluciones por semana compartidas entre sesiones: tras editar una semana solo
+# se vuelve a resolver esa semana
+@st.cache_resource
+def obtener_cache_semanas():
+    return optimizacion.CacheSemanas()
+
+# URL del servicio de solución (servicio.py). Si está definida, la app actúa como
+# cliente ligero: envía las hojas al servicio en lugar de lanzar el solver aquí
+URL_SERVICIO = os.environ.get('SERVICIO_MODELO_URL')
+
+# Función principal del modelo (el núcleo está en optimizacion.py; aquí solo se
+# muestran los errores en la interfaz)
+def ejecutar_modelo(inputs_opt_res, valor_kg, portafolio=False, sensibilidad=False, perfil='interactivo',
+                    grupos_zonas=None, plan_anterior=None, semanas_fijas=None, arranque_heuristico=None):
+    if URL_SERVICIO:
+        return ejecutar_en_servicio(inputs_opt_res, valor_kg, portafolio, sensibilidad, perfil, grupos_zonas,
+                                    plan_anterior, semanas_fijas, arranque_heuristico)
+
+    aviso = st.empty()
+    def al_esperar(posicion):
+        if posicion:
+            aviso.info(f"Esperando turno del solver (posición {posicion} en la cola)...")
         else:
-            clave = tuple(row[col] for col in columnas_clave)
-        valor = row[columna_valor]
-        diccionario[clave] = valor
-    return diccionario
+            aviso.info("Otra sesión está resolviendo los mismos datos; esperando su resultado...")
 
-# Función principal del modelo
-def ejecutar_modelo(inputs_opt_res, valor_kg):
     try:
-        # Definición de conjuntos
-        Zona = list(set(inputs_opt_res['Oferta']['ZONA']))
-        Planta_S = list(set(inputs_opt_res['CV_PDN']['PLANTA']))
-        Semana = list(set(inputs_opt_res['Demanda']['SEMANA']))
-
-        # Definición de parámetros
-        Demanda = crear_diccionario(inputs_opt_res['Demanda'], ['SEMANA'], 'DEMANDA')
-        Oferta_Int = crear_diccionario(inputs_opt_res['Oferta'], ['ZONA','SEMANA'], 'OFERTA')
-        Oferta_Com = crear_diccionario(inputs_opt_res['Compras'], ['ZONA','SEMANA'], 'DISPONIBLE')
-        Costo_Sac = crear_diccionario(inputs_opt_res['CV_PDN'], ['PLANTA'], 'CV_PDN')
-        Costo_Viaje_Int = crear_diccionario(inputs_opt_res['CTransporteZF'], ['ZONA','PLANTA'], 'C_TRANS_ZF')
-        Costo_Viaje_Comp = crear_diccionario(inputs_opt_res['CTransporteZFC'], ['ZONA','PLANTA'], 'C_TRANS_ZF')
-        Costo_Tans_PT = crear_diccionario(inputs_opt_res['CTransporteE'], ['PLANTA'], 'C_TRANS_E')
-        Capacidad = crear_diccionario(inputs_opt_res['Cap_Planta'], ['PLANTA'], 'CAP_PLANTA')
-        Precio_Int = crear_diccionario(inputs_opt_res['CR_INTEGRADA'], ['ZONA'], 'CR_INTEGRADA')
-        Precio_Comp = crear_diccionario(inputs_opt_res['CR_COMPRADA'], ['ZONA'], 'CR_COMPRADA')
-        rdto = crear_diccionario(inputs_opt_res['RENDIMIENTO'], ['ZONA','PLANTA'], 'RDTO')
-        Precio_Kg = crear_diccionario(inputs_opt_res['PRECIOKG'], ['ZONA'], 'PRECIO')
-        Peso_Res = crear_diccionario(inputs_opt_res['PESORES'], ['ZONA'], 'PESO')
-
-        # Creación del modelo
-        modelo = LpProblem("CostoSacrificio", LpMaximize)
-
-        # Variables de decisión
-        res_int = LpVariable.dicts('res_int', [(z,p,t) for z in Zona for p in Planta_S for t in Semana], lowBound=0, cat='Integer')
-        res_comp = LpVariable.dicts('res_comp', [(z,p,t) for z in Zona for p in Planta_S for t in Semana], lowBound=0, cat='Integer')
-        viaje_int = LpVariable.dicts('viaje_Int_zona', [(z,p,t) for z in Zona for p in Planta_S for t in Semana], lowBound=0, cat='Integer')
-        viaje_com = LpVariable.dicts('viaje_Com_zona', [(z,p,t) for z in Zona for p in Planta_S for t in Semana], lowBound=0, cat='Integer')
-        viaje_envigado = LpVariable.dicts('viaje_envigado', [(p,t) for p in Planta_S for t in Semana], lowBound=0, cat='Integer')
-
-        # Función objetivo
-        modelo += lpSum(
-            (res_int[z,p,t] * Peso_Res.get((z),0) * rdto.get((z,p),0) * valor_kg +
-            res_comp[z,p,t] * Peso_Res.get((z),0) * rdto.get((z,p),0) * valor_kg -
-            res_int[z,p,t] * Precio_Int.get((z),0) -
-            res_comp[z,p,t] * Precio_Comp.get((z),0) -
-            res_int[z,p,t] * Costo_Sac.get((p),0) -
-            res_comp[z,p,t] * Costo_Sac.get((p),0) -
-            viaje_int[z,p,t] * Costo_Viaje_Int.get((z,p),0) -
-            viaje_com[z,p,t] * Costo_Viaje_Comp.get((z,p),0) -
-            viaje_envigado[p,t] * Costo_Tans_PT.get((p),0)
-            for z in Zona for p in Planta_S for t in Semana)
+        # El planificador compartido limita las soluciones simultáneas del servidor
+        return obtener_planificador().resolver(
+            optimizacion.huella_datos(
+                inputs_opt_res, valor_kg, portafolio, sensibilidad, perfil, grupos_zonas,
+                None if plan_anterior is None else optimizacion.huella_datos({'Plan_Sacrificio': plan_anterior}),
+                semanas_fijas, arranque_heuristico
+            ),
+            lambda hilos: optimizacion.ejecutar_modelo(
+                inputs_opt_res, valor_kg, portafolio=portafolio, hilos=hilos, sensibilidad=sensibilidad,
+                cache_semanas=None if portafolio else obtener_cache_semanas(), perfil=perfil,
+                grupos_zonas=grupos_zonas, plan_anterior=plan_anterior, semanas_fijas=semanas_fijas,
+                arranque_heuristico=arranque_heuristico
+            ),
+            al_esperar
         )
+    except Exception as e:
+        st.error(f"Error al ejecutar el modelo: {str(e)}")
+        return None, None, None
+    finally:
+        aviso.empty()
+
+def ejecutar_en_servicio(inputs_opt_res, valor_kg, portafolio=False, sensibilidad=False, perfil='interactivo',
+                         grupos_zonas=None, plan_anterior=None, semanas_fijas=None, arranque_heuristico=None):
+    """Resuelve en el servicio HTTP y reconstruye el contexto a partir del resultado."""
+    import servicio
+
+    try:
+        trabajo = servicio.enviar_trabajo(URL_SERVICIO, inputs_opt_res, valor_kg,
+                                         portafolio=portafolio, sensibilidad=sensibilidad, perfil=perfil,
+                                         grupos_zonas=grupos_zonas, plan_anterior=plan_anterior,
+                                         semanas_fijas=semanas_fijas,
+                                         arranque_heuristico=arranque_heuristico)
+        aviso = st.empty()
+        while trabajo['estado'] in ('en_cola', 'ejecutando'):
+            if trabajo['estado'] == 'en_cola':
+                aviso.info(f"En cola del servicio de solución (posición {trabajo['posicion']})...")
+            else:
+                aviso.info("Resolviendo en el servicio de solución...")
+            time.sleep(1)
+            trabajo = servicio.consultar_trabajo(URL_SERVICIO, trabajo['id'])
+        aviso.empty()
 
-        # Restricciones
-        for t in Semana:
-            modelo += (lpSum(res_int[z,p,t] for z in Zona for p in Planta_S) + 
-                      lpSum(res_comp[z,p,t] for z in Zona for p in Planta_S)) == Demanda[t]
+        if trabajo['estado'] != 'terminado':
+            raise RuntimeError(trabajo.get('error', trabajo['estado']))
+        resultado = servicio.obtener_resultado(URL_SERVICIO, trabajo['id'])
+        # Sin modelo local: el contexto trae los valores de la solución
+        return None, optimizacion.contexto_desde_json(resultado['contexto']), resultado['costos']
+    except Exception as e:
+        st.error(f"Error al ejecutar el modelo en el servicio: {str(e)}")
+        return None, None, None
 
-        for z in Zona:
-            for t in Semana:
-                modelo += lpSum(res_int[z,p,t] for p in Planta_S) <= Oferta_Int.get((z,t),0)
-                modelo += lpSum(res_comp[z,p,t] for p in Planta_S) <= Oferta_Com.get((z,t),0)
+# --- VISTA PREVIA PAGINADA ---
+# El editor recibe solo la página visible de la hoja (filtrada por ZONA, PLANTA
+# o SEMANA). Las ediciones se guardan solo como diff sobre las hojas en caché
+# (ver optimizacion.registrar_cambios): la hoja visible y las del modelo se
+# reconstruyen con optimizacion.aplicar_cambios cuando se necesitan.
 
-        for p in Planta_S:
-            for t in Semana:
-                modelo += (lpSum(res_int[z,p,t] for z in Zona) + lpSum(res_comp[z,p,t] for z in Zona) <= Capacidad.get((p),0))
+@st.fragment
+def mostrar_vista_previa(inputs_opt_res):
+    """Vista previa editable, paginada y filtrable de las hojas cargadas."""
+    st.subheader("Vista previa de los datos cargados")
+    hoja = st.selectbox("Seleccionar hoja para visualizar", list(inputs_opt_res.keys()))
+    cambios = st.session_state.setdefault('cambios', {})
+    # Solo se reconstruye la hoja visible
+    datos = optimizacion.aplicar_cambios(inputs_opt_res, {hoja: cambios[hoja]} if hoja in cambios else {})[hoja]
 
-        for z in Zona:
-            for p in Planta_S:
-                for t in Semana:
-                    modelo += res_int[z,p,t] <= viaje_int[z,p,t] * 14
-                    modelo += res_comp[z,p,t] <= viaje_com[z,p,t] * 14
+    columnas_filtro = [c for c in COLUMNAS_FILTRO if c in datos.columns]
+    controles = st.columns(len(columnas_filtro) + 1)
+    mascara = pd.Series(True, index=datos.index)
+    seleccion = []
+    for control, columna in zip(controles, columnas_filtro):
+        valores = control.multiselect(columna, datos[columna].drop_duplicates().sort_values().tolist(),
+                                      key=f'filtro_{hoja}_{columna}')
+        if valores:
+            mascara &= datos[columna].isin(valores)
+        seleccion.append(valores)
+    por_pagina = controles[-1].selectbox("Filas por página", FILAS_POR_PAGINA, key=f'filas_{hoja}')
+    filtrados = datos[mascara]
 
-        for p in Planta_S:
-            for t in Semana:
-                modelo += (lpSum(res_int[z,p,t] for z in Zona) + lpSum(res_comp[z,p,t] for z in Zona)) <= viaje_envigado[p,t] * 84
+    # Al cambiar los filtros se vuelve a la primera página
+    firma = abs(hash(repr((seleccion, por_pagina))))
+    paginas = max(1, -(-len(filtrados) // por_pagina))
+    pagina = st.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, value=1,
+                             key=f'pagina_{hoja}_{firma}')
+    inicio = (pagina - 1) * por_pagina
+    vista = filtrados.iloc[inicio:inicio + por_pagina]
+    st.caption(f"Filas {inicio + 1 if len(vista) else 0}-{inicio + len(vista)} de {len(filtrados)} "
+               f"filtradas ({len(datos)} en la hoja)")
 
-        # Resolver el modelo
-        modelo.solve(PULP_CBC_CMD(timeLimit=60))
-        
-        # Preparar resultados
-        contexto = {
-            'Zona': Zona,
-            'Planta_S': Planta_S,
-            'Semana': Semana,
-            'variables': {
-                'res_int': res_int,
-                'res_comp': res_comp,
-                'viaje_int': viaje_int,
-                'viaje_com': viaje_com,
-                'viaje_envigado': viaje_envigado
-            },
-            'parametros': {
-                'Precio_Int': Precio_Int,
-                'Precio_Comp': Precio_Comp,
-                'Costo_Sac': Costo_Sac,
-                # --- AGREGADOS LOS COSTOS DE TRANSPORTE FALTANTES ---
-                'Costo_Viaje_Int': Costo_Viaje_Int,
-                'Costo_Viaje_Comp': Costo_Viaje_Comp,
-                'Costo_Tans_PT': Costo_Tans_PT,
-                # ----------------------------------------------------
-                'Peso_Res': Peso_Res,
-                'rdto': rdto,
-                'valor_kg': valor_kg,
-                'Demanda': Demanda,
-                'Oferta_Int': Oferta_Int,
-                'Oferta_Com': Oferta_Com,
-                'Capacidad': Capacidad
+    # La versión cambia al guardar: el editor se crea de nuevo sobre los datos actualizados
+    clave = f"editor_{hoja}_{st.session_state.get('version_cambios', 0)}_{firma}_{pagina}"
+    st.data_editor(vista, key=clave, num_rows='dynamic')
+    delta = st.session_state.get(clave) or {}
+
+    col_guardar, col_descartar = st.columns(2)
+    if col_guardar.button("Guardar cambios de esta página"):
+        if any(delta.get(tipo) for tipo in ('edited_rows', 'added_rows', 'deleted_rows')):
+            diff = cambios.setdefault(hoja, {'editadas': {}, 'nuevas': {}, 'eliminadas': []})
+            optimizacion.registrar_cambios(diff, inputs_opt_res[hoja], vista, delta)
+            st.session_state['version_cambios'] = st.session_state.get('version_cambios', 0) + 1
+            st.rerun()
+    if cambios and col_descartar.button("Descartar todos los cambios"):
+        st.session_state['cambios'] = {}
+        st.session_state['version_cambios'] = st.session_state.get('version_cambios', 0) + 1
+        st.rerun()
+
+    if cambios:
+        st.success(
+            "Cambios guardados: " + "; ".join(
+                f"{h}: {sum(len(v) for v in d['editadas'].values())} celdas editadas, "
+                f"{len(d['nuevas'])} filas nuevas, {len(d['eliminadas'])} eliminadas"
+                for h, d in cambios.items()
+            ) + ". Puede ejecutar el modelo con los datos actualizados."
+        )
+
+# --- BLOQUE DE ANÁLISIS POR ZONA ---
+# Cada pestaña es un fragmento de Streamlit: al cambiar sus selectores solo se
+# vuelve a ejecutar esa sección a partir de la solución guardada en session_state,
+# sin repetir la carga del archivo, la vista previa ni las tablas de resultados.
+
+# Función auxiliar para obtener el valor de una variable PuLP
+def obtener_valor_pulp(variable):
+    """Obtiene el valor de una variable PuLP, manejando diferentes tipos."""
+    if variable is None:
+        return 0
+    elif hasattr(variable, 'varValue'):
+        return variable.varValue if variable.varValue is not None else 0
+    elif isinstance(variable, (int, float)):
+        return variable
+    else:
+        return 0
+
+@st.fragment
+def mostrar_analisis_zona(contexto):
+    """Pestaña de análisis por zona (unidades y costos por semana/planta)."""
+    zonas_disponibles = contexto['Zona']
+
+    col1, col2 = st.columns([1, 3])
+
+    with col1:
+        zona_seleccionada = st.selectbox(
+            "Seleccionar Zona para análisis:",
+            options=zonas_disponibles,
+            key="zona_selector"
+        )
+
+        # Opción para ver datos por planta o consolidado
+        vista_tipo = st.radio(
+            "Tipo de vista:",
+            ["Consolidado", "Por Planta"],
+            key=f"vista_{zona_seleccionada}"
+        )
+
+    with col2:
+        # Calcular resumen para la zona seleccionada
+        zona_data = []
+        semanas = contexto['Semana']
+        plantas = contexto['Planta_S']
+
+        for t in semanas:
+            for p in plantas:
+                # Obtener valores con manejo seguro
+                res_int_var = contexto['variables']['res_int'].get((zona_seleccionada, p, t))
+                res_comp_var = contexto['variables']['res_comp'].get((zona_seleccionada, p, t))
+
+                res_int_val = obtener_valor_pulp(res_int_var)
+                res_comp_val = obtener_valor_pulp(res_comp_var)
+
+                if res_int_val > 0 or res_comp_val > 0:
+                    # Obtener valores unitarios
+                    precio_int = contexto['parametros']['Precio_Int'].get(zona_seleccionada, 0)
+                    precio_comp = contexto['parametros']['Precio_Comp'].get(zona_seleccionada, 0)
+                    costo_sac = contexto['parametros']['Costo_Sac'].get(p, 0)
+                    peso_res = contexto['parametros']['Peso_Res'].get(zona_seleccionada, 0)
+                    rendimiento = contexto['parametros']['rdto'].get((zona_seleccionada, p), 0)
+                    valor_kg = contexto['parametros']['valor_kg']
+
+                    # Calcular costos
+                    costo_int_total = res_int_val * precio_int
+                    costo_comp_total = res_comp_val * precio_comp
+                    costo_sac_int = res_int_val * costo_sac
+                    costo_sac_comp = res_comp_val * costo_sac
+
+                    # Calcular ingresos
+                    ingreso_int = res_int_val * peso_res * rendimiento * valor_kg
+                    ingreso_comp = res_comp_val * peso_res * rendimiento * valor_kg
+
+                    zona_data.append({
+                        'Semana': t,
+                        'Planta': p,
+                        'Reses Int': int(res_int_val),
+                        'Reses Comp': int(res_comp_val),
+                        'Costo Int ($)': round(costo_int_total, 2),
+                        'Costo Comp ($)': round(costo_comp_total, 2),
+                        'Costo Sac Int ($)': round(costo_sac_int, 2),
+                        'Costo Sac Comp ($)': round(costo_sac_comp, 2),
+                        'Ingreso Int ($)': round(ingreso_int, 2),
+                        'Ingreso Comp ($)': round(ingreso_comp, 2)
+                    })                     
+        if zona_data:
+            df_zona = pd.DataFrame(zona_data)
+
+            # Mostrar métricas resumidas
+            st.subheader(f"Resumen - {zona_seleccionada}")
+            col_a, col_b, col_c, col_d = st.columns(4)
+
+            with col_a:
+                total_integradas = df_zona['Reses Int'].sum()
+                st.metric(
+                    label="Reses Integradas",
+                    value=f"{total_integradas:,.0f}"
+                )
+
+            with col_b:
+                total_compradas = df_zona['Reses Comp'].sum()
+                st.metric(
+                    label="Reses Compradas",
+                    value=f"{total_compradas:,.0f}"
+                )
+
+            with col_c:
+                total_costo_reses = df_zona['Costo Int ($)'].sum() + df_zona['Costo Comp ($)'].sum()
+                st.metric(
+                    label="Costo Total Reses",
+                    value=f"${total_costo_reses:,.0f}"
+                )
+
+            with col_d:
+                total_ingreso = df_zona['Ingreso Int ($)'].sum() + df_zona['Ingreso Comp ($)'].sum()
+                st.metric(
+                    label="Ingreso Total",
+                    value=f"${total_ingreso:,.0f}"
+                )
+
+            # 1. Definición de nombres y formatos
+            # 1. Definición de nombres y formatos
+            nombres_descriptivos = {
+                'Reses Int': 'Reses Integradas',
+                'Reses Comp': 'Reses Compradas',
+                'Total Reses': 'Total Reses',
+
+                'Costo Int ($)': 'Costo Reses Integradas',
+                'Costo Comp ($)': 'Costo Reses Compradas',
+                'Subtotal Reses': 'SUBTOTAL: Costos de Reses',
+
+                'Costo Sac Int ($)': 'Costo Sacrificio Int.',
+                'Costo Sac Comp ($)': 'Costo Sacrificio Comp.',
+                'Subtotal Sac': 'SUBTOTAL: Costos de Sacrificio',
+
+                'Ingreso Int ($)': 'Ingreso Carne Int.',
+                'Ingreso Comp ($)': 'Ingreso Carne Comp.',
+                'Subtotal Ing': 'SUBTOTAL: Ingresos por Carne'
             }
-        }
-        
-        # Calcular métricas de costos
-        # --- BLOQUE CORREGIDO PARA CALCULAR COSTOS ---
-        # 1. Calcular cada componente por separado para asegurar precisión
-        val_costo_int = sum(res_int[z,p,t].varValue * Precio_Int.get((z),0) 
-                            for z in Zona for p in Planta_S for t in Semana)
-        
-        val_costo_comp = sum(res_comp[z,p,t].varValue * Precio_Comp.get((z),0) 
-                             for z in Zona for p in Planta_S for t in Semana)
-        
-        val_costo_sac = (sum(res_int[z,p,t].varValue * Costo_Sac.get((p),0) 
-                             for z in Zona for p in Planta_S for t in Semana) +
-                         sum(res_comp[z,p,t].varValue * Costo_Sac.get((p),0) 
-                             for z in Zona for p in Planta_S for t in Semana))
-        
-        val_costo_tte_res = (sum(viaje_int[z,p,t].varValue * Costo_Viaje_Int.get((z,p),0) 
-                                 for z in Zona for p in Planta_S for t in Semana) +
-                             sum(viaje_com[z,p,t].varValue * Costo_Viaje_Comp.get((z,p),0) 
-                                 for z in Zona for p in Planta_S for t in Semana))
-        
-        val_costo_tte_pt = sum(viaje_envigado[p,t].varValue * Costo_Tans_PT.get((p),0) 
-                               for p in Planta_S for t in Semana)
-        
-        val_carne = (sum(res_int[z,p,t].varValue * Peso_Res.get((z),0) * rdto.get((z,p),0) * valor_kg 
-                         for z in Zona for p in Planta_S for t in Semana) +
-                     sum(res_comp[z,p,t].varValue * Peso_Res.get((z),0) * rdto.get((z,p),0) * valor_kg 
-                         for z in Zona for p in Planta_S for t in Semana))
-
-        # 2. Calcular la Valorización Total como una RESTA simple (Ingreso - Costos)
-        # Esto garantiza que el valor coincida visualmente con la tabla
-        total_costos = (val_costo_int + val_costo_comp + val_costo_sac + 
-                        val_costo_tte_res + val_costo_tte_pt)
-                        
-        val_valorizacion = val_carne - total_costos
-
-        # 3. Construir el diccionario final
-        costos = {
-            'Costo Integración': val_costo_int,
-            'Costo Compras': val_costo_comp,
-            'Costo Sacrificio': val_costo_sac,
-            'Costo Transporte Reses': val_costo_tte_res,
-            'Costo Transporte Canales': val_costo_tte_pt,
-            'Valor Carne': val_carne,
-            'Valorización Total': val_valorizacion  # <--- Aquí está la corrección clave
-        }
-        # -----------------------------------------------------------
-
-        return modelo, contexto, costos
-        
-    except Exception as e:
-        st.error(f"Error al ejecutar el modelo: {str(e)}")
-        return None, None, None
+
+            def generar_tabla_semanas_filas(df_source, tipo_tabla="Unidades"):
+                """Genera tabla con Semanas en filas y variables en columnas."""
+                df = df_source.copy()
+                df['Semana'] = df['Semana'].astype(str)
+
+                if tipo_tabla == "Unidades":
+                    cols = ['Semana', 'Reses Int', 'Reses Comp']
+                    df_view = df[cols].copy()
+                    df_view['Total Reses'] = df_view['Reses Int'] + df_view['Reses Comp']
+
+                    total_row = {'Semana': 'TOTAL'}
+                    for col in ['Reses Int', 'Reses Comp', 'Total Reses']:
+                        total_row[col] = df_view[col].sum()
+
+                    df_view = pd.concat([df_view, pd.DataFrame([total_row])], ignore_index=True)
+                    df_view = df_view.rename(columns=nombres_descriptivos)
+                    df_view = df_view.set_index('Semana')
+                    return df_view.style.format("{:,.0f}")
+
+                elif tipo_tabla == "Financiera":
+                    df['Subtotal Reses'] = df['Costo Int ($)'] + df['Costo Comp ($)']
+                    df['Subtotal Sac'] = df['Costo Sac Int ($)'] + df['Costo Sac Comp ($)']
+                    df['Subtotal Ing'] = df['Ingreso Int ($)'] + df['Ingreso Comp ($)']
+
+                    cols_ordenadas = [
+                        'Semana',
+                        'Costo Int ($)', 'Costo Comp ($)', 'Subtotal Reses',
+                        'Costo Sac Int ($)', 'Costo Sac Comp ($)', 'Subtotal Sac',
+                        'Ingreso Int ($)', 'Ingreso Comp ($)', 'Subtotal Ing'
+                    ]
+                    df_view = df[cols_ordenadas].copy()
+
+                    total_row = {'Semana': 'TOTAL'}
+                    for col in cols_ordenadas[1:]:
+                        total_row[col] = df_view[col].sum()
+
+                    df_view = pd.concat([df_view, pd.DataFrame([total_row])], ignore_index=True)
+                    df_view = df_view.rename(columns=nombres_descriptivos)
+                    df_view = df_view.set_index('Semana')
+
+                    def estilo_financiero_columnas(df_styler):
+                        styler = df_styler.format("${:,.0f}")
+                        cols_costos = [c for c in df_view.columns if 'Costo' in c and 'SUBTOTAL' not in c]
+                        cols_ingresos = [c for c in df_view.columns if 'Ingreso' in c and 'SUBTOTAL' not in c]
+                        cols_subtotales = [c for c in df_view.columns if 'SUBTOTAL' in c]
+
+                        # Colores por columna y fila TOTAL, calculados de una vez sobre toda la tabla
+                        def estilos_columnas(df):
+                            styles = pd.DataFrame('', index=df.index, columns=df.columns)
+                            styles[cols_costos] = 'color: #d62728;' # Rojo
+                            styles[cols_ingresos] = 'color: #2ca02c;' # Verde
+                            styles[cols_subtotales] = 'font-weight: bold; background-color: #f0f0f0; color: black;'
+                            # Resaltar la fila TOTAL
+                            styles.loc[df.index == 'TOTAL', :] = 'font-weight: bold; border-top: 2px solid black; background-color: #e6e6e6; color: black'
+                            return styles
+
+                        styler.apply(estilos_columnas, axis=None)
+
+                        return styler
+
+                    return estilo_financiero_columnas(df_view.style)
+
+            # --- Visualización ---
+            if vista_tipo == "Consolidado":
+                df_consolidado = df_zona.groupby('Semana').agg({
+                    'Reses Int': 'sum', 'Reses Comp': 'sum',
+                    'Costo Int ($)': 'sum', 'Costo Comp ($)': 'sum',
+                    'Costo Sac Int ($)': 'sum', 'Costo Sac Comp ($)': 'sum',
+                    'Ingreso Int ($)': 'sum', 'Ingreso Comp ($)': 'sum'
+                }).reset_index()
+
+                st.subheader(f"📊 Unidades por Semana - {zona_seleccionada}")
+                mostrar_styler(generar_tabla_semanas_filas(df_consolidado, "Unidades"), use_container_width=True)
+
+                st.subheader(f"💰 Costos e Ingresos por Semana - {zona_seleccionada}")
+                mostrar_styler(generar_tabla_semanas_filas(df_consolidado, "Financiera"), use_container_width=True)
+
+            else:  # Vista por Planta
+                plantas_disponibles = sorted(df_zona['Planta'].unique())
+                planta_seleccionada = st.selectbox("Seleccionar Planta:", plantas_disponibles, key=f"planta_{zona_seleccionada}")
+                df_planta = df_zona[df_zona['Planta'] == planta_seleccionada]
+
+                if not df_planta.empty:
+                    st.subheader(f"Resumen Planta {planta_seleccionada}")
+                    c1, c2, c3, c4 = st.columns(4)
+                    c1.metric("Total Reses", f"{df_planta['Reses Int'].sum() + df_planta['Reses Comp'].sum():,.0f}")
+                    c2.metric("Costo Reses", f"${df_planta['Costo Int ($)'].sum() + df_planta['Costo Comp ($)'].sum():,.0f}")
+                    c3.metric("Costo Sacrificio", f"${df_planta['Costo Sac Int ($)'].sum() + df_planta['Costo Sac Comp ($)'].sum():,.0f}")
+                    c4.metric("Ingreso Total", f"${df_planta['Ingreso Int ($)'].sum() + df_planta['Ingreso Comp ($)'].sum():,.0f}")
+
+                    st.subheader(f"📊 Unidades - {planta_seleccionada}")
+                    mostrar_styler(generar_tabla_semanas_filas(df_planta, "Unidades"), use_container_width=True)
+
+                    st.subheader(f"💰 Costos e Ingresos - {planta_seleccionada}")
+                    mostrar_styler(generar_tabla_semanas_filas(df_planta, "Financiera"), use_container_width=True)
+                else:
+                    st.info(f"No hay datos para la planta {planta_seleccionada}")
+
+
+@st.fragment
+def mostrar_analisis_transporte(contexto):
+    """Pestaña de análisis de costos de transporte por zona."""
+    zonas_disponibles = contexto['Zona']
+
+    st.subheader("🚚 Análisis de Costos de Transporte por Zona")
+
+    # Seleccionar zona para análisis de transporte
+    zona_transporte = st.selectbox(
+        "Seleccionar Zona para análisis de transporte:",
+        options=zonas_disponibles,
+        key="zona_transporte_selector"
+    )
+
+    # Calcular costos de transporte para la zona seleccionada
+    transporte_data = []
+    semanas = contexto['Semana']
+    plantas = contexto['Planta_S']
+
+    for t in semanas:
+        for p in plantas:
+            viaje_int_var = contexto['variables']['viaje_int'].get((zona_transporte, p, t))
+            viaje_com_var = contexto['variables']['viaje_com'].get((zona_transporte, p, t))
+
+            viaje_int_val = obtener_valor_pulp(viaje_int_var)
+            viaje_com_val = obtener_valor_pulp(viaje_com_var)
+
+            if viaje_int_val > 0 or viaje_com_val > 0:
+                costo_viaje_int = contexto['parametros'].get('Costo_Viaje_Int', {}).get((zona_transporte, p), 0)
+                costo_viaje_comp = contexto['parametros'].get('Costo_Viaje_Comp', {}).get((zona_transporte, p), 0)
+
+                transporte_data.append({
+                    'Semana': t,
+                    'Planta Destino': p,
+                    'Viajes Integrados': int(viaje_int_val),
+                    'Viajes Comprados': int(viaje_com_val),
+                    'Costo por Viaje Int ($)': costo_viaje_int,
+                    'Costo por Viaje Comp ($)': costo_viaje_comp,
+                    'Costo Total Int ($)': viaje_int_val * costo_viaje_int,
+                    'Costo Total Comp ($)': viaje_com_val * costo_viaje_comp
+                })
+
+    if transporte_data:
+        df_transporte = pd.DataFrame(transporte_data)
+
+        # Calcular totales
+        total_viajes_int = df_transporte['Viajes Integrados'].sum()
+        total_viajes_comp = df_transporte['Viajes Comprados'].sum()
+        total_costo_int = df_transporte['Costo Total Int ($)'].sum()
+        total_costo_comp = df_transporte['Costo Total Comp ($)'].sum()
+
+        # Mostrar métricas
+        st.subheader("Resumen de Transporte")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Viajes Integrados", f"{total_viajes_int:,.0f}")
+        with col2:
+            st.metric("Viajes Comprados", f"{total_viajes_comp:,.0f}")
+        with col3:
+            st.metric("Costo Transp. Int", f"${total_costo_int:,.0f}")
+        with col4:
+            st.metric("Costo Transp. Comp", f"${total_costo_comp:,.0f}")
+
+        # Mostrar tabla detallada
+        st.subheader("Detalle por Semana y Planta")
+        mostrar_styler(
+            df_transporte.style.format({
+                'Semana': '{:.2f}',  # <--- ESTA LÍNEA ELIMINA LOS CEROS EXTRA
+                'Viajes Integrados': '{:,.0f}',
+                'Viajes Comprados': '{:,.0f}',
+                'Costo por Viaje Int ($)': '${:,.0f}',
+                'Costo por Viaje Comp ($)': '${:,.0f}',
+                'Costo Total Int ($)': '${:,.0f}',
+                'Costo Total Comp ($)': '${:,.0f}'
+            }),
+            use_container_width=True,
+            height=300
+        )
+
+        # Gráfico de costos de transporte por semana
+        st.subheader("Evolución Semanal de Costos de Transporte")
+
+        if not df_transporte.empty:
+            df_transporte_semanal = df_transporte.groupby('Semana').agg({
+                'Costo Total Int ($)': 'sum',
+                'Costo Total Comp ($)': 'sum'
+            }).reset_index()
+
+            try:
+                import plotly.express as px
+                df_transporte_semanal_melted = pd.melt(
+                    df_transporte_semanal,
+                    id_vars=['Semana'],
+                    value_vars=['Costo Total Int ($)', 'Costo Total Comp ($)'],
+                    var_name='Tipo Transporte',
+                    value_name='Costo'
+                )
+
+                fig = px.bar(
+                    df_transporte_semanal_melted,
+                    x='Semana',
+                    y='Costo',
+                    color='Tipo Transporte',
+                    title=f"Costos de Transporte por Semana - {zona_transporte}",
+                    labels={'Costo': 'Costo ($)', 'Semana': 'Semana'},
+                    barmode='group'
+                )
+                fig.update_layout(
+                    yaxis_tickformat=',.0f',
+                    hovermode='x unified'
+                )
+                st.plotly_chart(fig, use_container_width=True)
+            except:
+                # Fallback a gráfico de barras simple
+                chart_data = df_transporte_semanal.set_index('Semana')
+                st.bar_chart(chart_data)
+    else:
+        st.info(f"⚠️ No hay costos de transporte para la zona {zona_transporte} en la solución óptima.")
+
+
+# --- ANÁLISIS DE SENSIBILIDAD ---
+def mostrar_sensibilidad(sensibilidad):
+    """Precios sombra y rutas no usadas (ver optimizacion.analisis_sensibilidad)."""
+    st.subheader("🔍 Análisis de Sensibilidad")
+    st.caption(
+        "Cambio en la función objetivo por una unidad adicional de cada recurso, con el "
+        "plan de camiones de la solución fijo. Las rutas con valor neto positivo podrían "
+        "mejorar la solución si se les asigna un camión lleno."
+    )
+    tab_cap, tab_oferta, tab_compras, tab_demanda, tab_rutas = st.tabs(
+        ["Capacidad de planta", "Oferta integrada", "Compras", "Demanda", "Rutas no usadas"]
+    )
+    for tab, nombre in zip((tab_cap, tab_oferta, tab_compras, tab_demanda), ('Cap_Planta', 'Oferta', 'Compras', 'Demanda')):
+        with tab:
+            df = pd.DataFrame(sensibilidad[nombre])
+            if df.empty:
+                st.info("Sin restricciones de este tipo en el modelo.")
+                continue
+            df = df.sort_values('Precio sombra', key=abs, ascending=False)
+            mostrar_styler(df.style.format({'Precio sombra': "{:,.0f}"}), hide_index=True)
+    with tab_rutas:
+        df_rutas = pd.DataFrame(sensibilidad['Rutas'])
+        if df_rutas.empty:
+            st.info("Todas las rutas tienen reses en la solución.")
+        else:
+            df_rutas = df_rutas.sort_values('Valor neto por res', ascending=False)
+            mostrar_styler(
+                df_rutas.style.format("{:,.0f}", subset=['Costo reducido', 'Flete por res', 'Valor neto por res']),
+                hide_index=True
+            )
+
 
 # Interfaz de usuario
 with st.sidebar:
     st.header("Configuración del Modelo")
     uploaded_file = st.file_uploader("Cargar archivo Excel con parámetros", type=['xlsx', 'xls'])
     valor_kg = st.number_input("Valor comercial de Kg de carne ($)", min_value=0.0, value=22000.0, step=1000.0)
+    perfil_solver = st.selectbox(
+        "Perfil de solver",
+        list(perfiles.PERFILES),
+        format_func=lambda perfil: {
+            'interactivo': "Interactivo (60 s, gap 0.5 %)",
+            'nocturno': "Nocturno (30 min, gap 0.01 %)",
+            'exacto': "Exacto (sin límite, gap 0)",
+        }.get(perfil, perfil),
+        help="Tiempo límite, tolerancia de gap, semilla y opciones de presolve/cortes del solver."
+    )
+    arranque_heuristico = st.checkbox(
+        "Arranque heurístico",
+        value=perfiles.PERFILES[perfil_solver]['arranque_heuristico'],
+        help="Pasa al solver una solución voraz (camiones llenos por margen) como punto de partida. "
+             "Suele acelerar el primer incumbente en redes grandes; en libros pequeños puede no ayudar."
+    )
+    # Los modos de solución son excluyentes (ver optimizacion.validar_modos)
+    modo_solucion = st.radio(
+        "Modo de solución",
+        ['estandar', 'portafolio', 'jerarquico', 'horizonte'],
+        format_func=lambda modo: {
+            'estandar': "Estándar",
+            'portafolio': "Portafolio de solvers",
+            'jerarquico': "Jerárquica por grupos de zonas",
+            'horizonte': "Re-planificar desde el plan anterior",
+        }[modo],
+        help="Portafolio: resuelve con varias configuraciones de solver en paralelo y usa la primera que "
+             "pruebe optimalidad. Jerárquica: para redes con muchas zonas, resuelve agrupando zonas similares "
+             "y luego reparte por zona; es más rápida pero puede perder algo de valor frente al modelo completo. "
+             "Re-planificar (horizonte móvil): parte del plan descargado en la corrida anterior para las semanas "
+             "que se repiten y resuelve sobre todo las semanas nuevas; las semanas ya ejecutadas se fijan."
+    )
+    modo_portafolio = modo_solucion == 'portafolio'
+    grupos_zonas = None
+    if modo_solucion == 'jerarquico':
+        grupos_zonas = st.number_input("Número de grupos de zonas", min_value=1, value=5, step=1)
+    plan_anterior = None
+    semanas_fijas = []
+    if modo_solucion == 'horizonte':
+        archivo_plan = st.file_uploader("Plan anterior (Excel descargado)", type=['xlsx', 'xls'], key='archivo_plan')
+        if archivo_plan is not None:
+            plan_anterior = procesar_plan_anterior(archivo_plan)
+        if plan_anterior is not None:
+            semanas_fijas = st.multiselect(
+                "Semanas ya ejecutadas (se fijan)",
+                sorted(plan_anterior['Semana'].unique().tolist()),
+                help="Se mantienen exactamente como en el plan anterior."
+            )
+    calcular_sensibilidad = st.checkbox(
+        "Análisis de sensibilidad",
+        help="Calcula precios sombra de capacidad, oferta, compras y demanda, y el valor de las rutas no usadas."
+    )
         
     if uploaded_file is not None:
         st.success("Archivo cargado correctamente")
@@ -258,37 +717,58 @@ if uploaded_file is not None:
     inputs_opt_res = procesar_archivo(uploaded_file)
     
     if inputs_opt_res is not None:
-        # Mostrar vista previa de los datos
-        st.subheader("Vista previa de los datos cargados")
-        
-        sheet_names = list(inputs_opt_res.keys())
-        selected_sheet = st.selectbox("Seleccionar hoja para visualizar", sheet_names)
-
-        #Mostrar un dataframe editable:
-        Hoja_Editada = st.data_editor(
-            inputs_opt_res[selected_sheet],
-            key= f'editor_{selected_sheet}',
-            num_rows='dynamic')
-
-        # Botón para guardar cambios
+        # Los cambios guardados son de un archivo: al cargar otro se descartan
+        id_archivo = getattr(uploaded_file, 'file_id', uploaded_file.name)
+        if st.session_state.get('archivo_cambios') != id_archivo:
+            st.session_state['archivo_cambios'] = id_archivo
+            st.session_state['cambios'] = {}
 
-        if st.button("Guardar cambios en esta hoja"):
-            inputs_opt_res[selected_sheet] = Hoja_Editada
-            st.session_state['edited_data'] = inputs_opt_res  # Guardar en session_state
-            st.success("Cambios guardados! Puede ejecutar el modelo con los datos actualizados.")
-        
-        # Ejecutar modelo con los datos actuales (ya sean originales o editados)
-        current_data = st.session_state.get('edited_data', inputs_opt_res)
+        # Mostrar vista previa de los datos (paginada; se edita la página visible)
+        mostrar_vista_previa(inputs_opt_res)
         
         if st.button("Ejecutar Modelo de Optimización"):
+            # Ejecutar modelo con los datos actuales (originales más los cambios guardados)
+            current_data = optimizacion.aplicar_cambios(inputs_opt_res, st.session_state.get('cambios', {}))
             with st.spinner("Ejecutando modelo, por favor espere..."):
                 start_time = time.time()
-                modelo, contexto, costos = ejecutar_modelo(current_data, valor_kg)
+                modelo, contexto, costos = ejecutar_modelo(current_data, valor_kg, portafolio=modo_portafolio,
+                                                           sensibilidad=calcular_sensibilidad,
+                                                           perfil=perfil_solver,
+                                                           grupos_zonas=grupos_zonas,
+                                                           plan_anterior=plan_anterior,
+                                                           semanas_fijas=semanas_fijas,
+                                                           arranque_heuristico=arranque_heuristico)
                 execution_time = time.time() - start_time
             
-            if modelo is not None and costos is not None:
+            if costos is not None:
                 st.success("Modelo ejecutado exitosamente!")
                 st.write(f"Tiempo de ejecución: {execution_time:.2f} segundos")
+                if contexto['portafolio']:
+                    resultado = contexto['portafolio']
+                    st.caption(
+                        f"Configuración ganadora: **{resultado['ganador']}** "
+                        f"({'óptimo probado' if resultado['optimo_probado'] else 'mejor solución en el tiempo límite'}, "
+                        f"{resultado['tiempo']:.2f} s) entre {', '.join(resultado['lanzadas'])}"
+                    )
+                if contexto.get('jerarquico'):
+                    grupos = contexto['jerarquico']['grupos']
+                    st.caption(
+                        f"Solución jerárquica: {len(grupos)} grupos de zonas ("
+                        + "; ".join(f"{g}: {', '.join(map(str, zonas))}" for g, zonas in grupos.items()) + ")"
+                    )
+                if contexto.get('horizonte'):
+                    resultado = contexto['horizonte']
+                    st.caption(
+                        f"Horizonte móvil: {len(resultado['fijas'])} semanas fijas, "
+                        f"{len(resultado['arranque'])} desde el plan anterior, "
+                        f"{len(resultado['nuevas']) + len(resultado['modificadas'])} resueltas de nuevo"
+                    )
+                if contexto.get('semanas'):
+                    resultado = contexto['semanas']
+                    st.caption(
+                        f"Semanas resueltas: {len(resultado['resueltas'])}; "
+                        f"reutilizadas sin cambios: {len(resultado['reutilizadas'])}"
+                    )
 
                 # Guardar resultados en session_state
                 st.session_state['modelo'] = modelo
@@ -311,37 +791,12 @@ if uploaded_file is not None:
             # Crear DataFrame consolidado
             st.subheader("Plan de Sacrificio Consolidado")
             
-            # Preparar datos para todas las variables
-            data = []
+            # Plan con las combinaciones (zona, planta, semana) de valor positivo
             semanas = contexto['Semana']
             plantas = contexto['Planta_S']
-            zonas = contexto['Zona']
+            df_consolidado = optimizacion.extraer_plan(contexto)
             
-            # Crear combinaciones únicas de (zona, planta, semana)
-            combinaciones = [(z, p, t) for z in zonas for p in plantas for t in semanas]
-            
-            for z, p, t in combinaciones:
-                res_int_val = contexto['variables']['res_int'][(z, p, t)].varValue if (z, p, t) in contexto['variables']['res_int'] else 0
-                res_comp_val = contexto['variables']['res_comp'][(z, p, t)].varValue if (z, p, t) in contexto['variables']['res_comp'] else 0
-                
-                # Solo agregar filas con valores positivos
-                if res_int_val > 0 or res_comp_val > 0:
-                    data.append({
-                        'Zona': z,
-                        'Planta': p,
-                        'Semana': t,
-                        'Reses integradas': res_int_val,
-                        'Reses compradas': res_comp_val,
-                        'Total reses': res_int_val + res_comp_val
-                    })
-            
-            # Crear DataFrame
-            if data:
-                df_consolidado = pd.DataFrame(data)
-                
-                # Ordenar por semana, zona y planta
-                df_consolidado = df_consolidado.sort_values(['Semana', 'Zona', 'Planta'])
-                
+            if not df_consolidado.empty:
                 # Mostrar tabla
                 st.dataframe(df_consolidado)
                 
@@ -362,7 +817,25 @@ if uploaded_file is not None:
             # Mostrar  (se mantiene igual)
             st.subheader("Desglose de Costos y Valores")
             df_costos = pd.DataFrame.from_dict(costos, orient='index', columns=['Valor ($)'])
-            st.dataframe(df_costos.style.format("{:,.0f}"))
+            mostrar_styler(df_costos.style.format("{:,.0f}"))
+
+            if contexto.get('solver'):
+                # Calidad de la solución (sobre la función objetivo del modelo)
+                solver = contexto['solver']
+                col_obj, col_cota, col_gap = st.columns(3)
+                col_obj.metric("Objetivo del modelo", f"{solver['objetivo']:,.0f}" if solver['objetivo'] is not None else "—")
+                col_cota.metric("Cota", f"{solver['cota']:,.0f}" if solver['cota'] is not None else "—")
+                col_gap.metric("Gap alcanzado", f"{solver['gap']:.3%}" if solver['gap'] is not None else "—")
+                primer_incumbente = solver.get('primer_incumbente')
+                st.caption(
+                    f"Perfil {solver['perfil']}: {solver['resultado']} ({solver['tiempo']:.2f} s"
+                    + (f"; primera solución factible {'de cada semana a más tardar ' if contexto.get('semanas') else ''}"
+                       f"a los {primer_incumbente:.2f} s" if primer_incumbente is not None else "")
+                    + (", con arranque" if solver.get('arranque') else "") + ")"
+                )
+
+            if contexto.get('sensibilidad'):
+                mostrar_sensibilidad(contexto['sensibilidad'])
 
             def calcular_escenario_hipotetico_detallado(contexto, planta_objetivo="AGUACHICA"):
                 """
@@ -514,27 +987,32 @@ if uploaded_file is not None:
                         'Var. (%)': '{:.2%}'
                     })
                     
-                    # Función interna para colorear la variación
-                    def color_var(val, concepto):
-                        if 'Valorización' in concepto or 'Valor Carne' in concepto:
-                            # Para ingresos/utilidad: Positivo es verde (Mejor), Negativo es rojo
-                            color = '#2ca02c' if val > 0 else '#d62728'
-                        else:
-                            # Para costos: Negativo es verde (Ahorro), Positivo es rojo (Sobrecosto)
-                            # Como diff = Optimo - Aguachica, si es negativo significa que Optimo es más barato
-                            color = '#2ca02c' if val < 0 else '#d62728'
-                        return f'color: {color}; font-weight: bold'
+                    # Función interna para colorear la variación (vectorizada sobre toda la tabla)
+                    def color_var(df):
+                        styles = pd.DataFrame('', index=df.index, columns=df.columns)
+                        es_ingreso = df['Concepto'].str.contains('Valorización|Valor Carne')
+                        # Para ingresos/utilidad: Positivo es verde (Mejor), Negativo es rojo
+                        # Para costos: Negativo es verde (Ahorro), Positivo es rojo (Sobrecosto)
+                        # Como diff = Optimo - Aguachica, si es negativo significa que Optimo es más barato
+                        favorable = np.where(es_ingreso, df['Var. (%)'] > 0, df['Var. (%)'] < 0)
+                        color = np.where(favorable, '#2ca02c', '#d62728')
+                        styles['Var. (%)'] = [f'color: {c}; font-weight: bold' for c in color]
+                        return styles
 
-                    # Aplicar colores a la columna Var. (%)
-                    styler.apply(lambda x: [color_var(x['Var. (%)'], x['Concepto']) if col == 'Var. (%)' else '' for col in x.index], axis=1)
-                    
                     # Negrita a la fila de Valorización Total
-                    styler.apply(lambda x: ['background-color: #f0f0f0; font-weight: bold' if x['Concepto'] == 'Valorización Total' else '' for _ in x], axis=1)
+                    def resaltar_total(df):
+                        styles = pd.DataFrame('', index=df.index, columns=df.columns)
+                        styles.loc[df['Concepto'] == 'Valorización Total', :] = 'background-color: #f0f0f0; font-weight: bold'
+                        return styles
+
+                    # Aplicar colores a la columna Var. (%)
+                    styler.apply(color_var, axis=None)
+                    styler.apply(resaltar_total, axis=None)
                     
                     return styler
 
                 # 4. Mostrar la tabla
-                st.dataframe(estilo_comparativo_final(df_comparativo.style), use_container_width=True)
+                mostrar_styler(estilo_comparativo_final(df_comparativo.style), use_container_width=True)
                 
                 # 5. Mostrar Métrica de resumen
                 val_opt_total = costos['Valorización Total']
@@ -551,18 +1029,6 @@ if uploaded_file is not None:
             st.markdown("---")
             st.subheader("📊 Análisis Detallado por Zona")
             
-            # Función auxiliar para obtener el valor de una variable PuLP
-            def obtener_valor_pulp(variable):
-                """Obtiene el valor de una variable PuLP, manejando diferentes tipos."""
-                if variable is None:
-                    return 0
-                elif hasattr(variable, 'varValue'):
-                    return variable.varValue if variable.varValue is not None else 0
-                elif isinstance(variable, (int, float)):
-                    return variable
-                else:
-                    return 0
-    
             if 'contexto' in st.session_state:
                 zonas_disponibles = contexto['Zona']
                 
@@ -570,338 +1036,11 @@ if uploaded_file is not None:
                 tab1, tab2 = st.tabs(["📈 Análisis por Zona", "🚚 Análisis de Transporte"])
                 
                 with tab1:
-                    col1, col2 = st.columns([1, 3])
-                    
-                    with col1:
-                        zona_seleccionada = st.selectbox(
-                            "Seleccionar Zona para análisis:",
-                            options=zonas_disponibles,
-                            key="zona_selector"
-                        )
-                        
-                        # Opción para ver datos por planta o consolidado
-                        vista_tipo = st.radio(
-                            "Tipo de vista:",
-                            ["Consolidado", "Por Planta"],
-                            key=f"vista_{zona_seleccionada}"
-                        )
-                    
-                    with col2:
-                        # Calcular resumen para la zona seleccionada
-                        zona_data = []
-                        semanas = contexto['Semana']
-                        plantas = contexto['Planta_S']
-                        
-                        for t in semanas:
-                            for p in plantas:
-                                # Obtener valores con manejo seguro
-                                res_int_var = contexto['variables']['res_int'].get((zona_seleccionada, p, t))
-                                res_comp_var = contexto['variables']['res_comp'].get((zona_seleccionada, p, t))
-                                
-                                res_int_val = obtener_valor_pulp(res_int_var)
-                                res_comp_val = obtener_valor_pulp(res_comp_var)
-                                
-                                if res_int_val > 0 or res_comp_val > 0:
-                                    # Obtener valores unitarios
-                                    precio_int = contexto['parametros']['Precio_Int'].get(zona_seleccionada, 0)
-                                    precio_comp = contexto['parametros']['Precio_Comp'].get(zona_seleccionada, 0)
-                                    costo_sac = contexto['parametros']['Costo_Sac'].get(p, 0)
-                                    peso_res = contexto['parametros']['Peso_Res'].get(zona_seleccionada, 0)
-                                    rendimiento = contexto['parametros']['rdto'].get((zona_seleccionada, p), 0)
-                                    valor_kg = contexto['parametros']['valor_kg']
-                                    
-                                    # Calcular costos
-                                    costo_int_total = res_int_val * precio_int
-                                    costo_comp_total = res_comp_val * precio_comp
-                                    costo_sac_int = res_int_val * costo_sac
-                                    costo_sac_comp = res_comp_val * costo_sac
-                                    
-                                    # Calcular ingresos
-                                    ingreso_int = res_int_val * peso_res * rendimiento * valor_kg
-                                    ingreso_comp = res_comp_val * peso_res * rendimiento * valor_kg
-                                    
-                                    zona_data.append({
-                                        'Semana': t,
-                                        'Planta': p,
-                                        'Reses Int': int(res_int_val),
-                                        'Reses Comp': int(res_comp_val),
-                                        'Costo Int ($)': round(costo_int_total, 2),
-                                        'Costo Comp ($)': round(costo_comp_total, 2),
-                                        'Costo Sac Int ($)': round(costo_sac_int, 2),
-                                        'Costo Sac Comp ($)': round(costo_sac_comp, 2),
-                                        'Ingreso Int ($)': round(ingreso_int, 2),
-                                        'Ingreso Comp ($)': round(ingreso_comp, 2)
-                                    })                     
-                        if zona_data:
-                            df_zona = pd.DataFrame(zona_data)
-                            
-                            # Mostrar métricas resumidas
-                            st.subheader(f"Resumen - {zona_seleccionada}")
-                            col_a, col_b, col_c, col_d = st.columns(4)
-                            
-                            with col_a:
-                                total_integradas = df_zona['Reses Int'].sum()
-                                st.metric(
-                                    label="Reses Integradas",
-                                    value=f"{total_integradas:,.0f}"
-                                )
-                            
-                            with col_b:
-                                total_compradas = df_zona['Reses Comp'].sum()
-                                st.metric(
-                                    label="Reses Compradas",
-                                    value=f"{total_compradas:,.0f}"
-                                )
-                            
-                            with col_c:
-                                total_costo_reses = df_zona['Costo Int ($)'].sum() + df_zona['Costo Comp ($)'].sum()
-                                st.metric(
-                                    label="Costo Total Reses",
-                                    value=f"${total_costo_reses:,.0f}"
-                                )
-                            
-                            with col_d:
-                                total_ingreso = df_zona['Ingreso Int ($)'].sum() + df_zona['Ingreso Comp ($)'].sum()
-                                st.metric(
-                                    label="Ingreso Total",
-                                    value=f"${total_ingreso:,.0f}"
-                                )
-                            
-                            # 1. Definición de nombres y formatos
-                            # 1. Definición de nombres y formatos
-                            nombres_descriptivos = {
-                                'Reses Int': 'Reses Integradas',
-                                'Reses Comp': 'Reses Compradas',
-                                'Total Reses': 'Total Reses',
-                                
-                                'Costo Int ($)': 'Costo Reses Integradas',
-                                'Costo Comp ($)': 'Costo Reses Compradas',
-                                'Subtotal Reses': 'SUBTOTAL: Costos de Reses',
-                                
-                                'Costo Sac Int ($)': 'Costo Sacrificio Int.',
-                                'Costo Sac Comp ($)': 'Costo Sacrificio Comp.',
-                                'Subtotal Sac': 'SUBTOTAL: Costos de Sacrificio',
-                                
-                                'Ingreso Int ($)': 'Ingreso Carne Int.',
-                                'Ingreso Comp ($)': 'Ingreso Carne Comp.',
-                                'Subtotal Ing': 'SUBTOTAL: Ingresos por Carne'
-                            }
-    
-                            def generar_tabla_semanas_filas(df_source, tipo_tabla="Unidades"):
-                                """Genera tabla con Semanas en filas y variables en columnas."""
-                                df = df_source.copy()
-                                df['Semana'] = df['Semana'].astype(str)
-                                
-                                if tipo_tabla == "Unidades":
-                                    cols = ['Semana', 'Reses Int', 'Reses Comp']
-                                    df_view = df[cols].copy()
-                                    df_view['Total Reses'] = df_view['Reses Int'] + df_view['Reses Comp']
-                                    
-                                    total_row = {'Semana': 'TOTAL'}
-                                    for col in ['Reses Int', 'Reses Comp', 'Total Reses']:
-                                        total_row[col] = df_view[col].sum()
-                                        
-                                    df_view = pd.concat([df_view, pd.DataFrame([total_row])], ignore_index=True)
-                                    df_view = df_view.rename(columns=nombres_descriptivos)
-                                    df_view = df_view.set_index('Semana')
-                                    return df_view.style.format("{:,.0f}")
-                            
-                                elif tipo_tabla == "Financiera":
-                                    df['Subtotal Reses'] = df['Costo Int ($)'] + df['Costo Comp ($)']
-                                    df['Subtotal Sac'] = df['Costo Sac Int ($)'] + df['Costo Sac Comp ($)']
-                                    df['Subtotal Ing'] = df['Ingreso Int ($)'] + df['Ingreso Comp ($)']
-                                    
-                                    cols_ordenadas = [
-                                        'Semana',
-                                        'Costo Int ($)', 'Costo Comp ($)', 'Subtotal Reses',
-                                        'Costo Sac Int ($)', 'Costo Sac Comp ($)', 'Subtotal Sac',
-                                        'Ingreso Int ($)', 'Ingreso Comp ($)', 'Subtotal Ing'
-                                    ]
-                                    df_view = df[cols_ordenadas].copy()
-                                    
-                                    total_row = {'Semana': 'TOTAL'}
-                                    for col in cols_ordenadas[1:]:
-                                        total_row[col] = df_view[col].sum()
-                                        
-                                    df_view = pd.concat([df_view, pd.DataFrame([total_row])], ignore_index=True)
-                                    df_view = df_view.rename(columns=nombres_descriptivos)
-                                    df_view = df_view.set_index('Semana')
-                                    
-                                    def estilo_financiero_columnas(df_styler):
-                                        styler = df_styler.format("${:,.0f}")
-                                        cols_costos = [c for c in df_view.columns if 'Costo' in c and 'SUBTOTAL' not in c]
-                                        cols_ingresos = [c for c in df_view.columns if 'Ingreso' in c and 'SUBTOTAL' not in c]
-                                        cols_subtotales = [c for c in df_view.columns if 'SUBTOTAL' in c]
-                                        
-                                        # Aplicar colores a las columnas
-                                        styler.applymap(lambda x: 'color: #d62728;', subset=cols_costos) # Rojo
-                                        styler.applymap(lambda x: 'color: #2ca02c;', subset=cols_ingresos) # Verde
-                                        styler.applymap(lambda x: 'font-weight: bold; background-color: #f0f0f0; color: black;', subset=cols_subtotales)
-                                        
-                                        # CORRECCIÓN AQUÍ: Función para resaltar la fila TOTAL sin usar subset problemático
-                                        def highlight_total_row(row):
-                                            if row.name == 'TOTAL':
-                                                return ['font-weight: bold; border-top: 2px solid black; background-color: #e6e6e6; color: black'] * len(row)
-                                            return [''] * len(row)
-                            
-                                        # Aplicar a todas las filas (axis=1), la lógica interna filtra 'TOTAL'
-                                        styler.apply(highlight_total_row, axis=1)
-                                        
-                                        return styler
-                            
-                                    return estilo_financiero_columnas(df_view.style)
-    
-                            # --- Visualización ---
-                            if vista_tipo == "Consolidado":
-                                df_consolidado = df_zona.groupby('Semana').agg({
-                                    'Reses Int': 'sum', 'Reses Comp': 'sum',
-                                    'Costo Int ($)': 'sum', 'Costo Comp ($)': 'sum',
-                                    'Costo Sac Int ($)': 'sum', 'Costo Sac Comp ($)': 'sum',
-                                    'Ingreso Int ($)': 'sum', 'Ingreso Comp ($)': 'sum'
-                                }).reset_index()
-                                
-                                st.subheader(f"📊 Unidades por Semana - {zona_seleccionada}")
-                                st.dataframe(generar_tabla_semanas_filas(df_consolidado, "Unidades"), use_container_width=True)
-                                
-                                st.subheader(f"💰 Costos e Ingresos por Semana - {zona_seleccionada}")
-                                st.dataframe(generar_tabla_semanas_filas(df_consolidado, "Financiera"), use_container_width=True)
-    
-                            else:  # Vista por Planta
-                                plantas_disponibles = sorted(df_zona['Planta'].unique())
-                                planta_seleccionada = st.selectbox("Seleccionar Planta:", plantas_disponibles, key=f"planta_{zona_seleccionada}")
-                                df_planta = df_zona[df_zona['Planta'] == planta_seleccionada]
-                                
-                                if not df_planta.empty:
-                                    st.subheader(f"Resumen Planta {planta_seleccionada}")
-                                    c1, c2, c3, c4 = st.columns(4)
-                                    c1.metric("Total Reses", f"{df_planta['Reses Int'].sum() + df_planta['Reses Comp'].sum():,.0f}")
-                                    c2.metric("Costo Reses", f"${df_planta['Costo Int ($)'].sum() + df_planta['Costo Comp ($)'].sum():,.0f}")
-                                    c3.metric("Costo Sacrificio", f"${df_planta['Costo Sac Int ($)'].sum() + df_planta['Costo Sac Comp ($)'].sum():,.0f}")
-                                    c4.metric("Ingreso Total", f"${df_planta['Ingreso Int ($)'].sum() + df_planta['Ingreso Comp ($)'].sum():,.0f}")
-    
-                                    st.subheader(f"📊 Unidades - {planta_seleccionada}")
-                                    st.dataframe(generar_tabla_semanas_filas(df_planta, "Unidades"), use_container_width=True)
-                                    
-                                    st.subheader(f"💰 Costos e Ingresos - {planta_seleccionada}")
-                                    st.dataframe(generar_tabla_semanas_filas(df_planta, "Financiera"), use_container_width=True)
-                                else:
-                                    st.info(f"No hay datos para la planta {planta_seleccionada}")
-                
+                    mostrar_analisis_zona(contexto)
+
                 with tab2:
-                    st.subheader("🚚 Análisis de Costos de Transporte por Zona")
-                    
-                    # Seleccionar zona para análisis de transporte
-                    zona_transporte = st.selectbox(
-                        "Seleccionar Zona para análisis de transporte:",
-                        options=zonas_disponibles,
-                        key="zona_transporte_selector"
-                    )
-                    
-                    # Calcular costos de transporte para la zona seleccionada
-                    transporte_data = []
-                    semanas = contexto['Semana']
-                    plantas = contexto['Planta_S']
-                    
-                    for t in semanas:
-                        for p in plantas:
-                            viaje_int_var = contexto['variables']['viaje_int'].get((zona_transporte, p, t))
-                            viaje_com_var = contexto['variables']['viaje_com'].get((zona_transporte, p, t))
-                            
-                            viaje_int_val = obtener_valor_pulp(viaje_int_var)
-                            viaje_com_val = obtener_valor_pulp(viaje_com_var)
-                            
-                            if viaje_int_val > 0 or viaje_com_val > 0:
-                                costo_viaje_int = contexto['parametros'].get('Costo_Viaje_Int', {}).get((zona_transporte, p), 0)
-                                costo_viaje_comp = contexto['parametros'].get('Costo_Viaje_Comp', {}).get((zona_transporte, p), 0)
-                                
-                                transporte_data.append({
-                                    'Semana': t,
-                                    'Planta Destino': p,
-                                    'Viajes Integrados': int(viaje_int_val),
-                                    'Viajes Comprados': int(viaje_com_val),
-                                    'Costo por Viaje Int ($)': costo_viaje_int,
-                                    'Costo por Viaje Comp ($)': costo_viaje_comp,
-                                    'Costo Total Int ($)': viaje_int_val * costo_viaje_int,
-                                    'Costo Total Comp ($)': viaje_com_val * costo_viaje_comp
-                                })
-                    
-                    if transporte_data:
-                        df_transporte = pd.DataFrame(transporte_data)
-                        
-                        # Calcular totales
-                        total_viajes_int = df_transporte['Viajes Integrados'].sum()
-                        total_viajes_comp = df_transporte['Viajes Comprados'].sum()
-                        total_costo_int = df_transporte['Costo Total Int ($)'].sum()
-                        total_costo_comp = df_transporte['Costo Total Comp ($)'].sum()
-                        
-                        # Mostrar métricas
-                        st.subheader("Resumen de Transporte")
-                        col1, col2, col3, col4 = st.columns(4)
-                        with col1:
-                            st.metric("Viajes Integrados", f"{total_viajes_int:,.0f}")
-                        with col2:
-                            st.metric("Viajes Comprados", f"{total_viajes_comp:,.0f}")
-                        with col3:
-                            st.metric("Costo Transp. Int", f"${total_costo_int:,.0f}")
-                        with col4:
-                            st.metric("Costo Transp. Comp", f"${total_costo_comp:,.0f}")
-                        
-                        # Mostrar tabla detallada
-                        st.subheader("Detalle por Semana y Planta")
-                        st.dataframe(
-                            df_transporte.style.format({
-                                'Semana': '{:.2f}',  # <--- ESTA LÍNEA ELIMINA LOS CEROS EXTRA
-                                'Viajes Integrados': '{:,.0f}',
-                                'Viajes Comprados': '{:,.0f}',
-                                'Costo por Viaje Int ($)': '${:,.0f}',
-                                'Costo por Viaje Comp ($)': '${:,.0f}',
-                                'Costo Total Int ($)': '${:,.0f}',
-                                'Costo Total Comp ($)': '${:,.0f}'
-                            }),
-                            use_container_width=True,
-                            height=300
-                        )
-                        
-                        # Gráfico de costos de transporte por semana
-                        st.subheader("Evolución Semanal de Costos de Transporte")
-                        
-                        if not df_transporte.empty:
-                            df_transporte_semanal = df_transporte.groupby('Semana').agg({
-                                'Costo Total Int ($)': 'sum',
-                                'Costo Total Comp ($)': 'sum'
-                            }).reset_index()
-                            
-                            try:
-                                import plotly.express as px
-                                df_transporte_semanal_melted = pd.melt(
-                                    df_transporte_semanal,
-                                    id_vars=['Semana'],
-                                    value_vars=['Costo Total Int ($)', 'Costo Total Comp ($)'],
-                                    var_name='Tipo Transporte',
-                                    value_name='Costo'
-                                )
-                                
-                                fig = px.bar(
-                                    df_transporte_semanal_melted,
-                                    x='Semana',
-                                    y='Costo',
-                                    color='Tipo Transporte',
-                                    title=f"Costos de Transporte por Semana - {zona_transporte}",
-                                    labels={'Costo': 'Costo ($)', 'Semana': 'Semana'},
-                                    barmode='group'
-                                )
-                                fig.update_layout(
-                                    yaxis_tickformat=',.0f',
-                                    hovermode='x unified'
-                                )
-                                st.plotly_chart(fig, use_container_width=True)
-                            except:
-                                # Fallback a gráfico de barras simple
-                                chart_data = df_transporte_semanal.set_index('Semana')
-                                st.bar_chart(chart_data)
-                    else:
-                        st.info(f"⚠️ No hay costos de transporte para la zona {zona_transporte} en la solución óptima.")
-                
+                    mostrar_analisis_transporte(contexto)
+
                 # Resumen ejecutivo por zona
                 st.subheader("📋 Resumen Ejecutivo por Zona")
                 
@@ -956,7 +1095,7 @@ if uploaded_file is not None:
                 df_resumen_zonas = pd.DataFrame(resumen_zonas)
                 
                 # Mostrar resumen
-                st.dataframe(
+                mostrar_styler(
                     df_resumen_zonas.style.format({
                         'Reses Integradas': '{:,.0f}',
                         'Reses Compradas': '{:,.0f}',
@@ -972,6 +1111,12 @@ if uploaded_file is not None:
 else:
     st.info("Por favor cargue un archivo Excel con los parámetros del modelo en el panel lateral")
 
+# Plantilla de Excel en memoria: se genera una sola vez por proceso (cacheada)
+# en lugar de reescribirse con openpyxl en cada rerun del script
+@st.cache_data(show_spinner=False)
+def generar_plantilla():
+    return optimizacion.plantilla_excel()
+
 # Plantilla de Excel (opcional)
 with st.expander("Descargar plantilla de Excel"):
     st.write("""
@@ -991,101 +1136,26 @@ with st.expander("Descargar plantilla de Excel"):
     - **RENDIMIENTO**: Rendimiento por zona y planta
     - **PRECIOKG**: Precio por kg por zona
     - **PESORES**: Peso de res por zona
-    """)
     
-    # Crear archivo Excel de ejemplo en memoria
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-       
-        Zonas = ['ANTIOQUIA','VALLEDUPAR','COSTA','MAGDALENA MEDIO', 'LLANOS', 'SUR DEL CESAR', 'MAGDALENA MEDIO NORTE']
-        Semanas = ['27.2025', '28.2025', '29.2025', '30.2025']
-        Plantas = ['AGUACHICA','FRIGOSINU','CENTRAL GANADERA','FRIOGAN DORADA','COROZAL']
-        # Hoja de ejemplo para Oferta
-        pd.DataFrame({
-            'ZONA': [zona for zona in Zonas for _ in Semanas],
-            'SEMANA': Semanas * len(Zonas),
-            'OFERTA': 25
-        }).to_excel(writer, sheet_name='Oferta', index=False)
-        
-        # Hoja de ejemplo para Demanda
-        pd.DataFrame({
-            'SEMANA': Semanas,
-            'DEMANDA': 100
-        }).to_excel(writer, sheet_name='Demanda', index=False)
-        
-        # Hoja de ejemplo para CV_PDN
-        pd.DataFrame({
-            'PLANTA': Plantas,
-            'CV_PDN': 130000
-        }).to_excel(writer, sheet_name='CV_PDN', index=False)
-        
-        # Hoja de ejemplo para Costos de transporte de zonas a plantas integradas
-        pd.DataFrame({
-            'ZONA': [zona for zona in Zonas for _ in Plantas],
-            'PLANTA': Plantas * len(Zonas),
-            'C_TRANS_ZF': 1200000
-        }).to_excel(writer, sheet_name='CTransporteZF', index=False)
-        
-        # Hoja de ejemplo para RENDIMIENTO
-        pd.DataFrame({
-            'ZONA': [zona for zona in Zonas for _ in Plantas],
-            'PLANTA': Plantas * len(Zonas),
-            'RDTO': 0.55
-        }).to_excel(writer, sheet_name='RENDIMIENTO', index=False)
-        # Hoja de ejemplo para Diponibilidad de compra
-        pd.DataFrame({
-            'ZONA': [zona for zona in Zonas for _ in Semanas],
-            'SEMANA': Semanas * len(Zonas),
-            'DISPONIBLE': 25
-        }).to_excel(writer, sheet_name='Compras', index=False)
-        # Hoja de ejemplo para Capacidad de planta
-        pd.DataFrame({
-            'PLANTA': Plantas,
-            'CAP_PLANTA': 50
-        }).to_excel(writer, sheet_name='Cap_Planta', index=False) 
-        # Hoja de ejemplo para Costos de transporte de zonas a plantas de reses compradas
-        pd.DataFrame({
-            'ZONA': [zona for zona in Zonas for _ in Plantas],
-            'PLANTA': Plantas * len(Zonas),
-            'C_TRANS_ZF': 1200000
-        }).to_excel(writer, sheet_name='CTransporteZFC', index=False)   
-        # Hoja de ejemplo para Costos de transporte de plantas a Envigado
-        pd.DataFrame({
-            'PLANTA': Plantas,
-            'C_TRANS_E': 4000000
-        }).to_excel(writer, sheet_name='CTransporteE', index=False) 
-        #Hoja de ejemplo para el promedio de peso de reses en cada zona
-        pd.DataFrame({
-            'ZONA': Zonas,
-            'PESO': 400
-        }).to_excel(writer,sheet_name='PESORES',index=False)
-        #Hoja de ejemplo para el precio por kg negociado en cada zona
-        pd.DataFrame({
-            'ZONA': Zonas,
-            'PRECIO': 8000
-        }).to_excel(writer,sheet_name='PRECIOKG',index=False)
-        #Hoja de ejemplo para el Costo de reses compradas en cada zona
-        pd.DataFrame({
-            'ZONA': Zonas,
-            'PRECIO': 2500000
-        }).to_excel(writer,sheet_name='CR_CROMPRADA',index=False)
-        #Hoja de ejemplo para el Costo de reses integradas en cada zona
-        pd.DataFrame({
-            'ZONA': Zonas,
-            'PRECIO': 1500000
-        }).to_excel(writer,sheet_name='CR_INTEGRADA',index=False)     
+    Las hojas **Oferta** y **Compras** también pueden venir a nivel diario (columna
+    FECHA en lugar de SEMANA) y con filas por finca: se agregan automáticamente
+    por ZONA y SEMANA al cargar el archivo.
+    """)
     
     st.download_button(
         label="Descargar plantilla",
-        data=output.getvalue(),
+        data=generar_plantilla(),
         file_name="plantilla_sacrificio_reses.xlsx",
         mime="application/vnd.ms-excel"
 
     )
 
-
-
-
-
-
-
+# Tiempo hasta el primer render de la sesión (se registra una sola vez por sesión)
+_tiempo_render = time.perf_counter() - _inicio_script
+if 'tiempo_primer_render' not in st.session_state:
+    st.session_state['tiempo_primer_render'] = _tiempo_render
+with st.sidebar:
+    st.caption(
+        f"⏱️ Primer render: {st.session_state['tiempo_primer_render']:.2f} s · "
+        f"Último rerun: {_tiempo_render:.2f} s"
+    )
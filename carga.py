@@ -0,0 +1,412 @@
+"""
+Prueba de carga de la aplicación de Streamlit con varias sesiones simultáneas.
+
+Para cada número de sesiones se levanta un servidor `streamlit run App.py` y se
+conectan a él N sesiones concurrentes por su websocket, como lo haría el
+navegador. Cada sesión recorre el flujo de un planeador: abrir la aplicación,
+cargar la plantilla generada, editar la hoja Oferta, ejecutar el modelo y
+cambiar de zona en el análisis. Como en producción, las sesiones comparten el
+proceso del servidor: la caché de archivos, la caché de semanas y el
+planificador del solver (MAX_SOLUCIONES_SIMULTANEAS). Se reportan los tiempos
+de respuesta p50/p95 por paso, la memoria pico y el CPU por sesión del servidor
+(solvers incluidos).
+
+Cada número de sesiones usa un servidor nuevo, para que las cachés de una
+medición no aceleren la siguiente, y con la misma semilla de hash de Python
+(--semilla-hash), de la que depende el tiempo de CBC. Por defecto cada sesión edita datos
+distintos (no se reutilizan soluciones de otras sesiones); con --mismos-datos
+todas envían los mismos datos y el planificador resuelve una sola vez.
+
+Uso:
+    python carga.py [--sesiones 1 2 4 8] [--salida reporte_carga.json] [--mismos-datos]
+                    [--puerto 8599] [--semilla-hash 0]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import requests
+
+import optimizacion
+
+RUTA_APP = Path(__file__).with_name('App.py')
+PASOS = ('inicio', 'carga', 'edicion', 'modelo', 'fragmento')
+
+
+def _memoria_mb(pid=None):
+    """
+    Memoria residente en MB del proceso `pid` (por defecto, este) y de todos sus
+    descendientes, leída de /proc. None fuera de Linux.
+    """
+    pid = pid or os.getpid()
+    try:
+        with open(f'/proc/{pid}/statm') as archivo:
+            total = int(archivo.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, IndexError):
+        return None
+    try:
+        hijos = []
+        for tarea in os.listdir(f'/proc/{pid}/task'):
+            with open(f'/proc/{pid}/task/{tarea}/children') as archivo:
+                hijos += archivo.read().split()
+    except OSError:
+        hijos = []
+    for hijo in hijos:
+        total += _memoria_mb(int(hijo)) or 0
+    return total
+
+
+def _cpu_s(pid):
+    """
+    Segundos de CPU del proceso `pid` y de sus hijos ya terminados (los
+    solvers), leídos de /proc. None fuera de Linux.
+    """
+    try:
+        with open(f'/proc/{pid}/stat') as archivo:
+            # Los campos después del nombre: utime, stime, cutime y cstime son 11-14
+            campos = archivo.read().rsplit(')', 1)[1].split()
+        return sum(int(c) for c in campos[11:15]) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class MedidorMemoria(threading.Thread):
+    """Muestrea la memoria residente del árbol de procesos de `pid` y guarda el pico."""
+
+    def __init__(self, pid=None, intervalo=0.1):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.intervalo = intervalo
+        self.pico = _memoria_mb(pid)
+        self._detener = threading.Event()
+
+    def run(self):
+        while not self._detener.wait(self.intervalo):
+            actual = _memoria_mb(self.pid)
+            if actual is not None:
+                self.pico = max(self.pico or 0, actual)
+
+    def detener(self):
+        self._detener.set()
+        self.join()
+        return self.pico
+
+
+def iniciar_servidor(puerto, semilla_hash=0, tiempo_espera=60):
+    """Lanza `streamlit run App.py` en `puerto` y espera a que responda."""
+    proceso = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', str(RUTA_APP),
+         '--server.port', str(puerto), '--server.headless', 'true',
+         # Clientes sin navegador: sin cookie XSRF ni recarga al cambiar archivos
+         '--server.enableXsrfProtection', 'false', '--server.fileWatcherType', 'none',
+         '--browser.gatherUsageStats', 'false'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        # El orden de las variables del modelo depende del hash de Python y el
+        # tiempo de CBC con él: semilla fija para comparar mediciones
+        env=dict(os.environ, PYTHONHASHSEED=str(semilla_hash)),
+    )
+    limite = time.monotonic() + tiempo_espera
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError(f"El servidor de Streamlit terminó con código {proceso.returncode}")
+        try:
+            if requests.get(f'http://127.0.0.1:{puerto}/_stcore/health', timeout=1).ok:
+                return proceso
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    detener_servidor(proceso)
+    raise RuntimeError(f"El servidor de Streamlit no respondió en {tiempo_espera} s")
+
+
+def detener_servidor(proceso):
+    proceso.terminate()
+    try:
+        proceso.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proceso.kill()
+        proceso.wait()
+
+
+class SesionStreamlit:
+    """
+    Sesión de navegador simulada: envía ejecuciones del script (BackMsg) por el
+    websocket del servidor y recoge los elementos de la página (ForwardMsg).
+    Los valores de los widgets se conservan entre ejecuciones, como en el
+    navegador; los botones solo se pulsan en la ejecución en que se indican.
+    """
+
+    def __init__(self, puerto, tiempo_espera=600):
+        self.puerto = puerto
+        self.tiempo_espera = tiempo_espera
+        self.ws = None
+        self.id_sesion = None
+        self.elementos = []  # (tipo, elemento, id del fragmento) de la última ejecución
+        self.widgets = {}  # id del widget -> (campo del WidgetState, valor)
+
+    async def conectar(self):
+        import websockets
+
+        self.ws = await websockets.connect(f'ws://127.0.0.1:{self.puerto}/_stcore/stream',
+                                           subprotocols=['streamlit'], max_size=None)
+
+    async def cerrar(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def _recibir(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        mensaje = ForwardMsg()
+        mensaje.ParseFromString(await asyncio.wait_for(self.ws.recv(), self.tiempo_espera))
+        return mensaje
+
+    async def ejecutar(self, pulsar=(), fragmento=None):
+        """
+        Ejecuta el script (o solo `fragmento`) con los valores actuales de los
+        widgets y los botones de `pulsar`, y espera a que termine, incluidas las
+        re-ejecuciones de st.rerun. Devuelve los elementos de la página.
+        """
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        mensaje = BackMsg()
+        estado = mensaje.rerun_script
+        estado.SetInParent()
+        for id_widget, (campo, valor) in self.widgets.items():
+            widget = estado.widget_states.widgets.add(id=id_widget)
+            if campo == 'file_uploader_state_value':
+                widget.file_uploader_state_value.CopyFrom(valor)
+            else:
+                setattr(widget, campo, valor)
+        for id_widget in pulsar:
+            estado.widget_states.widgets.add(id=id_widget, trigger_value=True)
+        if fragmento:
+            estado.fragment_id = fragmento
+        await self.ws.send(mensaje.SerializeToString())
+
+        elementos = []
+        while True:
+            mensaje = await self._recibir()
+            tipo = mensaje.WhichOneof('type')
+            if tipo == 'new_session':
+                self.id_sesion = mensaje.new_session.initialize.session_id or self.id_sesion
+                elementos = []
+            elif tipo == 'delta' and mensaje.delta.WhichOneof('type') == 'new_element':
+                elemento = mensaje.delta.new_element
+                tipo_elemento = elemento.WhichOneof('type')
+                elementos.append((tipo_elemento, getattr(elemento, tipo_elemento), mensaje.delta.fragment_id))
+            elif tipo == 'script_finished':
+                if mensaje.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    break
+        if fragmento:
+            # Solo se reciben los elementos del fragmento: se reemplazan en la página
+            elementos = [e for e in self.elementos if e[2] != fragmento] + elementos
+        self.elementos = elementos
+        return elementos
+
+    def buscar(self, tipo, etiqueta=None, clave=None):
+        """Primer elemento de `tipo` cuya etiqueta empieza por `etiqueta` o con la clave `clave`."""
+        for tipo_elemento, elemento, fragmento in self.elementos:
+            if tipo_elemento != tipo:
+                continue
+            if etiqueta is not None and not elemento.label.startswith(etiqueta):
+                continue
+            if clave is not None and not elemento.id.endswith(f'-{clave}'):
+                continue
+            return elemento, fragmento
+        raise LookupError(f"No se encontró {tipo} {etiqueta or clave or ''} en la página")
+
+    def errores(self):
+        """Excepciones y mensajes de error mostrados en la página."""
+        from streamlit.proto.Alert_pb2 import Alert
+
+        return [elemento.message if tipo == 'exception' else elemento.body
+                for tipo, elemento, _ in self.elementos
+                if tipo == 'exception' or (tipo == 'alert' and elemento.format == Alert.ERROR)]
+
+    async def subir_archivo(self, id_widget, nombre, contenido):
+        """Sube un archivo al servidor (como el navegador) y lo asigna al file_uploader."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.Common_pb2 import FileUploaderState
+
+        mensaje = BackMsg()
+        mensaje.file_urls_request.request_id = nombre
+        mensaje.file_urls_request.file_names.append(nombre)
+        mensaje.file_urls_request.session_id = self.id_sesion
+        await self.ws.send(mensaje.SerializeToString())
+        while (respuesta := await self._recibir()).WhichOneof('type') != 'file_urls_response':
+            pass
+        urls = respuesta.file_urls_response.file_urls[0]
+        subida = await asyncio.to_thread(requests.put, f'http://127.0.0.1:{self.puerto}{urls.upload_url}',
+                                         files={'file': (nombre, contenido)}, timeout=60)
+        subida.raise_for_status()
+
+        estado = FileUploaderState()
+        estado.uploaded_file_info.add(name=nombre, size=len(contenido), file_id=urls.file_id, file_urls=urls)
+        self.widgets[id_widget] = ('file_uploader_state_value', estado)
+
+
+def _cambios_sesion(datos, indice, filas_pagina):
+    """
+    Ediciones del editor (posiciones de la primera página de Oferta, de
+    `filas_pagina` filas) con la oferta de una semana modificada según la sesión.
+    """
+    oferta = datos['Oferta']
+    semanas = sorted(oferta['SEMANA'].unique())
+    semana = semanas[indice % len(semanas)]
+    return {
+        'edited_rows': {
+            str(posicion): {'OFERTA': int(valor) + indice + 1}
+            for posicion, (fila_semana, valor) in enumerate(zip(oferta['SEMANA'], oferta['OFERTA']))
+            if fila_semana == semana and posicion < filas_pagina
+        },
+        'added_rows': [],
+        'deleted_rows': [],
+    }
+
+
+async def simular_sesion(indice, puerto, plantilla, datos):
+    """
+    Recorre el flujo de un planeador en una sesión y devuelve los segundos de
+    cada paso y los errores mostrados por la aplicación.
+    """
+    sesion = SesionStreamlit(puerto)
+    tiempos = {}
+    errores = []
+
+    async def medir(paso, accion):
+        inicio = time.perf_counter()
+        await accion()
+        tiempos[paso] = time.perf_counter() - inicio
+        errores.extend(f"{paso}: {error}" for error in sesion.errores())
+
+    async def abrir():
+        await sesion.conectar()
+        await sesion.ejecutar()
+
+    async def cargar():
+        archivo, _ = sesion.buscar('file_uploader', "Cargar archivo")
+        await sesion.subir_archivo(archivo.id, 'plantilla.xlsx', plantilla)
+        await sesion.ejecutar()
+
+    async def editar():
+        # Ver la hoja Oferta, editar la primera página y pulsar "Guardar cambios de esta página"
+        hoja, _ = sesion.buscar('selectbox', "Seleccionar hoja para visualizar")
+        sesion.widgets[hoja.id] = ('string_value', 'Oferta')
+        await sesion.ejecutar()
+        if indice is not None:
+            # Tamaño de la página tal como lo muestra la aplicación (opción elegida del selector)
+            filas, _ = sesion.buscar('selectbox', "Filas por página")
+            filas_pagina = int(sesion.widgets.get(filas.id, (None, filas.options[filas.default]))[1])
+            editor, _ = sesion.buscar('dataframe')
+            sesion.widgets[editor.id] = ('string_value', json.dumps(_cambios_sesion(datos, indice, filas_pagina)))
+            guardar, _ = sesion.buscar('button', "Guardar cambios")
+            await sesion.ejecutar(pulsar=[guardar.id])
+
+    async def resolver():
+        boton, _ = sesion.buscar('button', "Ejecutar Modelo")
+        await sesion.ejecutar(pulsar=[boton.id])
+
+    async def cambiar_zona():
+        zona, fragmento = sesion.buscar('selectbox', clave='zona_selector')
+        sesion.widgets[zona.id] = ('string_value', zona.options[-1])
+        await sesion.ejecutar(fragmento=fragmento)
+
+    try:
+        for paso, accion in zip(PASOS, (abrir, cargar, editar, resolver, cambiar_zona)):
+            await medir(paso, accion)
+    except Exception as e:
+        errores.append(f"{type(e).__name__}: {e}")
+    finally:
+        await sesion.cerrar()
+    return {'tiempos': tiempos, 'errores': errores}
+
+
+async def _simular_sesiones(n_sesiones, puerto, plantilla, datos, mismos_datos):
+    return await asyncio.gather(*(
+        simular_sesion(None if mismos_datos else i, puerto, plantilla, datos) for i in range(n_sesiones)
+    ))
+
+
+def medir_carga(n_sesiones, plantilla, datos, mismos_datos=False, puerto=8599, semilla_hash=0):
+    """Lanza `n_sesiones` simultáneas contra un servidor nuevo y resume tiempos, memoria y CPU."""
+    servidor = iniciar_servidor(puerto, semilla_hash)
+    try:
+        medidor = MedidorMemoria(servidor.pid)
+        medidor.start()
+        cpu_inicio = _cpu_s(servidor.pid)
+        inicio = time.perf_counter()
+        resultados = asyncio.run(_simular_sesiones(n_sesiones, puerto, plantilla, datos, mismos_datos))
+        duracion = time.perf_counter() - inicio
+        cpu_fin = _cpu_s(servidor.pid)
+        pico = medidor.detener()
+    finally:
+        detener_servidor(servidor)
+
+    pasos = []
+    for paso in PASOS:
+        valores = [r['tiempos'][paso] for r in resultados if paso in r['tiempos']]
+        if valores:
+            pasos.append({
+                'paso': paso,
+                'p50': float(np.percentile(valores, 50)),
+                'p95': float(np.percentile(valores, 95)),
+                'max': max(valores),
+                'sesiones_completas': len(valores),
+            })
+    return {
+        'sesiones': n_sesiones,
+        'duracion': duracion,
+        'memoria_pico_mb': pico,
+        'cpu_por_sesion_s': None if cpu_inicio is None or cpu_fin is None else (cpu_fin - cpu_inicio) / n_sesiones,
+        'errores': [e for r in resultados for e in r['errores']],
+        'pasos': pasos,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de la aplicación con sesiones simultáneas.")
+    parser.add_argument('--sesiones', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help="Números de sesiones simultáneas a probar (por defecto: 1 2 4 8)")
+    parser.add_argument('--mismos-datos', action='store_true',
+                        help="Todas las sesiones envían los mismos datos (sin editar)")
+    parser.add_argument('--puerto', type=int, default=8599, help="Puerto del servidor de Streamlit de la prueba")
+    parser.add_argument('--semilla-hash', type=int, default=0,
+                        help="PYTHONHASHSEED del servidor (por defecto: 0)")
+    parser.add_argument('--salida', default=None, help="Archivo JSON donde guardar el reporte")
+    args = parser.parse_args()
+
+    plantilla = optimizacion.plantilla_excel()
+    archivo = BytesIO(plantilla)
+    archivo.name = 'plantilla.xlsx'
+    datos = optimizacion.leer_libro(archivo)
+
+    reporte = []
+    for n_sesiones in args.sesiones:
+        resultado = medir_carga(n_sesiones, plantilla, datos, args.mismos_datos, args.puerto,
+                                args.semilla_hash)
+        reporte.append(resultado)
+        print(f"\n{n_sesiones} sesiones: {resultado['duracion']:.1f} s, "
+              f"memoria pico {resultado['memoria_pico_mb'] or 0:.0f} MB, "
+              f"CPU {resultado['cpu_por_sesion_s'] or 0:.2f} s por sesión, {len(resultado['errores'])} errores")
+        print(pd.DataFrame(resultado['pasos']).to_string(index=False, float_format='{:.2f}'.format))
+        for error in resultado['errores'][:5]:
+            print(f"  - {error}")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(reporte, archivo, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
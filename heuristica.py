@@ -0,0 +1,174 @@
+"""
+Heurística voraz de camiones completos como solución de arranque para CBC.
+
+Con los enlaces reses <= 14 * viajes y reses <= 84 * viajes a Envigado, CBC
+puede gastar buena parte del tiempo límite antes de encontrar un incumbente
+bueno. Esta heurística construye uno en milisegundos:
+
+1. Las rutas (integrada o comprada, zona -> planta) se ordenan por margen por
+   res: valor de la carne (PESORES x RDTO x valor_kg) menos el precio de la res,
+   el costo de sacrificio y los fletes amortizados por res (camión de 14 reses
+   desde la zona, de 84 hacia Envigado).
+2. Cada semana se llena la demanda en camiones completos de 14 reses, por orden
+   de margen, sin pasar la oferta, las compras ni la capacidad de planta.
+3. Lo que falte para completar la demanda se asigna, también por margen, en
+   camiones parciales.
+
+La solución se pasa a CBC como MIP start. Si alguna semana no se puede completar
+no hay arranque y CBC resuelve como siempre.
+
+Uso (tiempo al primer incumbente con y sin arranque):
+    python heuristica.py LIBRO.xlsx [LIBRO.xlsx ...] [--perfil interactivo] [--tiempo-limite 60]
+"""
+import argparse
+import math
+import time
+
+import pandas as pd
+
+RESES_POR_CAMION = 14
+RESES_POR_CAMION_ENVIGADO = 84
+
+
+def margenes_rutas(Zona, Planta_S, parametros):
+    """Rutas (margen, tipo, zona, planta) ordenadas de mayor a menor margen por res."""
+    valor_kg = parametros['valor_kg']
+    precios = {'res_int': parametros['Precio_Int'], 'res_comp': parametros['Precio_Comp']}
+    fletes = {'res_int': parametros['Costo_Viaje_Int'], 'res_comp': parametros['Costo_Viaje_Comp']}
+    rutas = []
+    for tipo in ('res_int', 'res_comp'):
+        for z in Zona:
+            for p in Planta_S:
+                margen = (
+                    parametros['Peso_Res'].get(z, 0) * parametros['rdto'].get((z, p), 0) * valor_kg
+                    - precios[tipo].get(z, 0)
+                    - parametros['Costo_Sac'].get(p, 0)
+                    - fletes[tipo].get((z, p), 0) / RESES_POR_CAMION
+                    # La función objetivo cobra el camión a Envigado una vez por zona
+                    - len(Zona) * parametros['Costo_Tans_PT'].get(p, 0) / RESES_POR_CAMION_ENVIGADO
+                )
+                rutas.append((margen, tipo, z, p))
+    rutas.sort(key=lambda ruta: ruta[0], reverse=True)
+    return rutas
+
+
+def llenar_semana(t, rutas, parametros):
+    """Reses {(tipo, zona, planta): reses} de la semana `t`, o None si no se completa la demanda."""
+    pendiente = parametros['Demanda'][t]
+    disponible = {}
+    for _, tipo, z, _ in rutas:
+        oferta = parametros['Oferta_Int'] if tipo == 'res_int' else parametros['Oferta_Com']
+        disponible[tipo, z] = oferta.get((z, t), 0)
+    capacidad = {p: parametros['Capacidad'].get(p, 0) for _, _, _, p in rutas}
+
+    reses = {}
+    for solo_completos in (True, False):
+        for _, tipo, z, p in rutas:
+            if pendiente <= 0:
+                break
+            cantidad = min(disponible[tipo, z], capacidad[p], pendiente)
+            if solo_completos:
+                cantidad -= cantidad % RESES_POR_CAMION
+            if cantidad <= 0:
+                continue
+            reses[tipo, z, p] = reses.get((tipo, z, p), 0) + cantidad
+            disponible[tipo, z] -= cantidad
+            capacidad[p] -= cantidad
+            pendiente -= cantidad
+    return reses if pendiente <= 0 else None
+
+
+def solucion_voraz(Zona, Planta_S, Semana, parametros, variables):
+    """
+    Valores {nombre de variable: valor} de la solución voraz para todas las
+    variables de `variables`, o None si alguna semana no se puede completar.
+    """
+    rutas = margenes_rutas(Zona, Planta_S, parametros)
+    valores = {}
+    for t in Semana:
+        reses = llenar_semana(t, rutas, parametros)
+        if reses is None:
+            return None
+        for p in Planta_S:
+            total = 0
+            for z in Zona:
+                for tipo, viaje in (('res_int', 'viaje_int'), ('res_comp', 'viaje_com')):
+                    cantidad = reses.get((tipo, z, p), 0)
+                    total += cantidad
+                    valores[variables[tipo][z, p, t].name] = cantidad
+                    valores[variables[viaje][z, p, t].name] = math.ceil(cantidad / RESES_POR_CAMION)
+            valores[variables['viaje_envigado'][p, t].name] = math.ceil(total / RESES_POR_CAMION_ENVIGADO)
+    return valores
+
+
+def aplicar_arranque_voraz(modelo, Zona, Planta_S, Semana, parametros, variables):
+    """Asigna la solución voraz como valores iniciales de `modelo`. Devuelve si hubo solución."""
+    valores = solucion_voraz(Zona, Planta_S, Semana, parametros, variables)
+    if valores is None:
+        return False
+    for variable in modelo.variables():
+        if variable.name in valores:
+            variable.setInitialValue(valores[variable.name], check=False)
+    return True
+
+
+def comparar_arranque(inputs_opt_res, valor_kg=22000.0, perfil='interactivo', tiempo_limite=None):
+    """
+    Resuelve un libro sin y con arranque voraz y compara el primer incumbente y
+    el resultado final, junto con el objetivo de la solución voraz.
+    """
+    from pulp import value
+    from optimizacion import ejecutar_modelo, preparar_modelo
+
+    modelo, contexto = preparar_modelo(inputs_opt_res, valor_kg)
+    inicio = time.perf_counter()
+    valores = solucion_voraz(contexto['Zona'], contexto['Planta_S'], contexto['Semana'],
+                             contexto['parametros'], contexto['variables'])
+    tiempo_voraz = time.perf_counter() - inicio
+    if valores is not None:
+        modelo.assignVarsVals(valores)
+
+    comparacion = {'voraz': {
+        'objetivo': value(modelo.objective) if valores is not None else None,
+        'tiempo': round(tiempo_voraz, 3),
+    }}
+    for modo, arranque in (('sin_arranque', False), ('con_arranque', True)):
+        inicio = time.perf_counter()
+        _, contexto, _ = ejecutar_modelo(inputs_opt_res, valor_kg, perfil=perfil, tiempo_limite=tiempo_limite,
+                                         arranque_heuristico=arranque)
+        solver = contexto['solver']
+        comparacion[modo] = {
+            'primer_incumbente_s': solver['primer_incumbente'],
+            'arranque_aceptado': solver['arranque'],
+            'objetivo': solver['objetivo'],
+            'gap': solver['gap'],
+            'tiempo': round(time.perf_counter() - inicio, 2),
+        }
+    return comparacion
+
+
+def main():
+    from optimizacion import leer_libro
+    from perfiles import PERFILES
+
+    parser = argparse.ArgumentParser(description="Compara el tiempo al primer incumbente con y sin arranque voraz.")
+    parser.add_argument('libros', nargs='+', help="Libros de parámetros (.xlsx/.xls)")
+    parser.add_argument('--valor-kg', type=float, default=22000.0, help="Valor comercial de Kg de carne ($)")
+    parser.add_argument('--perfil', choices=list(PERFILES), default='interactivo', help="Perfil de solver")
+    parser.add_argument('--tiempo-limite', type=int, default=None, help="Tiempo límite por solución (reemplaza el del perfil)")
+    parser.add_argument('--salida', default=None, help="CSV donde guardar la comparación")
+    args = parser.parse_args()
+
+    filas = []
+    for libro in args.libros:
+        comparacion = comparar_arranque(leer_libro(libro), args.valor_kg, args.perfil, args.tiempo_limite)
+        for modo, resultado in comparacion.items():
+            filas.append(dict(libro=libro, modo=modo, **resultado))
+    tabla = pd.DataFrame(filas)
+    print(tabla.to_string(index=False))
+    if args.salida:
+        tabla.to_csv(args.salida, index=False, encoding='utf-8-sig')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""
+Re-planificación con horizonte móvil.
+
+Cada semana se vuelve a planear una ventana que avanza: sale la semana más
+antigua y entra una nueva. En lugar de resolver la ventana desde cero se parte
+del plan de la corrida anterior (hoja Plan_Sacrificio del plan descargado o de
+lote.py):
+
+- Semanas ya ejecutadas (`semanas_fijas`): se fijan en los valores del plan.
+- Semanas que comparten el plan y el nuevo horizonte: el plan, con los camiones
+  mínimos para sus reses, es la solución de arranque (MIP start) de la semana.
+- Semanas nuevas, y compartidas cuyo plan ya no es factible con los datos
+  actuales: se resuelven por separado (las restricciones no enlazan semanas)
+  para completar la solución de arranque.
+
+Con la solución de arranque completa, CBC resuelve el horizonte partiendo de un
+incumbente y normalmente solo tiene que cerrar el gap.
+
+Uso (comparación con la solución desde cero):
+    python horizonte.py LIBRO.xlsx PLAN_ANTERIOR.xlsx [--fijas 27.2025 ...]
+                        [--perfil interactivo] [--salida plan_nuevo.xlsx]
+"""
+import argparse
+import math
+import time
+
+import pandas as pd
+
+COLUMNAS_PLAN = ('Zona', 'Planta', 'Semana', 'Reses integradas', 'Reses compradas')
+
+
+def leer_plan(archivo):
+    """Plan de una corrida anterior (hoja Plan_Sacrificio)."""
+    plan = pd.read_excel(archivo, sheet_name='Plan_Sacrificio')
+    faltantes = [c for c in COLUMNAS_PLAN if c not in plan.columns]
+    if faltantes:
+        raise ValueError(f"El plan anterior no tiene las columnas: {', '.join(faltantes)}")
+    return plan
+
+
+def plan_por_semana(plan, Zona, Planta_S, Semana):
+    """
+    Reses del plan por semana del horizonte: {semana: {(zona, planta): (integradas,
+    compradas)}}. Las semanas se comparan por su etiqueta (en el Excel pueden
+    leerse como texto o como número); se ignoran las filas de semanas, zonas o
+    plantas que no están en el horizonte, y las celdas de reses en blanco son 0.
+    """
+    semanas = {str(t): t for t in Semana}
+    zonas = {str(z): z for z in Zona}
+    plantas = {str(p): p for p in Planta_S}
+
+    reses = {}
+    # Una celda en blanco del Excel llega como NaN (que es verdadero en `or 0`)
+    plan = plan.fillna({'Reses integradas': 0, 'Reses compradas': 0})
+    for fila in plan.to_dict('records'):
+        t = semanas.get(str(fila['Semana']))
+        z = zonas.get(str(fila['Zona']))
+        p = plantas.get(str(fila['Planta']))
+        if t is None or z is None or p is None:
+            continue
+        reses.setdefault(t, {})[z, p] = (
+            int(round(fila['Reses integradas'])),
+            int(round(fila['Reses compradas'])),
+        )
+    return reses
+
+
+def plan_factible(reses, t, Zona, Planta_S, parametros):
+    """Si las reses del plan de la semana `t` cumplen demanda, oferta, compras y capacidad actuales."""
+    if sum(r_int + r_com for r_int, r_com in reses.values()) != parametros['Demanda'][t]:
+        return False
+    for z in Zona:
+        if sum(reses.get((z, p), (0, 0))[0] for p in Planta_S) > parametros['Oferta_Int'].get((z, t), 0):
+            return False
+        if sum(reses.get((z, p), (0, 0))[1] for p in Planta_S) > parametros['Oferta_Com'].get((z, t), 0):
+            return False
+    for p in Planta_S:
+        if sum(sum(reses.get((z, p), (0, 0))) for z in Zona) > parametros['Capacidad'].get(p, 0):
+            return False
+    return True
+
+
+def valores_semana(reses, t, Zona, Planta_S, variables):
+    """Valores de todas las variables de la semana `t` para las reses dadas (camiones mínimos)."""
+    valores = {}
+    for p in Planta_S:
+        total = 0
+        for z in Zona:
+            r_int, r_com = reses.get((z, p), (0, 0))
+            total += r_int + r_com
+            valores[variables['res_int'][z, p, t].name] = r_int
+            valores[variables['res_comp'][z, p, t].name] = r_com
+            valores[variables['viaje_int'][z, p, t].name] = math.ceil(r_int / 14)
+            valores[variables['viaje_com'][z, p, t].name] = math.ceil(r_com / 14)
+        valores[variables['viaje_envigado'][p, t].name] = math.ceil(total / 84)
+    return valores
+
+
+def resolver_horizonte(modelo, contexto, plan, semanas_fijas, config):
+    """
+    Resuelve `modelo` (el horizonte completo) partiendo del plan anterior. La
+    mitad del tiempo límite del perfil se reparte entre las semanas a completar
+    y el resto queda para el horizonte. Lanza ValueError si una semana fija no
+    está en el plan o ya no es factible. Devuelve el resumen de la corrida y el
+    del solver.
+    """
+    from optimizacion import construir_modelo
+    from perfiles import resolver_con_perfil
+
+    inicio = time.perf_counter()
+    Zona, Planta_S, Semana = contexto['Zona'], contexto['Planta_S'], contexto['Semana']
+    parametros, variables = contexto['parametros'], contexto['variables']
+    reses = plan_por_semana(plan, Zona, Planta_S, Semana)
+
+    semanas = {str(t): t for t in Semana}
+    fijas = []
+    for etiqueta in semanas_fijas or ():
+        t = semanas.get(str(etiqueta))
+        if t is None or t not in reses:
+            raise ValueError(f"La semana fija {etiqueta} no está en el horizonte y en el plan anterior")
+        if not plan_factible(reses[t], t, Zona, Planta_S, parametros):
+            raise ValueError(f"El plan anterior de la semana fija {etiqueta} no es factible con los datos actuales")
+        fijas.append(t)
+
+    arranque = [t for t in Semana if t in reses and t not in fijas
+                and plan_factible(reses[t], t, Zona, Planta_S, parametros)]
+    pendientes = [t for t in Semana if t not in fijas and t not in arranque]
+
+    valores = {}
+    for t in fijas + arranque:
+        valores.update(valores_semana(reses[t], t, Zona, Planta_S, variables))
+
+    config_semana = dict(config)
+    if config['tiempo_limite'] is not None:
+        config_semana['tiempo_limite'] = max(1, config['tiempo_limite'] // 2 // max(1, len(pendientes)))
+    for t in pendientes:
+        # Las variables del submodelo tienen los mismos nombres que en el completo
+        submodelo, _, _ = construir_modelo(Zona, Planta_S, [t], parametros, contexto.get('reforzada', False))
+        resolver_con_perfil(submodelo, config_semana)
+        valores.update({v.name: v.varValue for v in submodelo.variables() if v.varValue is not None})
+
+    for variable in modelo.variables():
+        if variable.name in valores:
+            variable.setInitialValue(valores[variable.name], check=False)
+    for t in fijas:
+        for nombre in ('res_int', 'res_comp', 'viaje_int', 'viaje_com'):
+            for z in Zona:
+                for p in Planta_S:
+                    variables[nombre][z, p, t].fixValue()
+        for p in Planta_S:
+            variables['viaje_envigado'][p, t].fixValue()
+
+    config_horizonte = dict(config)
+    if config['tiempo_limite'] is not None:
+        config_horizonte['tiempo_limite'] = max(1, int(config['tiempo_limite'] - (time.perf_counter() - inicio)))
+    solver = resolver_con_perfil(modelo, config_horizonte, arranque=True)
+    solver.update(
+        perfil=config['perfil'],
+        resultado=f"Horizonte móvil: {solver['resultado']}",
+        tiempo=time.perf_counter() - inicio,
+    )
+
+    resultado = {
+        'fijas': fijas,
+        'arranque': arranque,
+        'nuevas': [t for t in pendientes if t not in reses],
+        'modificadas': [t for t in pendientes if t in reses],
+    }
+    return resultado, solver
+
+
+def comparar_con_cero(inputs_opt_res, plan, valor_kg=22000.0, semanas_fijas=(), perfil='interactivo',
+                      tiempo_limite=None):
+    """Resuelve un libro desde cero y con el plan anterior y compara objetivo, nodos y tiempo."""
+    from optimizacion import ejecutar_modelo
+
+    comparacion = {}
+    for modo, plan_anterior in (('cero', None), ('horizonte', plan)):
+        inicio = time.perf_counter()
+        _, contexto, _ = ejecutar_modelo(inputs_opt_res, valor_kg, perfil=perfil, tiempo_limite=tiempo_limite,
+                                         plan_anterior=plan_anterior, semanas_fijas=semanas_fijas)
+        solver = contexto['solver']
+        comparacion[modo] = {
+            'objetivo': solver['objetivo'],
+            'gap': solver['gap'],
+            'nodos': solver['nodos'],
+            'tiempo': round(time.perf_counter() - inicio, 2),
+        }
+        if plan_anterior is not None:
+            comparacion[modo].update({clave: len(semanas) for clave, semanas in contexto['horizonte'].items()})
+    return comparacion, contexto
+
+
+def main():
+    from optimizacion import extraer_plan, leer_libro
+    from perfiles import PERFILES
+
+    parser = argparse.ArgumentParser(description="Re-planifica un horizonte móvil partiendo del plan anterior.")
+    parser.add_argument('libro', help="Libro de parámetros del nuevo horizonte (.xlsx/.xls)")
+    parser.add_argument('plan', help="Plan de la corrida anterior (Excel con la hoja Plan_Sacrificio)")
+    parser.add_argument('--fijas', nargs='*', default=[], help="Semanas ya ejecutadas que se fijan en el plan anterior")
+    parser.add_argument('--valor-kg', type=float, default=22000.0, help="Valor comercial de Kg de carne ($)")
+    parser.add_argument('--perfil', choices=list(PERFILES), default='interactivo', help="Perfil de solver")
+    parser.add_argument('--tiempo-limite', type=int, default=None, help="Tiempo límite por solución (reemplaza el del perfil)")
+    parser.add_argument('--salida', default=None, help="Excel donde guardar el nuevo plan")
+    args = parser.parse_args()
+
+    comparacion, contexto = comparar_con_cero(leer_libro(args.libro), leer_plan(args.plan), args.valor_kg,
+                                              args.fijas, args.perfil, args.tiempo_limite)
+    print(pd.DataFrame(comparacion).T.to_string())
+    if args.salida:
+        with pd.ExcelWriter(args.salida, engine='openpyxl') as writer:
+            extraer_plan(contexto).to_excel(writer, sheet_name='Plan_Sacrificio', index=False)
+
+
+if __name__ == '__main__':
+    main()
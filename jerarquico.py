@@ -0,0 +1,278 @@
+"""
+Solución jerárquica (agregar y desagregar) para redes con muchas zonas.
+
+1. Las zonas se agrupan por similitud de costo y rendimiento (PESORES,
+   RENDIMIENTO y C_TRANS_ZF hacia cada planta) con k-means.
+2. Se resuelve el modelo de sacrificio con cada grupo como una sola zona
+   (oferta sumada, parámetros promediados según la oferta de cada zona).
+3. Las reses que cada grupo envía a cada planta y semana se reparten entre sus
+   zonas con un subproblema pequeño por grupo, que decide también los camiones.
+
+La solución es factible para el modelo completo pero no necesariamente óptima;
+`comparar_con_exacto` mide la pérdida frente al modelo exacto (con el mismo
+perfil de solver, así que si el exacto se detiene por tiempo la pérdida puede
+ser negativa).
+
+Uso (comparación en libros de prueba o en instancias generadas de varios
+tamaños, ver refuerzos.generar_instancia):
+    python jerarquico.py [LIBRO.xlsx ...] [--generar 20 40 80] [--semillas 2]
+                         [--grupos 5] [--perfil interactivo] [--tiempo-limite 60]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def agrupar_zonas(Zona, Planta_S, parametros, n_grupos, semilla=0):
+    """
+    Agrupa las zonas en `n_grupos` con k-means sobre PESORES, RENDIMIENTO y
+    C_TRANS_ZF (columnas estandarizadas). Devuelve {grupo: [zonas]}.
+    """
+    n_grupos = max(1, min(n_grupos, len(Zona)))
+    caracteristicas = np.array([
+        [parametros['Peso_Res'].get(z, 0)]
+        + [parametros['rdto'].get((z, p), 0) for p in Planta_S]
+        + [parametros['Costo_Viaje_Int'].get((z, p), 0) for p in Planta_S]
+        for z in Zona
+    ], dtype=float)
+    desviacion = caracteristicas.std(axis=0)
+    desviacion[desviacion == 0] = 1
+    caracteristicas = (caracteristicas - caracteristicas.mean(axis=0)) / desviacion
+
+    # k-means++ con semilla fija para que la agrupación sea reproducible
+    generador = np.random.default_rng(semilla)
+    centros = [caracteristicas[generador.integers(len(Zona))]]
+    for _ in range(1, n_grupos):
+        distancias = np.min([((caracteristicas - c) ** 2).sum(axis=1) for c in centros], axis=0)
+        if distancias.sum() == 0:
+            break
+        centros.append(caracteristicas[generador.choice(len(Zona), p=distancias / distancias.sum())])
+    centros = np.array(centros)
+
+    asignacion = None
+    for _ in range(100):
+        nueva = ((caracteristicas[:, None, :] - centros[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+        if asignacion is not None and (nueva == asignacion).all():
+            break
+        asignacion = nueva
+        centros = np.array([
+            caracteristicas[asignacion == g].mean(axis=0) if (asignacion == g).any() else centros[g]
+            for g in range(len(centros))
+        ])
+
+    grupos = {}
+    for z, g in zip(Zona, asignacion):
+        grupos.setdefault(f"Grupo_{g + 1}", []).append(z)
+    return grupos
+
+
+def parametros_agregados(grupos, Planta_S, Semana, parametros):
+    """
+    Parámetros del modelo con cada grupo como una zona: la oferta se suma y los
+    precios, costos y rendimientos se promedian ponderando por la oferta total
+    de cada zona en el horizonte. El rendimiento del grupo conserva los kilos
+    por res promedio (peso × rendimiento).
+    """
+    agregados = dict(parametros)
+    for nombre in ('Oferta_Int', 'Oferta_Com', 'Peso_Res', 'rdto',
+                   'Precio_Int', 'Precio_Comp', 'Costo_Viaje_Int', 'Costo_Viaje_Comp'):
+        agregados[nombre] = {}
+
+    for g, zonas in grupos.items():
+        pesos = np.array([
+            sum(parametros['Oferta_Int'].get((z, t), 0) + parametros['Oferta_Com'].get((z, t), 0) for t in Semana)
+            for z in zonas
+        ], dtype=float)
+        if pesos.sum() <= 0:
+            pesos = np.ones(len(zonas))
+        pesos = pesos / pesos.sum()
+
+        def promedio(valores):
+            return float(np.dot(pesos, valores))
+
+        for t in Semana:
+            agregados['Oferta_Int'][g, t] = sum(parametros['Oferta_Int'].get((z, t), 0) for z in zonas)
+            agregados['Oferta_Com'][g, t] = sum(parametros['Oferta_Com'].get((z, t), 0) for z in zonas)
+        peso = promedio([parametros['Peso_Res'].get(z, 0) for z in zonas])
+        agregados['Peso_Res'][g] = peso
+        agregados['Precio_Int'][g] = promedio([parametros['Precio_Int'].get(z, 0) for z in zonas])
+        agregados['Precio_Comp'][g] = promedio([parametros['Precio_Comp'].get(z, 0) for z in zonas])
+        for p in Planta_S:
+            kilos = promedio([parametros['Peso_Res'].get(z, 0) * parametros['rdto'].get((z, p), 0) for z in zonas])
+            agregados['rdto'][g, p] = kilos / peso if peso else 0
+            agregados['Costo_Viaje_Int'][g, p] = promedio([parametros['Costo_Viaje_Int'].get((z, p), 0) for z in zonas])
+            agregados['Costo_Viaje_Comp'][g, p] = promedio([parametros['Costo_Viaje_Comp'].get((z, p), 0) for z in zonas])
+
+    # La función objetivo suma el flete a Envigado una vez por zona: con menos
+    # zonas (grupos) se escala para que pese lo mismo que en el modelo completo
+    n_zonas = sum(len(zonas) for zonas in grupos.values())
+    agregados['Costo_Tans_PT'] = {
+        p: costo * n_zonas / len(grupos) for p, costo in parametros['Costo_Tans_PT'].items()
+    }
+    return agregados
+
+
+def desagregar_grupo(zonas, Planta_S, Semana, parametros, envios_int, envios_com, config):
+    """
+    Reparte entre las zonas de un grupo las reses que el grupo envía a cada
+    planta y semana (`envios_*[p, t]`), maximizando el margen menos el flete.
+    Devuelve los valores de res_int, res_comp, viaje_int y viaje_com por nombre
+    de variable del modelo completo.
+    """
+    from pulp import LpProblem, LpMaximize, LpVariable, lpSum, LpSolutionOptimal, LpSolutionIntegerFeasible
+    from perfiles import crear_solver
+
+    valor_kg = parametros['valor_kg']
+    claves = [(z, p, t) for z in zonas for p in Planta_S for t in Semana]
+    modelo = LpProblem("Desagregacion", LpMaximize)
+    # Mismos nombres que en construir_modelo para asignar los valores al modelo completo
+    res_int = LpVariable.dicts('res_int', claves, lowBound=0, cat='Integer')
+    res_comp = LpVariable.dicts('res_comp', claves, lowBound=0, cat='Integer')
+    viaje_int = LpVariable.dicts('viaje_Int_zona', claves, lowBound=0, cat='Integer')
+    viaje_com = LpVariable.dicts('viaje_Com_zona', claves, lowBound=0, cat='Integer')
+
+    def margen(z, p, precio):
+        carne = parametros['Peso_Res'].get(z, 0) * parametros['rdto'].get((z, p), 0) * valor_kg
+        return carne - precio.get(z, 0) - parametros['Costo_Sac'].get(p, 0)
+
+    modelo += lpSum(
+        res_int[z, p, t] * margen(z, p, parametros['Precio_Int']) +
+        res_comp[z, p, t] * margen(z, p, parametros['Precio_Comp']) -
+        viaje_int[z, p, t] * parametros['Costo_Viaje_Int'].get((z, p), 0) -
+        viaje_com[z, p, t] * parametros['Costo_Viaje_Comp'].get((z, p), 0)
+        for (z, p, t) in claves
+    )
+    for p in Planta_S:
+        for t in Semana:
+            modelo += lpSum(res_int[z, p, t] for z in zonas) == envios_int.get((p, t), 0)
+            modelo += lpSum(res_comp[z, p, t] for z in zonas) == envios_com.get((p, t), 0)
+    for z in zonas:
+        for t in Semana:
+            modelo += lpSum(res_int[z, p, t] for p in Planta_S) <= parametros['Oferta_Int'].get((z, t), 0)
+            modelo += lpSum(res_comp[z, p, t] for p in Planta_S) <= parametros['Oferta_Com'].get((z, t), 0)
+    for clave in claves:
+        modelo += res_int[clave] <= viaje_int[clave] * 14
+        modelo += res_comp[clave] <= viaje_com[clave] * 14
+
+    modelo.solve(crear_solver(config))
+    if modelo.sol_status not in (LpSolutionOptimal, LpSolutionIntegerFeasible):
+        raise RuntimeError(f"No se pudo desagregar el grupo de zonas {', '.join(map(str, zonas))}")
+    return {v.name: v.varValue for v in modelo.variables()}
+
+
+def resolver_jerarquico(modelo, Zona, Planta_S, Semana, parametros, config, n_grupos):
+    """
+    Resuelve `modelo` (el modelo completo) en dos niveles y le asigna la
+    solución desagregada. El tiempo límite del perfil se reparte por mitades
+    entre el modelo agregado y los subproblemas. Devuelve el resumen de la
+    corrida y el del solver.
+    """
+    from pulp import LpSolutionIntegerFeasible, LpSolutionOptimal, LpStatusOptimal, value
+    from optimizacion import construir_modelo
+    from perfiles import resolver_con_perfil
+
+    inicio = time.perf_counter()
+    grupos = agrupar_zonas(Zona, Planta_S, parametros, n_grupos)
+
+    config_nivel = dict(config)
+    if config['tiempo_limite'] is not None:
+        config_nivel['tiempo_limite'] = max(1, config['tiempo_limite'] // 2)
+    agregado, variables, _ = construir_modelo(
+        list(grupos), Planta_S, Semana, parametros_agregados(grupos, Planta_S, Semana, parametros)
+    )
+    resumen_agregado = resolver_con_perfil(agregado, config_nivel)
+    if agregado.sol_status not in (LpSolutionOptimal, LpSolutionIntegerFeasible):
+        raise RuntimeError("El modelo agregado por grupos de zonas no tiene solución factible")
+
+    # Los camiones a Envigado dependen solo del total por planta, que no cambia al desagregar
+    valores = {v.name: v.varValue for v in variables['viaje_envigado'].values()}
+    config_grupo = dict(config)
+    if config['tiempo_limite'] is not None:
+        config_grupo['tiempo_limite'] = max(1, config['tiempo_limite'] // 2 // len(grupos))
+    for g, zonas in grupos.items():
+        envios_int = {(p, t): round(variables['res_int'][g, p, t].varValue or 0) for p in Planta_S for t in Semana}
+        envios_com = {(p, t): round(variables['res_comp'][g, p, t].varValue or 0) for p in Planta_S for t in Semana}
+        valores.update(desagregar_grupo(zonas, Planta_S, Semana, parametros, envios_int, envios_com, config_grupo))
+
+    modelo.assignVarsVals(valores)
+    modelo.assignStatus(LpStatusOptimal, LpSolutionIntegerFeasible)
+
+    resultado = {
+        'grupos': grupos,
+        'objetivo_agregado': resumen_agregado['objetivo'],
+    }
+    solver = {
+        'perfil': config['perfil'],
+        'resultado': f"Jerárquico: {len(grupos)} grupos de {len(Zona)} zonas",
+        'objetivo': value(modelo.objective),
+        # El modelo agregado no es una relajación del completo: no hay cota válida
+        'cota': None,
+        'gap': None,
+        'nodos': resumen_agregado['nodos'],
+        'tiempo': time.perf_counter() - inicio,
+    }
+    return resultado, solver
+
+
+def comparar_con_exacto(inputs_opt_res, valor_kg=22000.0, n_grupos=5, perfil='interactivo', tiempo_limite=None):
+    """Resuelve un libro con el modelo exacto y con el jerárquico y compara objetivos y tiempos."""
+    from optimizacion import ejecutar_modelo
+
+    comparacion = {'zonas': inputs_opt_res['Oferta']['ZONA'].nunique(), 'grupos': n_grupos}
+    for modo, grupos in (('exacto', None), ('jerarquico', n_grupos)):
+        inicio = time.perf_counter()
+        _, contexto, costos = ejecutar_modelo(inputs_opt_res, valor_kg, perfil=perfil,
+                                              tiempo_limite=tiempo_limite, grupos_zonas=grupos)
+        comparacion[f'objetivo_{modo}'] = contexto['solver']['objetivo']
+        comparacion[f'valorizacion_{modo}'] = costos['Valorización Total']
+        comparacion[f'tiempo_{modo}'] = round(time.perf_counter() - inicio, 2)
+    # Pérdida relativa en la función objetivo y en la Valorización Total (la
+    # objetivo suma el flete a Envigado una vez por zona, así que con muchas
+    # zonas la valorización es la medida comparable para el negocio)
+    for medida in ('objetivo', 'valorizacion'):
+        exacto, jerarquico = comparacion[f'{medida}_exacto'], comparacion[f'{medida}_jerarquico']
+        comparacion[f'perdida_{medida}'] = (exacto - jerarquico) / abs(exacto) if exacto else None
+    return comparacion
+
+
+def main():
+    from optimizacion import leer_libro
+    from perfiles import PERFILES
+    from refuerzos import generar_instancia
+
+    parser = argparse.ArgumentParser(description="Compara la solución jerárquica con la exacta en libros de prueba.")
+    parser.add_argument('libros', nargs='*', help="Libros de parámetros (.xlsx/.xls)")
+    parser.add_argument('--generar', type=int, nargs='*', default=[],
+                        help="Números de zonas de las instancias aleatorias a generar")
+    parser.add_argument('--plantas', type=int, default=5, help="Plantas de las instancias generadas")
+    parser.add_argument('--semanas', type=int, default=4, help="Semanas de las instancias generadas")
+    parser.add_argument('--semillas', type=int, default=1, help="Instancias generadas por número de zonas")
+    parser.add_argument('--grupos', type=int, default=5, help="Número de grupos de zonas")
+    parser.add_argument('--valor-kg', type=float, default=22000.0, help="Valor comercial de Kg de carne ($)")
+    parser.add_argument('--perfil', choices=list(PERFILES), default='interactivo', help="Perfil de solver")
+    parser.add_argument('--tiempo-limite', type=int, default=None, help="Tiempo límite por solución (reemplaza el del perfil)")
+    parser.add_argument('--salida', default=None, help="CSV donde guardar la comparación")
+    args = parser.parse_args()
+
+    instancias = [(libro, leer_libro(libro)) for libro in args.libros]
+    instancias += [
+        (f"generada_z{n_zonas}_s{semilla}", generar_instancia(n_zonas, args.plantas, args.semanas, semilla))
+        for n_zonas in args.generar for semilla in range(args.semillas)
+    ]
+    if not instancias:
+        parser.error("Indique libros o --generar")
+
+    filas = []
+    for nombre, inputs_opt_res in instancias:
+        comparacion = comparar_con_exacto(inputs_opt_res, args.valor_kg, args.grupos, args.perfil, args.tiempo_limite)
+        filas.append(dict(instancia=nombre, **comparacion))
+    tabla = pd.DataFrame(filas)
+    print(tabla.to_string(index=False))
+    if args.salida:
+        tabla.to_csv(args.salida, index=False, encoding='utf-8-sig')
+
+
+if __name__ == '__main__':
+    main()
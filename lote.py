@@ -0,0 +1,209 @@
+"""
+Procesamiento por lotes (sin interfaz) de los planes regionales.
+
+Resuelve en paralelo todos los libros de parámetros de un directorio y escribe,
+por cada libro, su plan de sacrificio con los costos, además de un resumen de
+costos de todo el lote y un reporte de la corrida.
+
+Cada libro tiene además un tiempo máximo de reloj (lectura, modelo y solver):
+si lo pasa, su proceso se detiene y el reporte lo registra como 'Tiempo
+agotado', de modo que un libro difícil no bloquea el lote. Con un perfil sin
+tiempo límite (exacto) hay que indicar --tiempo-limite o --tiempo-maximo.
+
+Uso:
+    python lote.py DIRECTORIO_ENTRADA [--salida DIRECTORIO] [--valor-kg 22000]
+                   [--perfil nocturno] [--tiempo-limite SEGUNDOS] [--tiempo-maximo SEGUNDOS]
+                   [--procesos N] [--arranque-heuristico | --no-arranque-heuristico]
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import queue
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+import optimizacion
+from perfiles import PERFILES
+from portafolio import detener_proceso
+
+# Margen sobre el tiempo límite del solver para leer el libro y escribir el plan
+MARGEN_TIEMPO_MAXIMO = 120
+
+
+def resolver_archivo(ruta, directorio_salida, valor_kg, perfil, tiempo_limite, arranque_heuristico=None):
+    """Resuelve un libro, escribe su plan y devuelve el resumen para el reporte."""
+    from pulp import LpSolution, LpStatus
+
+    inicio = time.perf_counter()
+    resumen = {'archivo': ruta.name}
+    try:
+        inputs_opt_res = optimizacion.leer_libro(ruta)
+        modelo, contexto, costos = optimizacion.ejecutar_modelo(
+            inputs_opt_res, valor_kg, perfil=perfil, tiempo_limite=tiempo_limite,
+            arranque_heuristico=arranque_heuristico
+        )
+
+        salida = directorio_salida / f"{ruta.stem}_plan.xlsx"
+        with pd.ExcelWriter(salida, engine='openpyxl') as writer:
+            optimizacion.extraer_plan(contexto).to_excel(writer, sheet_name='Plan_Sacrificio', index=False)
+            pd.DataFrame.from_dict(costos, orient='index', columns=['Valor ($)']).to_excel(writer, sheet_name='Costos')
+
+        solver = contexto['solver']
+        resumen.update(estado=LpStatus[modelo.status], solucion=LpSolution[modelo.sol_status],
+                       cota=solver['cota'], gap=solver['gap'], plan=salida.name, **costos)
+    except Exception as e:
+        resumen.update(estado='Error', error=str(e))
+
+    resumen['tiempo'] = round(time.perf_counter() - inicio, 2)
+    return resumen
+
+
+def _resolver_en_proceso(ruta, directorio_salida, valor_kg, perfil, tiempo_limite, arranque_heuristico, cola):
+    """Proceso trabajador: resuelve un libro y envía su resumen por la cola."""
+    # Grupo de procesos propio para poder detener también el ejecutable del solver
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+    cola.put(resolver_archivo(ruta, directorio_salida, valor_kg, perfil, tiempo_limite, arranque_heuristico))
+
+
+def calcular_tiempo_maximo(perfil, tiempo_limite=None, tiempo_maximo=None):
+    """
+    Tiempo máximo de reloj por libro: `tiempo_maximo` o, si es None, el tiempo
+    límite del solver más MARGEN_TIEMPO_MAXIMO. Lanza ValueError si no hay
+    ninguno de los dos (perfil sin tiempo límite).
+    """
+    if tiempo_maximo is not None:
+        return tiempo_maximo
+    limite = tiempo_limite if tiempo_limite is not None else PERFILES[perfil]['tiempo_limite']
+    if limite is None:
+        raise ValueError(f"El perfil {perfil} no tiene tiempo límite: indique tiempo_limite o tiempo_maximo")
+    return limite + MARGEN_TIEMPO_MAXIMO
+
+
+def ejecutar_lote(directorio_entrada, directorio_salida, valor_kg=22000.0, perfil='nocturno',
+                  tiempo_limite=None, procesos=None, tiempo_maximo=None, arranque_heuristico=None):
+    """
+    Resuelve los libros (.xlsx/.xls) de `directorio_entrada`, un proceso por libro
+    y hasta `procesos` a la vez (por defecto, uno por núcleo), con el perfil de
+    solver `perfil`; `tiempo_limite` (segundos) y `arranque_heuristico` reemplazan
+    los del perfil si no son None. Un libro
+    que pase `tiempo_maximo` segundos de reloj se detiene (ver
+    calcular_tiempo_maximo). Devuelve el reporte de la corrida.
+    """
+    tiempo_maximo = calcular_tiempo_maximo(perfil, tiempo_limite, tiempo_maximo)
+    directorio_salida = Path(directorio_salida)
+    directorio_salida.mkdir(parents=True, exist_ok=True)
+    archivos = sorted(
+        ruta for ruta in Path(directorio_entrada).glob('*.xls*')
+        if not ruta.name.startswith('~$')  # archivos temporales de Excel
+    )
+
+    inicio = time.perf_counter()
+    resultados = []
+
+    def registrar(resultado):
+        print(f"[{resultado['estado']}] {resultado['archivo']} ({resultado.get('tiempo', '-')} s)")
+        resultados.append(resultado)
+
+    # Un proceso por libro (no un pool) para poder detener el que pase su tiempo máximo
+    ctx = mp.get_context('spawn')
+    cola = ctx.Queue()
+    pendientes = list(archivos)
+    activos = {}  # nombre del archivo -> (proceso, inicio)
+    max_procesos = procesos or os.cpu_count() or 1
+    try:
+        while pendientes or activos:
+            while pendientes and len(activos) < max_procesos:
+                ruta = pendientes.pop(0)
+                proceso = ctx.Process(
+                    target=_resolver_en_proceso,
+                    args=(ruta, directorio_salida, valor_kg, perfil, tiempo_limite, arranque_heuristico, cola),
+                    daemon=True,
+                )
+                proceso.start()
+                activos[ruta.name] = (proceso, time.monotonic())
+
+            try:
+                resultado = cola.get(timeout=0.5)
+            except queue.Empty:
+                resultado = None
+            if resultado is not None:
+                activo = activos.pop(resultado['archivo'], None)
+                if activo is not None:  # (si no, el libro ya se detuvo por tiempo)
+                    activo[0].join(timeout=5)
+                    registrar(resultado)
+                continue
+
+            for nombre, (proceso, inicio_libro) in list(activos.items()):
+                transcurrido = time.monotonic() - inicio_libro
+                if transcurrido > tiempo_maximo:
+                    detener_proceso(proceso)
+                    del activos[nombre]
+                    registrar({'archivo': nombre, 'estado': 'Tiempo agotado',
+                               'error': f"Se detuvo tras {tiempo_maximo} s", 'tiempo': round(transcurrido, 2)})
+                elif not proceso.is_alive() and cola.empty():
+                    # El proceso trabajador terminó de forma inesperada
+                    del activos[nombre]
+                    registrar({'archivo': nombre, 'estado': 'Error',
+                               'error': f"El proceso terminó con código {proceso.exitcode}",
+                               'tiempo': round(transcurrido, 2)})
+    finally:
+        for proceso, _ in activos.values():
+            detener_proceso(proceso)
+
+    resultados.sort(key=lambda r: r['archivo'])
+    pd.DataFrame(resultados).to_csv(directorio_salida / 'resumen_costos.csv', index=False, encoding='utf-8-sig')
+
+    reporte = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'directorio_entrada': str(directorio_entrada),
+        'valor_kg': valor_kg,
+        'perfil': perfil,
+        'tiempo_limite': tiempo_limite,
+        'tiempo_maximo': tiempo_maximo,
+        'arranque_heuristico': arranque_heuristico,
+        'archivos': len(archivos),
+        'exitosos': sum(1 for r in resultados if r['estado'] not in ('Error', 'Tiempo agotado')),
+        'tiempo_agotado': sum(1 for r in resultados if r['estado'] == 'Tiempo agotado'),
+        'tiempo_total': round(time.perf_counter() - inicio, 2),
+        'resultados': resultados,
+    }
+    with open(directorio_salida / 'reporte_lote.json', 'w', encoding='utf-8') as archivo:
+        json.dump(reporte, archivo, ensure_ascii=False, indent=2, default=str)
+
+    return reporte
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resuelve por lotes los libros de parámetros de un directorio.")
+    parser.add_argument('entrada', help="Directorio con los libros de parámetros (.xlsx/.xls)")
+    parser.add_argument('--salida', default='resultados_lote', help="Directorio de salida (por defecto: resultados_lote)")
+    parser.add_argument('--valor-kg', type=float, default=22000.0, help="Valor comercial de Kg de carne ($)")
+    parser.add_argument('--perfil', choices=list(PERFILES), default='nocturno', help="Perfil de solver (por defecto: nocturno)")
+    parser.add_argument('--tiempo-limite', type=int, default=None, help="Tiempo límite por libro en segundos (reemplaza el del perfil)")
+    parser.add_argument('--tiempo-maximo', type=int, default=None,
+                        help="Tiempo máximo de reloj por libro en segundos (por defecto, el tiempo límite "
+                             f"más {MARGEN_TIEMPO_MAXIMO} s)")
+    parser.add_argument('--procesos', type=int, default=None, help="Libros a resolver en paralelo (por defecto, uno por núcleo)")
+    parser.add_argument('--arranque-heuristico', action=argparse.BooleanOptionalAction, default=None,
+                        help="Arrancar el solver desde la solución voraz (por defecto, según el perfil)")
+    args = parser.parse_args()
+
+    try:
+        calcular_tiempo_maximo(args.perfil, args.tiempo_limite, args.tiempo_maximo)
+    except ValueError:
+        parser.error(f"el perfil {args.perfil} no tiene tiempo límite: indique --tiempo-limite o --tiempo-maximo")
+
+    reporte = ejecutar_lote(args.entrada, args.salida, args.valor_kg, args.perfil, args.tiempo_limite,
+                            args.procesos, args.tiempo_maximo, args.arranque_heuristico)
+    print(f"{reporte['exitosos']}/{reporte['archivos']} libros resueltos en {reporte['tiempo_total']} s")
+    # Código de salida distinto de cero si algún libro falló (para tareas programadas)
+    raise SystemExit(0 if reporte['exitosos'] == reporte['archivos'] else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""
+Análisis de incertidumbre de la oferta (Monte Carlo).
+
+Oferta y Compras son pronósticos y el peso de las reses varía. Este modo
+genera escenarios perturbando Oferta, Compras y PESORES con distribuciones
+dadas por el usuario, resuelve cada escenario en un pool de procesos y resume
+la distribución de la Valorización Total, la utilización de las plantas y el
+volumen de compras.
+
+Cada proceso construye el modelo una sola vez; por escenario solo cambia los
+lados derechos de las restricciones de oferta y compras y los coeficientes de
+la función objetivo que dependen del peso.
+
+Uso:
+    python montecarlo.py LIBRO.xlsx [--muestras 100] [--procesos N]
+                         [--oferta normal 0.15] [--compras normal 0.2] [--pesores uniforme 0.03]
+                         [--perfil interactivo] [--salida muestras.csv]
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import optimizacion
+
+# Factor multiplicativo alrededor de 1 según la dispersión relativa `d`:
+# normal (d = coeficiente de variación), uniforme en [1-d, 1+d] y triangular
+# con moda 1 en [1-d, 1+d]
+DISTRIBUCIONES = ('normal', 'uniforme', 'triangular')
+
+INCERTIDUMBRE_POR_DEFECTO = {
+    'Oferta': ('normal', 0.15),
+    'Compras': ('normal', 0.20),
+    'PESORES': ('uniforme', 0.03),
+}
+
+
+def muestrear_factores(generador, distribucion, dispersion, tamano):
+    """Factores multiplicativos (no negativos) de una distribución."""
+    if distribucion == 'normal':
+        factores = generador.normal(1, dispersion, tamano)
+    elif distribucion == 'uniforme':
+        factores = generador.uniform(1 - dispersion, 1 + dispersion, tamano)
+    elif distribucion == 'triangular':
+        factores = generador.triangular(1 - dispersion, 1, 1 + dispersion, tamano) if dispersion else np.ones(tamano)
+    else:
+        raise ValueError(f"Distribución desconocida: {distribucion} (disponibles: {', '.join(DISTRIBUCIONES)})")
+    return np.clip(factores, 0, None)
+
+
+def generar_escenarios(parametros, n_muestras, incertidumbre=None, semilla=0):
+    """
+    Escenarios perturbados de Oferta_Int, Oferta_Com (reses enteras por zona y
+    semana) y Peso_Res (por zona). `incertidumbre` da (distribución, dispersión)
+    para 'Oferta', 'Compras' y 'PESORES'; las hojas que no aparecen no varían.
+    """
+    incertidumbre = INCERTIDUMBRE_POR_DEFECTO if incertidumbre is None else incertidumbre
+    generador = np.random.default_rng(semilla)
+    fuentes = {'Oferta': 'Oferta_Int', 'Compras': 'Oferta_Com', 'PESORES': 'Peso_Res'}
+
+    escenarios = [{} for _ in range(n_muestras)]
+    for hoja, nombre in fuentes.items():
+        if hoja not in incertidumbre:
+            continue
+        distribucion, dispersion = incertidumbre[hoja]
+        claves = list(parametros[nombre])
+        base = np.array([parametros[nombre][c] for c in claves], dtype=float)
+        factores = muestrear_factores(generador, distribucion, dispersion, (n_muestras, len(claves)))
+        valores = base * factores
+        if nombre != 'Peso_Res':
+            valores = np.rint(valores)  # las disponibilidades son reses enteras
+        for escenario, fila in zip(escenarios, valores):
+            escenario[nombre] = dict(zip(claves, fila.tolist()))
+    return escenarios
+
+
+# --- PROCESOS TRABAJADORES ---
+# Estado de cada proceso del pool: el modelo base construido una sola vez
+_BASE = {}
+
+def _iniciar_trabajador(inputs_opt_res, valor_kg, config):
+    """Inicializador del pool: construye el modelo base del proceso."""
+    modelo, contexto = optimizacion.preparar_modelo(inputs_opt_res, valor_kg)
+    _BASE.update(modelo=modelo, contexto=contexto, config=config)
+
+
+def _resolver_escenario(escenario):
+    """Resuelve un escenario sobre el modelo base y devuelve sus métricas."""
+    from pulp import LpSolution, LpSolutionIntegerFeasible, LpSolutionOptimal
+    from perfiles import crear_solver
+
+    modelo, contexto, config = _BASE['modelo'], _BASE['contexto'], _BASE['config']
+    parametros = dict(contexto['parametros'], **escenario)
+    contexto = dict(contexto, parametros=parametros)
+    variables = contexto['variables']
+    restricciones = contexto['restricciones']
+
+    # Lados derechos de oferta y compras del escenario
+    for (z, t), restriccion in restricciones['Oferta'].items():
+        restriccion.changeRHS(parametros['Oferta_Int'].get((z, t), 0))
+    for (z, t), restriccion in restricciones['Compras'].items():
+        restriccion.changeRHS(parametros['Oferta_Com'].get((z, t), 0))
+
+    # Coeficientes de las reses en la función objetivo (dependen del peso); el
+    # objetivo suma un término por (z, p, t), igual que en construir_modelo
+    valor_kg = parametros['valor_kg']
+    for (z, p, t), variable in variables['res_int'].items():
+        carne = parametros['Peso_Res'].get(z, 0) * parametros['rdto'].get((z, p), 0) * valor_kg
+        modelo.objective[variable] = carne - parametros['Precio_Int'].get(z, 0) - parametros['Costo_Sac'].get(p, 0)
+    for (z, p, t), variable in variables['res_comp'].items():
+        carne = parametros['Peso_Res'].get(z, 0) * parametros['rdto'].get((z, p), 0) * valor_kg
+        modelo.objective[variable] = carne - parametros['Precio_Comp'].get(z, 0) - parametros['Costo_Sac'].get(p, 0)
+
+    modelo.solve(crear_solver(config))
+    metricas = {'estado': LpSolution[modelo.sol_status]}
+    if modelo.sol_status not in (LpSolutionOptimal, LpSolutionIntegerFeasible):
+        return metricas
+
+    costos = optimizacion.calcular_costos(contexto)
+    metricas['Valorización Total'] = costos['Valorización Total']
+    metricas['Reses compradas'] = sum(v.varValue for v in variables['res_comp'].values())
+    metricas['Reses integradas'] = sum(v.varValue for v in variables['res_int'].values())
+    for p in contexto['Planta_S']:
+        capacidad = parametros['Capacidad'].get(p, 0) * len(contexto['Semana'])
+        reses = sum(variables['res_int'][z, p, t].varValue + variables['res_comp'][z, p, t].varValue
+                    for z in contexto['Zona'] for t in contexto['Semana'])
+        metricas[f'Utilización {p}'] = reses / capacidad if capacidad else 0.0
+    return metricas
+
+
+def simular(inputs_opt_res, valor_kg, n_muestras=100, incertidumbre=None, procesos=None,
+            perfil='interactivo', tiempo_limite=None, semilla=0):
+    """
+    Resuelve `n_muestras` escenarios en `procesos` procesos (por defecto, uno por
+    núcleo) y devuelve un DataFrame con una fila por muestra.
+    """
+    from perfiles import configurar_perfil
+
+    # Un hilo de CBC por proceso: el paralelismo está en el pool
+    config = configurar_perfil(perfil, tiempo_limite=tiempo_limite, hilos=1)
+    _, contexto = optimizacion.preparar_modelo(inputs_opt_res, valor_kg)
+    escenarios = generar_escenarios(contexto['parametros'], n_muestras, incertidumbre, semilla)
+
+    with ProcessPoolExecutor(max_workers=procesos or os.cpu_count(),
+                             initializer=_iniciar_trabajador,
+                             initargs=(inputs_opt_res, valor_kg, config)) as pool:
+        filas = list(pool.map(_resolver_escenario, escenarios))
+
+    muestras = pd.DataFrame(filas)
+    muestras.insert(0, 'muestra', range(1, len(muestras) + 1))
+    return muestras
+
+
+def resumir(muestras):
+    """Media, desviación y percentiles 5/50/95 de cada métrica, más las muestras infactibles."""
+    metricas = muestras.drop(columns=['muestra', 'estado']).astype(float)
+    resumen = pd.DataFrame({
+        'Media': metricas.mean(),
+        'Desv. estándar': metricas.std(),
+        'P5': metricas.quantile(0.05),
+        'P50': metricas.quantile(0.50),
+        'P95': metricas.quantile(0.95),
+    })
+    resueltas = metricas['Valorización Total'].notna().sum() if 'Valorización Total' in metricas else 0
+    return resumen, len(muestras) - int(resueltas)
+
+
+def main():
+    from perfiles import PERFILES
+
+    parser = argparse.ArgumentParser(description="Análisis Monte Carlo de la incertidumbre de la oferta.")
+    parser.add_argument('libro', help="Libro de parámetros (.xlsx/.xls)")
+    parser.add_argument('--valor-kg', type=float, default=22000.0, help="Valor comercial de Kg de carne ($)")
+    parser.add_argument('--muestras', type=int, default=100, help="Número de escenarios")
+    parser.add_argument('--procesos', type=int, default=None, help="Procesos en paralelo (por defecto, uno por núcleo)")
+    for hoja, (distribucion, dispersion) in INCERTIDUMBRE_POR_DEFECTO.items():
+        parser.add_argument(f'--{hoja.lower()}', nargs=2, metavar=('DISTRIBUCION', 'DISPERSION'),
+                            default=[distribucion, dispersion],
+                            help=f"Distribución de {hoja} ({'/'.join(DISTRIBUCIONES)}) y dispersión relativa "
+                                 f"(por defecto: {distribucion} {dispersion})")
+    parser.add_argument('--perfil', choices=list(PERFILES), default='interactivo', help="Perfil de solver")
+    parser.add_argument('--tiempo-limite', type=int, default=None, help="Tiempo límite por escenario")
+    parser.add_argument('--semilla', type=int, default=0, help="Semilla de los escenarios")
+    parser.add_argument('--salida', default=None, help="CSV donde guardar las muestras")
+    args = parser.parse_args()
+
+    incertidumbre = {
+        hoja: (getattr(args, hoja.lower())[0], float(getattr(args, hoja.lower())[1]))
+        for hoja in INCERTIDUMBRE_POR_DEFECTO
+    }
+    muestras = simular(optimizacion.leer_libro(args.libro), args.valor_kg, args.muestras, incertidumbre,
+                       args.procesos, args.perfil, args.tiempo_limite, args.semilla)
+    resumen, infactibles = resumir(muestras)
+    print(resumen.to_string(float_format='{:,.3f}'.format))
+    print(f"{len(muestras)} muestras, {infactibles} sin solución factible")
+    if args.salida:
+        muestras.to_csv(args.salida, index=False, encoding='utf-8-sig')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,995 @@
+"""
+Núcleo de optimización del modelo de sacrificio de reses.
+
+Lectura del libro de parámetros, construcción y solución del modelo y
+extracción del plan, sin dependencias de Streamlit: lo usan la aplicación
+(App.py) y el procesamiento por lotes (lote.py).
+"""
+import time
+
+import pandas as pd
+
+# NOTA: pulp y openpyxl se importan de forma diferida dentro de las funciones
+# para no cargar el solver al importar el módulo.
+
+# Hojas de disponibilidad que pueden venir a nivel diario y por finca (cientos de
+# miles de filas). Se leen en streaming y se agregan a las claves ZONA x SEMANA
+# que usa ejecutar_modelo: hoja -> columna de valor a sumar
+HOJAS_AGREGADAS = {'Oferta': 'OFERTA', 'Compras': 'DISPONIBLE'}
+
+def etiqueta_semana(fecha):
+    """Convierte una fecha en la etiqueta 'SEMANA.AÑO' (semana ISO) de la plantilla."""
+    año, semana, _ = pd.Timestamp(fecha).isocalendar()
+    return f"{semana}.{año}"
+
+def _clave_streaming(valor):
+    """
+    Normaliza una clave de agrupación: texto sin espacios y texto numérico como
+    número (la misma celda puede venir como 27.2025 o '27.2025').
+    """
+    if isinstance(valor, str):
+        valor = valor.strip()
+        try:
+            return float(valor)
+        except ValueError:
+            pass
+    return valor
+
+def agregar_hoja_streaming(filas, columna_valor):
+    """
+    Agrega fila por fila una hoja de Oferta/Compras por (ZONA, SEMANA).
+    Si la hoja trae FECHA en lugar de SEMANA (datos diarios) la fecha se convierte
+    a semana; columnas adicionales (p. ej. FINCA) se ignoran. La memoria usada es
+    proporcional al número de claves ZONA x SEMANA, no al número de filas.
+    Lanza ValueError con el número de fila si un valor no es numérico.
+    """
+    encabezado = [str(c).strip() if c is not None else '' for c in next(filas)]
+    i_zona = encabezado.index('ZONA')
+    i_valor = encabezado.index(columna_valor)
+    diaria = 'SEMANA' not in encabezado
+    i_semana = encabezado.index('FECHA' if diaria else 'SEMANA')
+
+    totales = {}
+    # Numeración de filas como en Excel (el encabezado es la fila 1)
+    for numero, fila in enumerate(filas, start=2):
+        zona = fila[i_zona]
+        if zona is None:
+            continue
+        semana = etiqueta_semana(fila[i_semana]) if diaria else fila[i_semana]
+        valor = fila[i_valor]
+        if valor is None or (isinstance(valor, str) and not valor.strip()):
+            valor = 0
+        try:
+            # Las celdas numéricas se suman tal cual; el texto numérico se convierte
+            valor = valor if isinstance(valor, (int, float)) else float(valor)
+        except (ValueError, TypeError):
+            raise ValueError(f"Fila {numero}: el valor de {columna_valor} no es numérico ({valor!r})") from None
+        clave = (_clave_streaming(zona), _clave_streaming(semana))
+        totales[clave] = totales.get(clave, 0) + valor
+
+    return pd.DataFrame(
+        [(zona, semana, valor) for (zona, semana), valor in totales.items()],
+        columns=['ZONA', 'SEMANA', columna_valor]
+    )
+
+def inferir_tipos(df):
+    """
+    Convierte a número las columnas de texto numérico (p. ej. SEMANA '27.2025'),
+    igual que lo hace pd.read_excel, para que las claves coincidan entre hojas.
+    """
+    for col in df.columns:
+        if df[col].dtype == object or pd.api.types.is_string_dtype(df[col]):
+            try:
+                df[col] = pd.to_numeric(df[col])
+            except (ValueError, TypeError):
+                pass
+    return df
+
+# Función para cargar y procesar el archivo Excel (ruta o archivo subido)
+def leer_libro(archivo):
+    """
+    Lee todas las hojas del libro de parámetros. Las hojas de Oferta y Compras
+    se leen en streaming y se agregan por ZONA x SEMANA (ver HOJAS_AGREGADAS).
+    """
+    # Los .xls no se pueden leer en modo streaming con openpyxl
+    if not str(getattr(archivo, 'name', archivo)).lower().endswith('.xlsx'):
+        excel_data = pd.ExcelFile(archivo)
+        return {sheet_name: pd.read_excel(excel_data, sheet_name=sheet_name)
+                for sheet_name in excel_data.sheet_names}
+
+    from openpyxl import load_workbook
+
+    # Lectura en modo solo lectura: las filas se recorren sin cargar el libro completo
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    dfs = {}
+    try:
+        for hoja in libro.worksheets:
+            filas = hoja.iter_rows(values_only=True)
+            if hoja.title in HOJAS_AGREGADAS:
+                try:
+                    dfs[hoja.title] = agregar_hoja_streaming(filas, HOJAS_AGREGADAS[hoja.title])
+                except ValueError as e:
+                    raise ValueError(f"Hoja {hoja.title}: {e}") from None
+                continue
+
+            # Hojas de parámetros (pequeñas): se construyen tal cual
+            encabezado = next(filas, None)
+            if encabezado is None:
+                dfs[hoja.title] = pd.DataFrame()
+                continue
+            datos = [fila for fila in filas if any(v is not None for v in fila)]
+            dfs[hoja.title] = pd.DataFrame(datos, columns=list(encabezado))
+    finally:
+        libro.close()
+
+    return {nombre: inferir_tipos(df) for nombre, df in dfs.items()}
+
+# Huella de los datos de entrada (para reconocer solicitudes idénticas)
+def huella_datos(inputs_opt_res, *parametros):
+    """Hash del contenido de todas las hojas más los parámetros dados."""
+    import hashlib
+
+    huella = hashlib.sha256(repr(parametros).encode())
+    for hoja in sorted(inputs_opt_res):
+        df = inputs_opt_res[hoja]
+        huella.update(hoja.encode())
+        huella.update(repr(list(df.columns)).encode())
+        huella.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return huella.hexdigest()
+
+# --- CAMBIOS DE LA VISTA PREVIA ---
+# Las ediciones de la vista previa se guardan como un diff por hoja sobre las
+# hojas leídas (que están en caché): {hoja: {'editadas': {fila: {columna: valor}},
+# 'nuevas': {fila: {columna: valor}}, 'eliminadas': [fila, ...]}}, con las
+# etiquetas del índice de la hoja original (las filas nuevas, a continuación).
+
+def registrar_cambios(diff, base, pagina, delta):
+    """
+    Agrega al diff de una hoja las ediciones del editor de una página. `delta` es
+    el estado del data_editor (posiciones dentro de `pagina`); `base` es la hoja
+    original, para numerar las filas nuevas a continuación.
+    """
+    filas = list(pagina.index)
+    for posicion, valores in delta.get('edited_rows', {}).items():
+        fila = filas[int(posicion)]
+        if fila in diff['nuevas']:
+            diff['nuevas'][fila].update(valores)
+        else:
+            diff['editadas'].setdefault(fila, {}).update(valores)
+    for posicion in delta.get('deleted_rows', []):
+        fila = filas[int(posicion)]
+        if fila in diff['nuevas']:
+            del diff['nuevas'][fila]
+        else:
+            diff['editadas'].pop(fila, None)
+            diff['eliminadas'].append(fila)
+    siguiente = max([len(base)] + ([int(base.index.max()) + 1] if len(base) else []) + [fila + 1 for fila in diff['nuevas']])
+    for valores in delta.get('added_rows', []):
+        diff['nuevas'][siguiente] = dict(valores)
+        siguiente += 1
+
+
+def aplicar_cambios(inputs_opt_res, cambios):
+    """Hojas con los cambios aplicados; las hojas sin cambios no se copian."""
+    resultado = dict(inputs_opt_res)
+    for hoja, diff in cambios.items():
+        df = inputs_opt_res[hoja].drop(index=diff['eliminadas'], errors='ignore')
+        por_columna = {}
+        for fila, valores in diff['editadas'].items():
+            for columna, valor in valores.items():
+                por_columna.setdefault(columna, {})[fila] = valor
+        for columna, valores in por_columna.items():
+            # Como objeto: el valor editado puede no ser del tipo de la columna
+            serie = df[columna].astype(object)
+            filas = [fila for fila in valores if fila in serie.index]
+            serie.loc[filas] = [valores[fila] for fila in filas]
+            df[columna] = serie
+        if diff['nuevas']:
+            nuevas = pd.DataFrame.from_dict(diff['nuevas'], orient='index').reindex(columns=df.columns)
+            df = pd.concat([df.astype(object), nuevas.astype(object)])
+        resultado[hoja] = inferir_tipos(df)
+    return resultado
+
+# Plantilla de Excel con las hojas y columnas que espera el modelo
+def plantilla_excel():
+    """Libro de ejemplo (bytes .xlsx) con datos de muestra en todas las hojas."""
+    from io import BytesIO
+
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        Zonas = ['ANTIOQUIA','VALLEDUPAR','COSTA','MAGDALENA MEDIO', 'LLANOS', 'SUR DEL CESAR', 'MAGDALENA MEDIO NORTE']
+        Semanas = ['27.2025', '28.2025', '29.2025', '30.2025']
+        Plantas = ['AGUACHICA','FRIGOSINU','CENTRAL GANADERA','FRIOGAN DORADA','COROZAL']
+        # Hoja de ejemplo para Oferta
+        pd.DataFrame({
+            'ZONA': [zona for zona in Zonas for _ in Semanas],
+            'SEMANA': Semanas * len(Zonas),
+            'OFERTA': 25
+        }).to_excel(writer, sheet_name='Oferta', index=False)
+    
+        # Hoja de ejemplo para Demanda
+        pd.DataFrame({
+            'SEMANA': Semanas,
+            'DEMANDA': 100
+        }).to_excel(writer, sheet_name='Demanda', index=False)
+    
+        # Hoja de ejemplo para CV_PDN
+        pd.DataFrame({
+            'PLANTA': Plantas,
+            'CV_PDN': 130000
+        }).to_excel(writer, sheet_name='CV_PDN', index=False)
+    
+        # Hoja de ejemplo para Costos de transporte de zonas a plantas integradas
+        pd.DataFrame({
+            'ZONA': [zona for zona in Zonas for _ in Plantas],
+            'PLANTA': Plantas * len(Zonas),
+            'C_TRANS_ZF': 1200000
+        }).to_excel(writer, sheet_name='CTransporteZF', index=False)
+    
+        # Hoja de ejemplo para RENDIMIENTO
+        pd.DataFrame({
+            'ZONA': [zona for zona in Zonas for _ in Plantas],
+            'PLANTA': Plantas * len(Zonas),
+            'RDTO': 0.55
+        }).to_excel(writer, sheet_name='RENDIMIENTO', index=False)
+        # Hoja de ejemplo para Diponibilidad de compra
+        pd.DataFrame({
+            'ZONA': [zona for zona in Zonas for _ in Semanas],
+            'SEMANA': Semanas * len(Zonas),
+            'DISPONIBLE': 25
+        }).to_excel(writer, sheet_name='Compras', index=False)
+        # Hoja de ejemplo para Capacidad de planta
+        pd.DataFrame({
+            'PLANTA': Plantas,
+            'CAP_PLANTA': 50
+        }).to_excel(writer, sheet_name='Cap_Planta', index=False) 
+        # Hoja de ejemplo para Costos de transporte de zonas a plantas de reses compradas
+        pd.DataFrame({
+            'ZONA': [zona for zona in Zonas for _ in Plantas],
+            'PLANTA': Plantas * len(Zonas),
+            'C_TRANS_ZF': 1200000
+        }).to_excel(writer, sheet_name='CTransporteZFC', index=False)   
+        # Hoja de ejemplo para Costos de transporte de plantas a Envigado
+        pd.DataFrame({
+            'PLANTA': Plantas,
+            'C_TRANS_E': 4000000
+        }).to_excel(writer, sheet_name='CTransporteE', index=False) 
+        #Hoja de ejemplo para el promedio de peso de reses en cada zona
+        pd.DataFrame({
+            'ZONA': Zonas,
+            'PESO': 400
+        }).to_excel(writer,sheet_name='PESORES',index=False)
+        #Hoja de ejemplo para el precio por kg negociado en cada zona
+        pd.DataFrame({
+            'ZONA': Zonas,
+            'PRECIO': 8000
+        }).to_excel(writer,sheet_name='PRECIOKG',index=False)
+        #Hoja de ejemplo para el Costo de reses compradas en cada zona
+        pd.DataFrame({
+            'ZONA': Zonas,
+            'CR_COMPRADA': 2500000
+        }).to_excel(writer,sheet_name='CR_COMPRADA',index=False)
+        #Hoja de ejemplo para el Costo de reses integradas en cada zona
+        pd.DataFrame({
+            'ZONA': Zonas,
+            'CR_INTEGRADA': 1500000
+        }).to_excel(writer,sheet_name='CR_INTEGRADA',index=False)
+    return output.getvalue()
+
+# Función para crear diccionarios de parámetros
+def crear_diccionario(df, columnas_clave, columna_valor):
+    diccionario = {}
+    for index, row in df.iterrows():
+        if len(columnas_clave) == 1:
+            clave = row[columnas_clave[0]]
+        else:
+            clave = tuple(row[col] for col in columnas_clave)
+        valor = row[columna_valor]
+        diccionario[clave] = valor
+    return diccionario
+
+# Construcción del modelo para un conjunto de semanas
+def construir_modelo(Zona, Planta_S, Semana, parametros, reforzada=False):
+    """
+    Crea el modelo de sacrificio para las semanas dadas (las restricciones no
+    enlazan semanas). Con `reforzada` agrega las desigualdades válidas de
+    refuerzos.py. Devuelve (modelo, variables, restricciones).
+    """
+    from pulp import LpProblem, LpMaximize, LpVariable, lpSum
+
+    valor_kg = parametros['valor_kg']
+    Demanda = parametros['Demanda']
+    Oferta_Int = parametros['Oferta_Int']
+    Oferta_Com = parametros['Oferta_Com']
+    Costo_Sac = parametros['Costo_Sac']
+    Costo_Viaje_Int = parametros['Costo_Viaje_Int']
+    Costo_Viaje_Comp = parametros['Costo_Viaje_Comp']
+    Costo_Tans_PT = parametros['Costo_Tans_PT']
+    Capacidad = parametros['Capacidad']
+    Precio_Int = parametros['Precio_Int']
+    Precio_Comp = parametros['Precio_Comp']
+    rdto = parametros['rdto']
+    Peso_Res = parametros['Peso_Res']
+
+    modelo = LpProblem("CostoSacrificio", LpMaximize)
+
+    # Variables de decisión
+    res_int = LpVariable.dicts('res_int', [(z,p,t) for z in Zona for p in Planta_S for t in Semana], lowBound=0, cat='Integer')
+    res_comp = LpVariable.dicts('res_comp', [(z,p,t) for z in Zona for p in Planta_S for t in Semana], lowBound=0, cat='Integer')
+    viaje_int = LpVariable.dicts('viaje_Int_zona', [(z,p,t) for z in Zona for p in Planta_S for t in Semana], lowBound=0, cat='Integer')
+    viaje_com = LpVariable.dicts('viaje_Com_zona', [(z,p,t) for z in Zona for p in Planta_S for t in Semana], lowBound=0, cat='Integer')
+    viaje_envigado = LpVariable.dicts('viaje_envigado', [(p,t) for p in Planta_S for t in Semana], lowBound=0, cat='Integer')
+
+    # Función objetivo
+    modelo += lpSum(
+        (res_int[z,p,t] * Peso_Res.get((z),0) * rdto.get((z,p),0) * valor_kg +
+        res_comp[z,p,t] * Peso_Res.get((z),0) * rdto.get((z,p),0) * valor_kg -
+        res_int[z,p,t] * Precio_Int.get((z),0) -
+        res_comp[z,p,t] * Precio_Comp.get((z),0) -
+        res_int[z,p,t] * Costo_Sac.get((p),0) -
+        res_comp[z,p,t] * Costo_Sac.get((p),0) -
+        viaje_int[z,p,t] * Costo_Viaje_Int.get((z,p),0) -
+        viaje_com[z,p,t] * Costo_Viaje_Comp.get((z,p),0) -
+        viaje_envigado[p,t] * Costo_Tans_PT.get((p),0)
+        for z in Zona for p in Planta_S for t in Semana)
+    )
+
+    # Restricciones (se guardan las de recursos para el análisis de sensibilidad)
+    restricciones = {'Demanda': {}, 'Oferta': {}, 'Compras': {}, 'Cap_Planta': {}, 'Viajes': {}}
+    for t in Semana:
+        restricciones['Demanda'][t] = (lpSum(res_int[z,p,t] for z in Zona for p in Planta_S) + 
+                  lpSum(res_comp[z,p,t] for z in Zona for p in Planta_S)) == Demanda[t]
+        modelo += restricciones['Demanda'][t]
+
+    for z in Zona:
+        for t in Semana:
+            restricciones['Oferta'][z,t] = lpSum(res_int[z,p,t] for p in Planta_S) <= Oferta_Int.get((z,t),0)
+            restricciones['Compras'][z,t] = lpSum(res_comp[z,p,t] for p in Planta_S) <= Oferta_Com.get((z,t),0)
+            modelo += restricciones['Oferta'][z,t]
+            modelo += restricciones['Compras'][z,t]
+
+    for p in Planta_S:
+        for t in Semana:
+            restricciones['Cap_Planta'][p,t] = (lpSum(res_int[z,p,t] for z in Zona) + lpSum(res_comp[z,p,t] for z in Zona) <= Capacidad.get((p),0))
+            modelo += restricciones['Cap_Planta'][p,t]
+
+    for z in Zona:
+        for p in Planta_S:
+            for t in Semana:
+                restricciones['Viajes']['res_int',z,p,t] = res_int[z,p,t] <= viaje_int[z,p,t] * 14
+                restricciones['Viajes']['res_comp',z,p,t] = res_comp[z,p,t] <= viaje_com[z,p,t] * 14
+                modelo += restricciones['Viajes']['res_int',z,p,t]
+                modelo += restricciones['Viajes']['res_comp',z,p,t]
+
+    for p in Planta_S:
+        for t in Semana:
+            modelo += (lpSum(res_int[z,p,t] for z in Zona) + lpSum(res_comp[z,p,t] for z in Zona)) <= viaje_envigado[p,t] * 84
+
+    variables = {
+        'res_int': res_int,
+        'res_comp': res_comp,
+        'viaje_int': viaje_int,
+        'viaje_com': viaje_com,
+        'viaje_envigado': viaje_envigado
+    }
+    if reforzada:
+        from refuerzos import agregar_refuerzos
+        restricciones['Refuerzos'] = agregar_refuerzos(modelo, Zona, Planta_S, Semana, parametros, variables)
+    return modelo, variables, restricciones
+
+# --- SOLUCIÓN POR SEMANAS CON CACHÉ ---
+# Ninguna restricción enlaza semanas: cada semana se puede resolver por separado
+# y guardar su solución con una huella de sus datos. Al editar filas de una
+# semana solo esa semana se vuelve a resolver; las demás se toman de la caché.
+# Se guardan también incumbentes no óptimos (tiempo límite) con su gap y el
+# perfil que los produjo: los reutiliza el mismo perfil, o cualquier perfil cuyas
+# tolerancias cumpla el gap alcanzado.
+
+# Hojas con columna SEMANA; el resto de hojas no depende de la semana
+HOJAS_SEMANALES = ('Oferta', 'Compras', 'Demanda')
+
+def firma_perfil(config):
+    """Opciones de perfil que determinan la solución de una semana."""
+    return tuple(config[clave] for clave in ('perfil', 'tiempo_limite', 'gap_relativo', 'gap_absoluto', 'semilla'))
+
+class CacheSemanas:
+    """Soluciones por semana (LRU acotado), compartidas entre corridas y sesiones."""
+
+    def __init__(self, max_semanas=1000):
+        import threading
+        from collections import OrderedDict
+
+        self.max_semanas = max_semanas
+        self._soluciones = OrderedDict()  # huella -> {firma de perfil: solución}
+        self._lock = threading.Lock()
+
+    def obtener(self, huella, config):
+        """
+        Solución guardada de la semana que sirve para el perfil `config`: la del
+        mismo perfil o una cuyo gap cumpla sus tolerancias. None si no hay.
+        """
+        from perfiles import dentro_de_tolerancia
+
+        with self._lock:
+            soluciones = self._soluciones.get(huella)
+            if not soluciones:
+                return None
+            self._soluciones.move_to_end(huella)
+            solucion = soluciones.get(firma_perfil(config))
+            if solucion is not None:
+                return solucion
+            for solucion in soluciones.values():
+                if dentro_de_tolerancia(solucion['solver']['objetivo'], solucion['solver']['cota'], config):
+                    return solucion
+            return None
+
+    def mejor_incumbente(self, huella):
+        """Solución guardada de la semana con mejor objetivo (para arrancar CBC), o None."""
+        with self._lock:
+            soluciones = [s for s in self._soluciones.get(huella, {}).values()
+                          if s['solver']['objetivo'] is not None]
+            return max(soluciones, key=lambda s: s['solver']['objetivo'], default=None)
+
+    def guardar(self, huella, config, solucion):
+        with self._lock:
+            self._soluciones.setdefault(huella, {})[firma_perfil(config)] = solucion
+            self._soluciones.move_to_end(huella)
+            while len(self._soluciones) > self.max_semanas:
+                self._soluciones.popitem(last=False)
+
+def huellas_semanas(inputs_opt_res, Zona, Planta_S, Semana, *parametros):
+    """
+    Huella de cada semana: sus filas en las hojas semanales más todo lo que no
+    depende de la semana (demás hojas, conjuntos de zonas y plantas, parámetros).
+    """
+    import hashlib
+
+    comun = hashlib.sha256(repr((sorted(map(str, Zona)), sorted(map(str, Planta_S)), parametros)).encode())
+    for hoja in sorted(set(inputs_opt_res) - set(HOJAS_SEMANALES)):
+        df = inputs_opt_res[hoja]
+        comun.update(hoja.encode())
+        comun.update(repr(list(df.columns)).encode())
+        comun.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+
+    huellas = {t: comun.copy() for t in Semana}
+    for hoja in HOJAS_SEMANALES:
+        df = inputs_opt_res[hoja]
+        for t, filas in df.groupby('SEMANA', sort=False):
+            if t in huellas:
+                huellas[t].update(hoja.encode())
+                huellas[t].update(pd.util.hash_pandas_object(filas, index=False).to_numpy().tobytes())
+    return {t: huella.hexdigest() for t, huella in huellas.items()}
+
+def resolver_por_semana(modelo, Zona, Planta_S, Semana, parametros, huellas, cache, config, reforzada=False):
+    """
+    Resuelve una a una, con el perfil `config`, las semanas sin solución
+    reutilizable en `cache` y asigna a `modelo` (el modelo completo) los valores
+    de todas las semanas. El tiempo límite del perfil es para todo el horizonte:
+    cada semana pendiente recibe la parte que le toca del tiempo que queda
+    (al menos 1 s), y lo que no use una semana pasa a las siguientes. Si la caché tiene un
+    incumbente de la semana que no sirve para el perfil, se usa como arranque.
+    Lanza RuntimeError si una semana termina sin solución factible. `reforzada`
+    como en construir_modelo. Devuelve las semanas reutilizadas y las resueltas,
+    y el resumen del solver sumado sobre el horizonte; el primer incumbente es
+    el de la semana resuelta que más tardó en tenerlo y `arranque` indica si
+    alguna semana resuelta partió de una solución de arranque.
+    """
+    from pulp import LpSolutionIntegerFeasible, LpSolutionOptimal, LpStatus, LpStatusOptimal
+    from heuristica import aplicar_arranque_voraz
+    from perfiles import calcular_gap, resolver_con_perfil
+
+    valores = {}
+    estado = (LpStatusOptimal, LpSolutionOptimal)
+    reutilizadas, resueltas, resumenes = [], [], []
+    guardadas = {t: cache.obtener(huellas[t], config) for t in Semana}
+    pendientes = sum(solucion is None for solucion in guardadas.values())
+    inicio = time.monotonic()
+    for t in Semana:
+        solucion = guardadas[t]
+        if solucion is None:
+            config_semana = config
+            if config['tiempo_limite'] is not None:
+                restante = config['tiempo_limite'] - (time.monotonic() - inicio)
+                config_semana = dict(config, tiempo_limite=max(1, int(restante // pendientes)))
+            pendientes -= 1
+            # Las variables del submodelo tienen los mismos nombres que en el completo
+            submodelo, variables, _ = construir_modelo(Zona, Planta_S, [t], parametros, reforzada)
+            incumbente = cache.mejor_incumbente(huellas[t])
+            if incumbente is not None:
+                for variable in submodelo.variables():
+                    variable.setInitialValue(incumbente['valores'][variable.name], check=False)
+                arranque = True
+            else:
+                arranque = config['arranque_heuristico'] and aplicar_arranque_voraz(
+                    submodelo, Zona, Planta_S, [t], parametros, variables
+                )
+            resumen = resolver_con_perfil(submodelo, config_semana, arranque=arranque)
+            valores_semana = {v.name: v.varValue for v in submodelo.variables()}
+            if (submodelo.sol_status not in (LpSolutionOptimal, LpSolutionIntegerFeasible)
+                    or None in valores_semana.values()):
+                raise RuntimeError(
+                    f"La semana {t} no tiene solución factible "
+                    f"({LpStatus[submodelo.status]}; CBC: {resumen['resultado'] or 'sin resultado'})"
+                )
+            solucion = {
+                'valores': valores_semana,
+                'estado': (submodelo.status, submodelo.sol_status),
+                'solver': resumen,
+            }
+            cache.guardar(huellas[t], config, solucion)
+            resueltas.append(t)
+        else:
+            reutilizadas.append(t)
+        valores.update(solucion['valores'])
+        resumenes.append(solucion['solver'])
+        if solucion['estado'][1] != LpSolutionOptimal and estado[1] == LpSolutionOptimal:
+            # El estado del horizonte es el de la primera semana no óptima
+            estado = solucion['estado']
+
+    modelo.assignVarsVals(valores)
+    modelo.assignStatus(*estado)
+
+    def total(campo):
+        valores_campo = [r[campo] for r in resumenes]
+        return None if None in valores_campo else sum(valores_campo)
+
+    objetivo, cota = total('objetivo'), total('cota')
+    # Del primer incumbente y el arranque solo cuentan las semanas resueltas en esta corrida
+    resumenes_resueltas = {t: r for r, t in zip(resumenes, Semana) if t in resueltas}
+    primeros = [r.get('primer_incumbente') for r in resumenes_resueltas.values()]
+    solver = {
+        'perfil': config['perfil'],
+        'resultado': f"{len(resueltas)} semanas resueltas, {len(reutilizadas)} de caché",
+        'objetivo': objetivo,
+        'cota': cota,
+        'gap': calcular_gap(objetivo, cota),
+        'nodos': total('nodos'),
+        'tiempo': sum(r['tiempo'] for r in resumenes_resueltas.values()),
+        # La semana que más tardó en tener una solución factible (segundos desde su inicio)
+        'primer_incumbente': None if not primeros or None in primeros else max(primeros),
+        'arranque': any(r.get('arranque') for r in resumenes_resueltas.values()),
+    }
+    return {'reutilizadas': reutilizadas, 'resueltas': resueltas}, solver
+
+# Conjuntos, parámetros y modelo (sin resolver) a partir de las hojas
+def preparar_modelo(inputs_opt_res, valor_kg, reforzada=False):
+    """
+    Construye el modelo completo sin resolverlo (`reforzada` como en
+    construir_modelo). Devuelve (modelo, contexto) con conjuntos, variables,
+    parámetros y restricciones.
+    """
+    # Definición de conjuntos
+    Zona = list(set(inputs_opt_res['Oferta']['ZONA']))
+    Planta_S = list(set(inputs_opt_res['CV_PDN']['PLANTA']))
+    Semana = list(set(inputs_opt_res['Demanda']['SEMANA']))
+
+    # Definición de parámetros
+    Demanda = crear_diccionario(inputs_opt_res['Demanda'], ['SEMANA'], 'DEMANDA')
+    Oferta_Int = crear_diccionario(inputs_opt_res['Oferta'], ['ZONA','SEMANA'], 'OFERTA')
+    Oferta_Com = crear_diccionario(inputs_opt_res['Compras'], ['ZONA','SEMANA'], 'DISPONIBLE')
+    Costo_Sac = crear_diccionario(inputs_opt_res['CV_PDN'], ['PLANTA'], 'CV_PDN')
+    Costo_Viaje_Int = crear_diccionario(inputs_opt_res['CTransporteZF'], ['ZONA','PLANTA'], 'C_TRANS_ZF')
+    Costo_Viaje_Comp = crear_diccionario(inputs_opt_res['CTransporteZFC'], ['ZONA','PLANTA'], 'C_TRANS_ZF')
+    Costo_Tans_PT = crear_diccionario(inputs_opt_res['CTransporteE'], ['PLANTA'], 'C_TRANS_E')
+    Capacidad = crear_diccionario(inputs_opt_res['Cap_Planta'], ['PLANTA'], 'CAP_PLANTA')
+    Precio_Int = crear_diccionario(inputs_opt_res['CR_INTEGRADA'], ['ZONA'], 'CR_INTEGRADA')
+    Precio_Comp = crear_diccionario(inputs_opt_res['CR_COMPRADA'], ['ZONA'], 'CR_COMPRADA')
+    rdto = crear_diccionario(inputs_opt_res['RENDIMIENTO'], ['ZONA','PLANTA'], 'RDTO')
+    Precio_Kg = crear_diccionario(inputs_opt_res['PRECIOKG'], ['ZONA'], 'PRECIO')
+    Peso_Res = crear_diccionario(inputs_opt_res['PESORES'], ['ZONA'], 'PESO')
+
+    parametros = {
+        'Precio_Int': Precio_Int,
+        'Precio_Comp': Precio_Comp,
+        'Costo_Sac': Costo_Sac,
+        # --- AGREGADOS LOS COSTOS DE TRANSPORTE FALTANTES ---
+        'Costo_Viaje_Int': Costo_Viaje_Int,
+        'Costo_Viaje_Comp': Costo_Viaje_Comp,
+        'Costo_Tans_PT': Costo_Tans_PT,
+        # ----------------------------------------------------
+        'Peso_Res': Peso_Res,
+        'rdto': rdto,
+        'valor_kg': valor_kg,
+        'Demanda': Demanda,
+        'Oferta_Int': Oferta_Int,
+        'Oferta_Com': Oferta_Com,
+        'Capacidad': Capacidad
+    }
+
+    # Creación del modelo
+    modelo, variables, restricciones = construir_modelo(Zona, Planta_S, Semana, parametros, reforzada)
+
+    contexto = {
+        'Zona': Zona,
+        'Planta_S': Planta_S,
+        'Semana': Semana,
+        'variables': variables,
+        'parametros': parametros,
+        'restricciones': restricciones,
+        'reforzada': reforzada,
+    }
+    return modelo, contexto
+
+# Modos de solución excluyentes entre sí
+def validar_modos(portafolio=False, grupos_zonas=None, plan_anterior=None, semanas_fijas=None):
+    """
+    Lanza ValueError si se pide más de un modo de solución (portafolio,
+    jerárquico, horizonte móvil) o semanas fijas sin plan anterior: ningún modo
+    ignora en silencio las opciones de otro.
+    """
+    modos = [nombre for nombre, activo in (
+        ('portafolio', portafolio),
+        ('jerárquico por grupos de zonas', grupos_zonas),
+        ('re-planificación desde el plan anterior', plan_anterior is not None),
+    ) if activo]
+    if len(modos) > 1:
+        raise ValueError(f"Los modos de solución {' y '.join(modos)} no se pueden combinar")
+    if semanas_fijas and plan_anterior is None:
+        raise ValueError("Las semanas fijas requieren el plan anterior")
+
+# Función principal del modelo
+def ejecutar_modelo(inputs_opt_res, valor_kg, portafolio=False, tiempo_limite=None, hilos=None,
+                    sensibilidad=False, cache_semanas=None, perfil='interactivo', grupos_zonas=None,
+                    plan_anterior=None, semanas_fijas=None, arranque_heuristico=None, reforzada=False):
+    """
+    Construye y resuelve el modelo de sacrificio. Devuelve (modelo, contexto, costos);
+    los errores de datos o del solver se propagan como excepciones. `perfil` es un
+    perfil de solver (ver perfiles.py); `tiempo_limite` y `hilos` reemplazan los
+    del perfil si no son None. El contexto incluye en 'solver' la cota y el gap
+    alcanzados. Con `sensibilidad`, el
+    contexto incluye además los precios sombra y costos reducidos de la solución
+    (ver analisis_sensibilidad). Con `cache_semanas` (CacheSemanas) se resuelve
+    semana a semana y solo las semanas cuyos datos cambiaron. Con `grupos_zonas`
+    se usa la solución jerárquica con ese número de grupos de zonas (ver
+    jerarquico.py). Con `plan_anterior` (DataFrame con el plan de una corrida
+    anterior) se re-planifica el horizonte móvil partiendo de ese plan y fijando
+    las `semanas_fijas` (ver horizonte.py). `portafolio`, `grupos_zonas` y
+    `plan_anterior` son modos excluyentes (ver validar_modos). `arranque_heuristico` reemplaza la
+    opción del perfil de arrancar desde la solución voraz (ver heuristica.py).
+    Con `reforzada` se usa la formulación con desigualdades válidas de
+    refuerzos.py (mismo óptimo, relajación más ajustada).
+    """
+    # Importación diferida del solver (solo al ejecutar el modelo)
+    from heuristica import aplicar_arranque_voraz
+    from perfiles import calcular_gap, configurar_perfil, resolver_con_perfil
+
+    validar_modos(portafolio, grupos_zonas, plan_anterior, semanas_fijas)
+    config = configurar_perfil(perfil, tiempo_limite=tiempo_limite, hilos=hilos,
+                               arranque_heuristico=arranque_heuristico)
+
+    modelo, contexto = preparar_modelo(inputs_opt_res, valor_kg, reforzada)
+    Zona, Planta_S, Semana = contexto['Zona'], contexto['Planta_S'], contexto['Semana']
+    parametros = contexto['parametros']
+
+    # Resolver el modelo
+    resultado_portafolio = None
+    resultado_semanas = None
+    resultado_jerarquico = None
+    resultado_horizonte = None
+    if portafolio:
+        # Carrera de configuraciones de solver en procesos paralelos
+        from portafolio import resolver_portafolio
+        # (el portafolio usa sus propias configuraciones; del perfil toma el tiempo,
+        # las tolerancias de gap y los hilos asignados, uno por configuración)
+        resultado_portafolio = resolver_portafolio(
+            modelo, tiempo_limite=config['tiempo_limite'] or 24 * 3600, max_procesos=config['hilos'],
+            gap_relativo=config['gap_relativo'], gap_absoluto=config['gap_absoluto']
+        )
+        if resultado_portafolio is None:
+            raise RuntimeError("Ninguna configuración del portafolio encontró solución factible")
+        objetivo = resultado_portafolio['objetivo']
+        cota = None
+        if resultado_portafolio['optimo_probado']:
+            # Óptimo dentro de las tolerancias del perfil
+            cota = objetivo + max(config['gap_absoluto'] or 0, (config['gap_relativo'] or 0) * abs(objetivo))
+        resultado_solver = {
+            'perfil': config['perfil'],
+            'resultado': f"Portafolio: {resultado_portafolio['ganador']}",
+            'objetivo': objetivo,
+            'cota': cota,
+            'gap': calcular_gap(objetivo, cota),
+            'nodos': None,
+            'tiempo': resultado_portafolio['tiempo'],
+        }
+    elif grupos_zonas:
+        # Agregar por grupos de zonas y desagregar (redes con muchas zonas)
+        from jerarquico import resolver_jerarquico
+        resultado_jerarquico, resultado_solver = resolver_jerarquico(
+            modelo, Zona, Planta_S, Semana, parametros, config, grupos_zonas
+        )
+    elif plan_anterior is not None:
+        # Horizonte móvil: arranque desde el plan anterior y semanas ejecutadas fijas
+        from horizonte import resolver_horizonte
+        resultado_horizonte, resultado_solver = resolver_horizonte(
+            modelo, contexto, plan_anterior, semanas_fijas, config
+        )
+    elif cache_semanas is not None:
+        # (el perfil no entra en la huella: la caché guarda la solución de cada perfil)
+        huellas = huellas_semanas(inputs_opt_res, Zona, Planta_S, Semana, valor_kg)
+        resultado_semanas, resultado_solver = resolver_por_semana(
+            modelo, Zona, Planta_S, Semana, parametros, huellas, cache_semanas, config, reforzada
+        )
+    else:
+        arranque = config['arranque_heuristico'] and aplicar_arranque_voraz(
+            modelo, Zona, Planta_S, Semana, parametros, contexto['variables']
+        )
+        resultado_solver = resolver_con_perfil(modelo, config, arranque=arranque)
+
+    # Preparar resultados
+    contexto.update({
+        'portafolio': resultado_portafolio,
+        'semanas': resultado_semanas,
+        'jerarquico': resultado_jerarquico,
+        'horizonte': resultado_horizonte,
+        'solver': resultado_solver
+    })
+    if sensibilidad:
+        contexto['sensibilidad'] = analisis_sensibilidad(modelo, contexto, hilos=config['hilos'])
+
+    costos = calcular_costos(contexto)
+
+    return modelo, contexto, costos
+
+
+# Costos e ingresos de una solución
+def calcular_costos(contexto):
+    """Componentes de costo, valor de la carne y Valorización Total de la solución del contexto."""
+    Zona, Planta_S, Semana = contexto['Zona'], contexto['Planta_S'], contexto['Semana']
+    res_int = contexto['variables']['res_int']
+    res_comp = contexto['variables']['res_comp']
+    viaje_int = contexto['variables']['viaje_int']
+    viaje_com = contexto['variables']['viaje_com']
+    viaje_envigado = contexto['variables']['viaje_envigado']
+    parametros = contexto['parametros']
+    Precio_Int = parametros['Precio_Int']
+    Precio_Comp = parametros['Precio_Comp']
+    Costo_Sac = parametros['Costo_Sac']
+    Costo_Viaje_Int = parametros['Costo_Viaje_Int']
+    Costo_Viaje_Comp = parametros['Costo_Viaje_Comp']
+    Costo_Tans_PT = parametros['Costo_Tans_PT']
+    Peso_Res = parametros['Peso_Res']
+    rdto = parametros['rdto']
+    valor_kg = parametros['valor_kg']
+
+    # Calcular métricas de costos
+    # --- BLOQUE CORREGIDO PARA CALCULAR COSTOS ---
+    # 1. Calcular cada componente por separado para asegurar precisión
+    val_costo_int = sum(res_int[z,p,t].varValue * Precio_Int.get((z),0) 
+                        for z in Zona for p in Planta_S for t in Semana)
+
+    val_costo_comp = sum(res_comp[z,p,t].varValue * Precio_Comp.get((z),0) 
+                         for z in Zona for p in Planta_S for t in Semana)
+
+    val_costo_sac = (sum(res_int[z,p,t].varValue * Costo_Sac.get((p),0) 
+                         for z in Zona for p in Planta_S for t in Semana) +
+                     sum(res_comp[z,p,t].varValue * Costo_Sac.get((p),0) 
+                         for z in Zona for p in Planta_S for t in Semana))
+
+    val_costo_tte_res = (sum(viaje_int[z,p,t].varValue * Costo_Viaje_Int.get((z,p),0) 
+                             for z in Zona for p in Planta_S for t in Semana) +
+                         sum(viaje_com[z,p,t].varValue * Costo_Viaje_Comp.get((z,p),0) 
+                             for z in Zona for p in Planta_S for t in Semana))
+
+    val_costo_tte_pt = sum(viaje_envigado[p,t].varValue * Costo_Tans_PT.get((p),0) 
+                           for p in Planta_S for t in Semana)
+
+    val_carne = (sum(res_int[z,p,t].varValue * Peso_Res.get((z),0) * rdto.get((z,p),0) * valor_kg 
+                     for z in Zona for p in Planta_S for t in Semana) +
+                 sum(res_comp[z,p,t].varValue * Peso_Res.get((z),0) * rdto.get((z,p),0) * valor_kg 
+                     for z in Zona for p in Planta_S for t in Semana))
+
+    # 2. Calcular la Valorización Total como una RESTA simple (Ingreso - Costos)
+    # Esto garantiza que el valor coincida visualmente con la tabla
+    total_costos = (val_costo_int + val_costo_comp + val_costo_sac + 
+                    val_costo_tte_res + val_costo_tte_pt)
+
+    val_valorizacion = val_carne - total_costos
+
+    # 3. Construir el diccionario final
+    costos = {
+        'Costo Integración': val_costo_int,
+        'Costo Compras': val_costo_comp,
+        'Costo Sacrificio': val_costo_sac,
+        'Costo Transporte Reses': val_costo_tte_res,
+        'Costo Transporte Canales': val_costo_tte_pt,
+        'Valor Carne': val_carne,
+        'Valorización Total': val_valorizacion  # <--- Aquí está la corrección clave
+    }
+    # -----------------------------------------------------------
+    return costos
+
+
+
+# Plan consolidado (Zona, Planta, Semana) con las reses de la solución
+def extraer_plan(contexto):
+    """Devuelve el plan de sacrificio con las combinaciones de valor positivo."""
+    data = []
+    res_int = contexto['variables']['res_int']
+    res_comp = contexto['variables']['res_comp']
+
+    for z in contexto['Zona']:
+        for p in contexto['Planta_S']:
+            for t in contexto['Semana']:
+                res_int_val = res_int[(z, p, t)].varValue if (z, p, t) in res_int else 0
+                res_comp_val = res_comp[(z, p, t)].varValue if (z, p, t) in res_comp else 0
+
+                # Solo agregar filas con valores positivos
+                if res_int_val > 0 or res_comp_val > 0:
+                    data.append({
+                        'Zona': z,
+                        'Planta': p,
+                        'Semana': t,
+                        'Reses integradas': res_int_val,
+                        'Reses compradas': res_comp_val,
+                        'Total reses': res_int_val + res_comp_val
+                    })
+
+    columnas = ['Zona', 'Planta', 'Semana', 'Reses integradas', 'Reses compradas', 'Total reses']
+    # Ordenar por semana, zona y planta
+    return pd.DataFrame(data, columns=columnas).sort_values(['Semana', 'Zona', 'Planta'])
+
+# --- ANÁLISIS DE SENSIBILIDAD ---
+# Los precios duales de un MIP no existen como tales: se fijan los viajes (las
+# decisiones enteras de camiones) en su valor óptimo, se relajan las reses a
+# continuas y se resuelve ese LP. Sus duales valen mientras no cambie el plan de
+# camiones (el precio de un camión adicional no está incluido).
+
+def analisis_sensibilidad(modelo, contexto, hilos=None):
+    """
+    Precios sombra de Cap_Planta, Oferta, Compras y Demanda, y costos reducidos de
+    las rutas zona→planta sin reses en la solución. Deja `modelo` con los valores y
+    el estado de la solución entera original. Devuelve un diccionario de listas de
+    registros (serializable a JSON).
+    """
+    from pulp import PULP_CBC_CMD, LpStatusOptimal
+
+    variables = contexto['variables']
+    restricciones = contexto['restricciones']
+    parametros = contexto['parametros']
+
+    valores = {v.name: v.varValue for v in modelo.variables()}
+    estado = (modelo.status, modelo.sol_status)
+    originales = [(v, v.lowBound, v.upBound, v.cat) for v in modelo.variables()]
+    try:
+        for nombre in ('viaje_int', 'viaje_com', 'viaje_envigado'):
+            for v in variables[nombre].values():
+                v.lowBound = v.upBound = round(v.varValue or 0)
+        for v in modelo.variables():
+            v.cat = 'Continuous'
+        modelo.solve(PULP_CBC_CMD(msg=False, threads=hilos))
+        if modelo.status != LpStatusOptimal:
+            raise RuntimeError("No se pudo resolver el LP de sensibilidad")
+        duales = {nombre: {clave: r.pi or 0.0 for clave, r in grupo.items()}
+                  for nombre, grupo in restricciones.items()}
+        reducidos = {nombre: {clave: v.dj or 0.0 for clave, v in variables[nombre].items()}
+                     for nombre in ('res_int', 'res_comp')}
+    finally:
+        for v, bajo, alto, cat in originales:
+            v.lowBound, v.upBound, v.cat = bajo, alto, cat
+        modelo.assignVarsVals(valores)
+        modelo.assignStatus(*estado)
+
+    def uso(restriccion):
+        # Lado izquierdo de la restricción con la solución entera
+        return _a_json(restriccion.value() - restriccion.constant)
+
+    demanda = [
+        {'Semana': t, 'Demanda': _a_json(parametros['Demanda'][t]), 'Precio sombra': duales['Demanda'][t]}
+        for t in restricciones['Demanda']
+    ]
+    oferta = [
+        {'Zona': z, 'Semana': t, 'Disponible': _a_json(parametros['Oferta_Int'].get((z, t), 0)),
+         'Utilizada': uso(r), 'Precio sombra': duales['Oferta'][z, t]}
+        for (z, t), r in restricciones['Oferta'].items()
+    ]
+    compras = [
+        {'Zona': z, 'Semana': t, 'Disponible': _a_json(parametros['Oferta_Com'].get((z, t), 0)),
+         'Utilizada': uso(r), 'Precio sombra': duales['Compras'][z, t]}
+        for (z, t), r in restricciones['Compras'].items()
+    ]
+    capacidad = [
+        {'Planta': p, 'Semana': t, 'Capacidad': _a_json(parametros['Capacidad'].get(p, 0)),
+         'Utilizada': uso(r), 'Precio sombra': duales['Cap_Planta'][p, t]}
+        for (p, t), r in restricciones['Cap_Planta'].items()
+    ]
+
+    # Rutas sin reses: el costo reducido se toma sin la restricción de viajes (que
+    # con cero camiones absorbe todo el valor de la ruta) y se le descuenta el
+    # flete por res de un camión lleno para ver si valdría la pena abrirla
+    fletes = {'res_int': parametros['Costo_Viaje_Int'], 'res_comp': parametros['Costo_Viaje_Comp']}
+    tipos = {'res_int': 'Integrada', 'res_comp': 'Comprada'}
+    rutas = []
+    for nombre, tipo in tipos.items():
+        for (z, p, t), v in variables[nombre].items():
+            if v.varValue:
+                continue
+            reducido = reducidos[nombre][z, p, t] + duales['Viajes'][nombre, z, p, t]
+            # Con la formulación reforzada el corte de la ruta también enlaza reses y camiones
+            reducido += duales.get('Refuerzos', {}).get(('Ruta', nombre, z, p, t), 0.0)
+            flete = _a_json(fletes[nombre].get((z, p), 0)) / 14
+            rutas.append({
+                'Tipo': tipo, 'Zona': z, 'Planta': p, 'Semana': t,
+                'Costo reducido': reducido,
+                'Flete por res': flete,
+                'Valor neto por res': reducido - flete,
+            })
+
+    return {
+        'Cap_Planta': capacidad,
+        'Oferta': oferta,
+        'Compras': compras,
+        'Demanda': demanda,
+        'Rutas': rutas,
+    }
+
+# --- SERIALIZACIÓN DE LA SOLUCIÓN ---
+# El contexto guarda variables PuLP y diccionarios con claves tupla; para enviarlo
+# como JSON (servicio de solución) se convierte a listas [clave..., valor].
+
+class ValorVariable:
+    """Valor fijo de una variable de la solución, con la interfaz `varValue` de PuLP."""
+    __slots__ = ('varValue',)
+
+    def __init__(self, valor):
+        self.varValue = valor
+
+def _a_json(valor):
+    """Convierte escalares de numpy a tipos nativos de Python."""
+    return valor.item() if hasattr(valor, 'item') else valor
+
+def _dicc_a_lista(diccionario, obtener=_a_json):
+    filas = []
+    for clave, valor in diccionario.items():
+        clave = clave if isinstance(clave, tuple) else (clave,)
+        filas.append([_a_json(c) for c in clave] + [obtener(valor)])
+    return filas
+
+def _lista_a_dicc(filas, construir=lambda v: v):
+    return {
+        (tuple(fila[:-1]) if len(fila) > 2 else fila[0]): construir(fila[-1])
+        for fila in filas
+    }
+
+def contexto_a_json(contexto):
+    """Convierte el contexto de una solución en un diccionario serializable a JSON."""
+    return {
+        'Zona': [_a_json(z) for z in contexto['Zona']],
+        'Planta_S': [_a_json(p) for p in contexto['Planta_S']],
+        'Semana': [_a_json(t) for t in contexto['Semana']],
+        'variables': {
+            nombre: _dicc_a_lista(variables, lambda v: v.varValue)
+            for nombre, variables in contexto['variables'].items()
+        },
+        'parametros': {
+            nombre: _dicc_a_lista(valor) if isinstance(valor, dict) else _a_json(valor)
+            for nombre, valor in contexto['parametros'].items()
+        },
+        'portafolio': contexto.get('portafolio'),
+        'semanas': contexto.get('semanas'),
+        'sensibilidad': contexto.get('sensibilidad'),
+        'solver': contexto.get('solver'),
+        'jerarquico': contexto.get('jerarquico'),
+        'horizonte': contexto.get('horizonte'),
+    }
+
+def contexto_desde_json(datos):
+    """Reconstruye un contexto a partir de contexto_a_json (variables como ValorVariable)."""
+    return {
+        'Zona': datos['Zona'],
+        'Planta_S': datos['Planta_S'],
+        'Semana': datos['Semana'],
+        'variables': {
+            nombre: _lista_a_dicc(filas, ValorVariable)
+            for nombre, filas in datos['variables'].items()
+        },
+        'parametros': {
+            nombre: _lista_a_dicc(valor) if isinstance(valor, list) else valor
+            for nombre, valor in datos['parametros'].items()
+        },
+        'portafolio': datos.get('portafolio'),
+        'semanas': datos.get('semanas'),
+        'sensibilidad': datos.get('sensibilidad'),
+        'solver': datos.get('solver'),
+        'jerarquico': datos.get('jerarquico'),
+        'horizonte': datos.get('horizonte'),
+    }
@@ -0,0 +1,183 @@
+"""
+Perfiles de solver.
+
+Cada perfil fija el tiempo límite, las tolerancias de gap (relativa y absoluta),
+los hilos, la semilla, las opciones de presolve y cortes de CBC y si se arranca
+desde la solución voraz de heuristica.py:
+
+    interactivo  respuesta rápida en la aplicación; acepta un gap de 0.5 % y
+                 arranca desde la solución voraz
+    nocturno     corridas largas (lotes, servicio); gap de 0.01 %
+    exacto       prueba optimalidad sin tolerancia ni tiempo límite
+
+Además de resolver, se lee el log de CBC para informar la cota y el gap
+alcanzados junto con los costos, y el tiempo hasta el primer incumbente.
+"""
+import os
+import re
+import tempfile
+import time
+
+PERFILES = {
+    'interactivo': {
+        'tiempo_limite': 60,
+        'gap_relativo': 0.005,
+        'gap_absoluto': None,
+        'hilos': None,
+        'semilla': None,
+        'presolve': True,
+        'cortes': None,
+        'arranque_heuristico': True,
+    },
+    'nocturno': {
+        'tiempo_limite': 1800,
+        'gap_relativo': 0.0001,
+        'gap_absoluto': None,
+        'hilos': None,
+        'semilla': 7,
+        'presolve': True,
+        'cortes': True,
+        'arranque_heuristico': False,
+    },
+    'exacto': {
+        'tiempo_limite': None,
+        'gap_relativo': 0,
+        'gap_absoluto': 0,
+        'hilos': None,
+        'semilla': 7,
+        'presolve': True,
+        'cortes': True,
+        'arranque_heuristico': False,
+    },
+}
+
+PERFIL_POR_DEFECTO = 'interactivo'
+
+
+def configurar_perfil(perfil=PERFIL_POR_DEFECTO, **cambios):
+    """
+    Copia de la configuración de `perfil` con los `cambios` que no sean None
+    (por ejemplo tiempo_limite=120). Lanza ValueError si el perfil no existe.
+    """
+    if perfil not in PERFILES:
+        raise ValueError(f"Perfil de solver desconocido: {perfil} (disponibles: {', '.join(PERFILES)})")
+    config = dict(PERFILES[perfil], perfil=perfil)
+    config.update({clave: valor for clave, valor in cambios.items() if valor is not None})
+    return config
+
+
+def crear_solver(config, ruta_log=None, arranque=False):
+    """
+    Solver CBC de PuLP con las opciones de una configuración de perfil. Con
+    `arranque`, los valores iniciales de las variables se pasan como solución
+    de arranque (MIP start).
+    """
+    from pulp import PULP_CBC_CMD
+
+    opciones = []
+    if config['semilla'] is not None:
+        opciones += [f"randomSeed {config['semilla']}", f"randomCbcSeed {config['semilla']}"]
+    return PULP_CBC_CMD(
+        msg=False,
+        timeLimit=config['tiempo_limite'],
+        gapRel=config['gap_relativo'],
+        gapAbs=config['gap_absoluto'],
+        threads=config['hilos'],
+        presolve=config['presolve'],
+        cuts=config['cortes'],
+        options=opciones,
+        logPath=ruta_log,
+        warmStart=arranque,
+    )
+
+
+def leer_log_cbc(ruta_log):
+    """Extrae del log de CBC el resultado, el objetivo, la cota final y los nodos."""
+    with open(ruta_log, encoding='utf-8', errors='replace') as archivo:
+        texto = archivo.read()
+
+    def numero(patron):
+        coincidencia = re.search(patron, texto, re.MULTILINE)
+        return float(coincidencia.group(1)) if coincidencia else None
+
+    resultado = re.search(r'^Result - (.+)$', texto, re.MULTILINE)
+    return {
+        'resultado': resultado.group(1).strip() if resultado else None,
+        'relajacion': numero(r'^Continuous objective value is (\S+)'),
+        'objetivo': numero(r'^Objective value:\s+(\S+)'),
+        # Solo aparece si la búsqueda se detuvo antes de terminar
+        'cota': numero(r'^(?:Upper|Lower) bound:\s+(\S+)'),
+        'nodos': numero(r'^Enumerated nodes:\s+(\S+)'),
+        # Segundos en que CBC encontró cada incumbente, en orden
+        'incumbentes': [float(s) for s in re.findall(r'Integer solution of \S+ found.*\(([\d.]+) seconds\)', texto)],
+        'arranque_aceptado': 'MIPStart provided solution' in texto,
+    }
+
+
+def calcular_gap(objetivo, cota):
+    """Gap relativo entre el objetivo y la cota (None si falta alguno)."""
+    if objetivo is None or cota is None:
+        return None
+    return abs(cota - objetivo) / max(abs(objetivo), 1e-9)
+
+
+def dentro_de_tolerancia(objetivo, cota, config):
+    """Si la distancia entre el objetivo y la cota cumple las tolerancias de gap de `config`."""
+    if objetivo is None or cota is None:
+        return False
+    holgura = max(config['gap_absoluto'] or 0, (config['gap_relativo'] or 0) * abs(objetivo))
+    # Margen por redondeo: la cota de una búsqueda completa es objetivo ± holgura
+    return abs(cota - objetivo) <= holgura + 1e-9 * max(1.0, abs(objetivo))
+
+
+def resolver_con_perfil(modelo, config, arranque=False):
+    """
+    Resuelve `modelo` con la configuración de perfil y devuelve el resumen del
+    solver: objetivo, cota, gap, nodos, tiempo, objetivo de la relajación lineal
+    y segundos hasta el primer incumbente. Si la búsqueda terminó, la cota
+    es la que garantizan las tolerancias de gap del perfil. `arranque` como en
+    crear_solver.
+    """
+    from pulp import LpMaximize, LpMinimize, LpSolutionOptimal
+
+    # Con -max, CBC evalúa la solución de arranque con el signo cambiado y poda
+    # con esa cota falsa: con arranque se resuelve la minimización equivalente
+    invertir = arranque and modelo.sense == LpMaximize
+    objetivo_modelo = modelo.objective
+    if invertir:
+        modelo.sense, modelo.objective = LpMinimize, -objetivo_modelo
+
+    descriptor, ruta_log = tempfile.mkstemp(suffix='.log', prefix='cbc_')
+    os.close(descriptor)
+    inicio = time.perf_counter()
+    try:
+        modelo.solve(crear_solver(config, ruta_log, arranque))
+        log = leer_log_cbc(ruta_log)
+    finally:
+        os.remove(ruta_log)
+        if invertir:
+            modelo.sense, modelo.objective = LpMaximize, objetivo_modelo
+
+    objetivo = log['objetivo']
+    cota = log['cota']
+    if invertir:
+        objetivo, cota, relajacion = (None if v is None else -v for v in (objetivo, cota, log['relajacion']))
+    else:
+        relajacion = log['relajacion']
+    if cota is None and objetivo is not None and modelo.sol_status == LpSolutionOptimal:
+        # Búsqueda completa: el óptimo está a lo sumo a la tolerancia del objetivo
+        holgura = max(config['gap_absoluto'] or 0, (config['gap_relativo'] or 0) * abs(objetivo))
+        cota = objetivo + holgura if modelo.sense == LpMaximize else objetivo - holgura
+
+    return {
+        'perfil': config['perfil'],
+        'resultado': log['resultado'],
+        'objetivo': objetivo,
+        'cota': cota,
+        'gap': calcular_gap(objetivo, cota),
+        'nodos': log['nodos'],
+        'tiempo': time.perf_counter() - inicio,
+        'relajacion': relajacion,
+        'primer_incumbente': log['incumbentes'][0] if log['incumbentes'] else None,
+        'arranque': arranque and log['arranque_aceptado'],
+    }
@@ -0,0 +1,127 @@
+"""
+Planificador de soluciones compartido por todas las sesiones de la aplicación.
+
+Limita cuántas soluciones corren a la vez en el proceso de Streamlit, pone en
+cola (en orden de llegada) las solicitudes adicionales, reparte los núcleos
+libres entre las soluciones como hilos del solver y evita resolver dos veces
+los mismos datos: si otra sesión ya está resolviendo una solicitud idéntica,
+se espera su resultado.
+"""
+import os
+import threading
+from collections import deque
+from concurrent.futures import CancelledError, Future
+from concurrent.futures import TimeoutError as TiempoAgotado
+
+
+class PlanificadorSolver:
+    """Control de admisión para las llamadas al solver dentro de un mismo proceso."""
+
+    def __init__(self, max_simultaneos=None, nucleos=None):
+        self.nucleos = nucleos or os.cpu_count() or 1
+        # Por defecto, una solución por cada dos núcleos (al menos una)
+        self.max_simultaneos = max_simultaneos or max(1, self.nucleos // 2)
+        self._condicion = threading.Condition()
+        self._en_curso = {}      # clave -> Future con el resultado
+        self._cola = deque()     # turnos en espera, en orden de llegada
+        self._activos = 0
+        self._hilos_en_uso = 0
+
+    def estado(self):
+        with self._condicion:
+            return {
+                'activos': self._activos,
+                'en_cola': len(self._cola),
+                'hilos_en_uso': self._hilos_en_uso,
+                'max_simultaneos': self.max_simultaneos,
+                'nucleos': self.nucleos,
+            }
+
+    def resolver(self, clave, funcion, al_esperar=None):
+        """
+        Ejecuta `funcion(hilos)` cuando haya cupo y devuelve su resultado.
+
+        `clave` identifica los datos de la solicitud: si ya hay una solución en
+        curso con la misma clave, no se lanza otra y se devuelve su resultado.
+        `al_esperar(posicion)` se llama periódicamente mientras la solicitud
+        espera turno (posicion 0 significa que se espera a otra sesión).
+
+        Los errores de `funcion` se propagan también a las sesiones que esperan
+        el mismo resultado. Si la sesión dueña se interrumpe (p. ej. un rerun o
+        stop de Streamlit, que no derivan de Exception), las que esperan no
+        reciben la interrupción: una de ellas toma la solicitud y la resuelve.
+        """
+        with self._condicion:
+            futuro = self._en_curso.get(clave)
+            propio = futuro is None
+            if propio:
+                futuro = Future()
+                self._en_curso[clave] = futuro
+                turno = object()
+                self._cola.append(turno)
+
+        if not propio:
+            # Otra sesión ya resuelve los mismos datos: esperar su resultado
+            while True:
+                if al_esperar:
+                    al_esperar(0)
+                try:
+                    return futuro.result(timeout=1)
+                except TiempoAgotado:
+                    continue
+                except CancelledError:
+                    # La sesión dueña se interrumpió: volver a pedir turno
+                    return self.resolver(clave, funcion, al_esperar)
+
+        hilos = 0
+        try:
+            # Esperar a estar de primero en la cola y a que haya cupo
+            while True:
+                with self._condicion:
+                    if self._cola[0] is turno and self._activos < self.max_simultaneos:
+                        self._cola.popleft()
+                        hilos = self._asignar_hilos()
+                        self._activos += 1
+                        self._hilos_en_uso += hilos
+                        self._condicion.notify_all()
+                        break
+                    posicion = self._cola.index(turno) + 1
+                    if al_esperar is None:
+                        self._condicion.wait()
+                        continue
+                # Fuera del lock: actualizar la interfaz y volver a revisar
+                al_esperar(posicion)
+                with self._condicion:
+                    self._condicion.wait(timeout=1)
+
+            resultado = funcion(hilos)
+            futuro.set_result(resultado)
+            return resultado
+        except Exception as e:
+            if not futuro.done():
+                futuro.set_exception(e)
+            raise
+        except BaseException:
+            # Interrupción de esta sesión, no un error de la solución: se libera la
+            # clave y las sesiones que esperan vuelven a pedir turno
+            with self._condicion:
+                if self._en_curso.get(clave) is futuro:
+                    del self._en_curso[clave]
+            futuro.cancel()
+            raise
+        finally:
+            with self._condicion:
+                if hilos:
+                    self._activos -= 1
+                    self._hilos_en_uso -= hilos
+                elif turno in self._cola:
+                    # La solicitud se canceló mientras esperaba turno
+                    self._cola.remove(turno)
+                if self._en_curso.get(clave) is futuro:
+                    del self._en_curso[clave]
+                self._condicion.notify_all()
+
+    def _asignar_hilos(self):
+        """Hilos para una nueva solución: su parte de los núcleos, sin pasar de los libres."""
+        libres = self.nucleos - self._hilos_en_uso
+        return max(1, min(libres, self.nucleos // self.max_simultaneos))
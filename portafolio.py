@@ -0,0 +1,257 @@
+"""
+Modo portafolio de solvers.
+
+Resuelve el mismo modelo con varias configuraciones (solver, semilla, hilos,
+cortes) en procesos paralelos, se queda con la primera solución óptima probada
+o, si ninguna lo logra antes del tiempo límite, con la mejor encontrada, y
+detiene el resto. La configuración ganadora se registra en un historial para
+priorizarla en las siguientes corridas. El historial se guarda en la ruta de
+la variable de entorno HISTORIAL_PORTAFOLIO o, si no está definida, en el
+directorio de datos del usuario (ver ruta_historial).
+"""
+import json
+import multiprocessing as mp
+import os
+import queue
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+# Historial de configuraciones ganadoras (una línea JSON por corrida)
+NOMBRE_HISTORIAL = 'historial_portafolio.jsonl'
+# Serializa las escrituras de las sesiones (hilos) de un mismo proceso; entre
+# procesos (trabajadores del servicio) se bloquea el archivo
+_LOCK_HISTORIAL = threading.Lock()
+
+# Configuraciones del portafolio. Las de solvers no instalados se omiten.
+CONFIGURACIONES = [
+    {'nombre': 'cbc_defecto', 'solver': 'PULP_CBC_CMD', 'opciones': {}},
+    {'nombre': 'cbc_semilla_7', 'solver': 'PULP_CBC_CMD',
+     'opciones': {'options': ['randomSeed 7', 'randomCbcSeed 7']}},
+    {'nombre': 'cbc_2_hilos', 'solver': 'PULP_CBC_CMD', 'opciones': {'threads': 2}},
+    {'nombre': 'cbc_sin_cortes', 'solver': 'PULP_CBC_CMD', 'opciones': {'cuts': False}},
+    {'nombre': 'cbc_cortes_raiz', 'solver': 'PULP_CBC_CMD',
+     'opciones': {'cuts': True, 'options': ['cutsOnOff root']}},
+    {'nombre': 'highs', 'solver': 'HiGHS', 'opciones': {}},
+    {'nombre': 'glpk', 'solver': 'GLPK_CMD', 'opciones': {}},
+]
+
+# Solvers que aceptan las tolerancias de gap del perfil (gapRel/gapAbs de PuLP)
+SOLVERS_CON_GAP = ('PULP_CBC_CMD', 'HiGHS')
+
+
+def configuraciones_disponibles(configuraciones=None):
+    """Filtra las configuraciones cuyo solver está instalado."""
+    from pulp import getSolver
+
+    disponibles = []
+    for config in configuraciones or CONFIGURACIONES:
+        try:
+            if getSolver(config['solver'], msg=False).available():
+                disponibles.append(config)
+        except Exception:
+            continue
+    return disponibles
+
+
+def ruta_historial():
+    """
+    Archivo del historial: HISTORIAL_PORTAFOLIO si está definida o, si no,
+    modelo_sacrificio/historial_portafolio.jsonl en XDG_DATA_HOME (por defecto
+    ~/.local/share; LOCALAPPDATA en Windows).
+    """
+    if os.environ.get('HISTORIAL_PORTAFOLIO'):
+        return Path(os.environ['HISTORIAL_PORTAFOLIO'])
+    datos = os.environ.get('XDG_DATA_HOME') or os.environ.get('LOCALAPPDATA') or Path.home() / '.local' / 'share'
+    return Path(datos) / 'modelo_sacrificio' / NOMBRE_HISTORIAL
+
+
+@contextmanager
+def _bloquear(archivo):
+    """Bloqueo exclusivo de `archivo` (abierto) entre procesos, donde el sistema lo permite."""
+    try:
+        import fcntl
+    except ImportError:
+        # Windows: sin bloqueo entre procesos; el lock de hilos sigue aplicando
+        yield
+        return
+    fcntl.flock(archivo.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(archivo.fileno(), fcntl.LOCK_UN)
+
+
+def victorias_historicas():
+    """Cuenta cuántas veces ganó cada configuración según el historial."""
+    victorias = {}
+    ruta = ruta_historial()
+    if not ruta.exists():
+        return victorias
+    with open(ruta, encoding='utf-8') as archivo:
+        for linea in archivo:
+            try:
+                nombre = json.loads(linea)['ganador']
+            except (ValueError, KeyError):
+                continue
+            victorias[nombre] = victorias.get(nombre, 0) + 1
+    return victorias
+
+
+def opciones_solver(config, gap_relativo=None, gap_absoluto=None, max_hilos=None):
+    """
+    Opciones de PuLP de una configuración con las tolerancias de gap dadas y sus
+    hilos limitados a `max_hilos`.
+    """
+    opciones = dict(config['opciones'])
+    if config['solver'] in SOLVERS_CON_GAP:
+        opciones.update({clave: valor for clave, valor in (('gapRel', gap_relativo), ('gapAbs', gap_absoluto))
+                         if valor is not None})
+    if max_hilos is not None and opciones.get('threads', 1) > max_hilos:
+        opciones['threads'] = max_hilos
+    return opciones
+
+
+def _resolver_configuracion(datos_modelo, config, tiempo_limite, cola):
+    """Proceso trabajador: resuelve una copia del modelo con una configuración."""
+    # Grupo de procesos propio para poder detener también el ejecutable del solver
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+
+    inicio = time.perf_counter()
+    try:
+        from pulp import LpProblem, getSolver, value
+
+        _, modelo = LpProblem.fromDict(datos_modelo)
+        solver = getSolver(config['solver'], msg=False, timeLimit=tiempo_limite, **config['opciones'])
+        modelo.solve(solver)
+        cola.put({
+            'nombre': config['nombre'],
+            'status': modelo.status,
+            'sol_status': modelo.sol_status,
+            'objetivo': value(modelo.objective),
+            'tiempo': time.perf_counter() - inicio,
+            'valores': {v.name: v.varValue for v in modelo.variables()},
+        })
+    except Exception as e:
+        cola.put({'nombre': config['nombre'], 'error': str(e), 'tiempo': time.perf_counter() - inicio})
+
+
+def detener_proceso(proceso):
+    """Detiene un proceso trabajador junto con el solver que haya lanzado."""
+    if not proceso.is_alive():
+        return
+    try:
+        os.killpg(proceso.pid, signal.SIGKILL)
+    except (AttributeError, ProcessLookupError, PermissionError):
+        proceso.kill()
+    proceso.join(timeout=5)
+
+
+def _registrar(ganador, resultados):
+    """Agrega la corrida al historial de configuraciones ganadoras."""
+    registro = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'ganador': ganador['nombre'],
+        'objetivo': ganador['objetivo'],
+        'tiempo': round(ganador['tiempo'], 3),
+        'resultados': [
+            {k: r.get(k) for k in ('nombre', 'sol_status', 'objetivo', 'tiempo', 'error')}
+            for r in resultados
+        ],
+    }
+    linea = json.dumps(registro, ensure_ascii=False) + '\n'
+    try:
+        ruta = ruta_historial()
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        with _LOCK_HISTORIAL, open(ruta, 'a', encoding='utf-8') as archivo, _bloquear(archivo):
+            archivo.write(linea)
+            archivo.flush()
+    except OSError:
+        pass
+
+
+def resolver_portafolio(modelo, tiempo_limite=60, configuraciones=None, max_procesos=None,
+                        gap_relativo=None, gap_absoluto=None):
+    """
+    Resuelve `modelo` en carrera con varias configuraciones de solver.
+
+    Lanza hasta `max_procesos` configuraciones disponibles (por defecto una por
+    núcleo), priorizando las que más han ganado en corridas anteriores; entre
+    todas no usan más de `max_procesos` hilos. Cada configuración se detiene
+    con las tolerancias `gap_relativo` y `gap_absoluto` (las del perfil). Devuelve
+    un resumen de la configuración ganadora y deja sus valores asignados en las
+    variables de `modelo`, igual que `modelo.solve`. Devuelve None si ninguna
+    configuración encontró solución factible.
+    """
+    from pulp import LpMaximize, LpSolutionIntegerFeasible, LpSolutionOptimal
+
+    victorias = victorias_historicas()
+    candidatas = sorted(configuraciones_disponibles(configuraciones),
+                        key=lambda c: -victorias.get(c['nombre'], 0))
+    max_procesos = max_procesos or os.cpu_count() or 1
+    candidatas = candidatas[:max_procesos]
+    if not candidatas:
+        return None
+    # Los núcleos asignados se reparten entre las configuraciones lanzadas
+    candidatas = [
+        dict(config, opciones=opciones_solver(config, gap_relativo, gap_absoluto,
+                                              max(1, max_procesos // len(candidatas))))
+        for config in candidatas
+    ]
+
+    # 'spawn' evita heredar los hilos del servidor de Streamlit en los trabajadores
+    ctx = mp.get_context('spawn')
+    cola = ctx.Queue()
+    datos_modelo = modelo.toDict()
+    procesos = [
+        ctx.Process(target=_resolver_configuracion, args=(datos_modelo, config, tiempo_limite, cola), daemon=True)
+        for config in candidatas
+    ]
+    for proceso in procesos:
+        proceso.start()
+
+    # Margen sobre el tiempo límite para arrancar procesos y leer soluciones
+    fin = time.monotonic() + tiempo_limite + 10
+    resultados = []
+    ganador = None
+    try:
+        while len(resultados) < len(procesos) and time.monotonic() < fin:
+            try:
+                resultado = cola.get(timeout=0.5)
+            except queue.Empty:
+                if not any(p.is_alive() for p in procesos) and cola.empty():
+                    break
+                continue
+            resultados.append(resultado)
+            if resultado.get('sol_status') == LpSolutionOptimal:
+                ganador = resultado
+                break
+    finally:
+        for proceso in procesos:
+            detener_proceso(proceso)
+
+    if ganador is None:
+        # Ninguna probó optimalidad: la mejor solución factible dentro del plazo
+        factibles = [r for r in resultados
+                     if r.get('sol_status') in (LpSolutionOptimal, LpSolutionIntegerFeasible)
+                     and r.get('objetivo') is not None]
+        if not factibles:
+            return None
+        signo = 1 if modelo.sense == LpMaximize else -1
+        ganador = max(factibles, key=lambda r: signo * r['objetivo'])
+
+    modelo.assignVarsVals(ganador['valores'])
+    modelo.assignStatus(ganador['status'], ganador['sol_status'])
+    _registrar(ganador, resultados)
+
+    return {
+        'ganador': ganador['nombre'],
+        'objetivo': ganador['objetivo'],
+        'tiempo': ganador['tiempo'],
+        'optimo_probado': ganador['sol_status'] == LpSolutionOptimal,
+        'lanzadas': [c['nombre'] for c in candidatas],
+    }
@@ -0,0 +1,188 @@
+"""
+Formulación reforzada de los enlaces reses-camiones.
+
+El modelo base enlaza reses y camiones con reses <= 14 * viajes por ruta y
+total de la planta <= 84 * viajes a Envigado. Su relajación lineal usa
+fracciones de camión, así que la cota es floja y el árbol de ramificación
+crece. La formulación reforzada agrega:
+
+- Redondeo entero por ruta: con U = mín(oferta de la zona, capacidad de la
+  planta, demanda de la semana) = 14k + q (0 < q < 14), toda solución entera
+  cumple reses <= q * viajes + (14 - q) * k. Es la envolvente convexa de
+  {reses <= U, reses <= 14 * viajes, viajes entero}; con U < 14 queda
+  reses <= U * viajes.
+- Lo mismo por planta hacia Envigado, con U = mín(capacidad, demanda) y 84.
+- Cortes de conteo por semana: la demanda se transporta completa, luego
+  suma de viajes >= techo(Demanda / 14) y viajes a Envigado >= techo(Demanda / 84).
+- Cotas de camiones por capacidad: viajes <= techo(U / 14) (y U / 84 hacia
+  Envigado). Un camión de más solo agrega costo, así que con fletes no negativos
+  la cota conserva alguna solución óptima; con fletes negativos no se aplica.
+
+Los demás cortes son válidos para toda solución entera: el óptimo no cambia.
+
+Uso (nodos y tiempo frente a la formulación base):
+    python refuerzos.py [LIBRO.xlsx ...] [--generar 10 20 40] [--semillas 3]
+                        [--perfil interactivo] [--tiempo-limite 60]
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+RESES_POR_CAMION = 14
+RESES_POR_CAMION_ENVIGADO = 84
+
+
+def _redondeo(reses, viajes, limite, por_camion):
+    """Corte de redondeo entero reses <= q * viajes + (por_camion - q) * k, o None si no refuerza."""
+    k, q = divmod(limite, por_camion)
+    if q == 0:
+        return None
+    return reses <= q * viajes + (por_camion - q) * k
+
+
+def agregar_refuerzos(modelo, Zona, Planta_S, Semana, parametros, variables):
+    """
+    Agrega a `modelo` las desigualdades válidas y las cotas de camiones.
+    Devuelve las restricciones agregadas con claves (familia, ...).
+    """
+    from pulp import lpSum
+
+    ofertas = {'res_int': parametros['Oferta_Int'], 'res_comp': parametros['Oferta_Com']}
+    fletes = {'res_int': parametros['Costo_Viaje_Int'], 'res_comp': parametros['Costo_Viaje_Comp']}
+    viajes = {'res_int': variables['viaje_int'], 'res_comp': variables['viaje_com']}
+
+    refuerzos = {}
+    for t in Semana:
+        demanda = math.floor(parametros['Demanda'][t])
+        for p in Planta_S:
+            capacidad = math.floor(parametros['Capacidad'].get(p, 0))
+            for nombre in ('res_int', 'res_comp'):
+                for z in Zona:
+                    limite = max(0, min(math.floor(ofertas[nombre].get((z, t), 0)), capacidad, demanda))
+                    reses, viaje = variables[nombre][z, p, t], viajes[nombre][z, p, t]
+                    if fletes[nombre].get((z, p), 0) >= 0:
+                        viaje.upBound = math.ceil(limite / RESES_POR_CAMION)
+                    corte = _redondeo(reses, viaje, limite, RESES_POR_CAMION)
+                    if corte is not None:
+                        refuerzos['Ruta', nombre, z, p, t] = corte
+
+            limite = max(0, min(capacidad, demanda))
+            envigado = variables['viaje_envigado'][p, t]
+            if parametros['Costo_Tans_PT'].get(p, 0) >= 0:
+                envigado.upBound = math.ceil(limite / RESES_POR_CAMION_ENVIGADO)
+            total = lpSum(variables[nombre][z, p, t] for nombre in ('res_int', 'res_comp') for z in Zona)
+            corte = _redondeo(total, envigado, limite, RESES_POR_CAMION_ENVIGADO)
+            if corte is not None:
+                refuerzos['Envigado', p, t] = corte
+
+        refuerzos['Camiones_semana', t] = lpSum(
+            viajes[nombre][z, p, t] for nombre in viajes for z in Zona for p in Planta_S
+        ) >= math.ceil(parametros['Demanda'][t] / RESES_POR_CAMION)
+        refuerzos['Envigado_semana', t] = lpSum(
+            variables['viaje_envigado'][p, t] for p in Planta_S
+        ) >= math.ceil(parametros['Demanda'][t] / RESES_POR_CAMION_ENVIGADO)
+
+    for restriccion in refuerzos.values():
+        modelo += restriccion
+    return refuerzos
+
+
+# --- COMPARACIÓN CON LA FORMULACIÓN BASE ---
+
+def generar_instancia(n_zonas, n_plantas=5, n_semanas=4, semilla=0):
+    """Hojas de entrada aleatorias (mismas columnas que la plantilla) para pruebas de rendimiento."""
+    generador = np.random.default_rng(semilla)
+    Zonas = [f'Z{i}' for i in range(n_zonas)]
+    Plantas = ['AGUACHICA'] + [f'P{i}' for i in range(n_plantas - 1)]
+    Semanas = [round(27 + i + 0.2025, 4) for i in range(n_semanas)]
+    zona_semana = pd.DataFrame([(z, t) for z in Zonas for t in Semanas], columns=['ZONA', 'SEMANA'])
+    zona_planta = pd.DataFrame([(z, p) for z in Zonas for p in Plantas], columns=['ZONA', 'PLANTA'])
+
+    def enteros(bajo, alto, n):
+        return generador.integers(bajo, alto, n, endpoint=True)
+
+    # Demanda cubrible con la capacidad de las plantas y la oferta de las zonas
+    capacidad = enteros(40, 80, len(Plantas))
+    oferta = enteros(10, 40, len(zona_semana))
+    demanda = [
+        int(min(capacidad.sum(), oferta[zona_semana['SEMANA'] == t].sum()) * generador.uniform(0.3, 0.6))
+        for t in Semanas
+    ]
+    return {
+        'Oferta': zona_semana.assign(OFERTA=oferta),
+        'Compras': zona_semana.assign(DISPONIBLE=enteros(10, 40, len(zona_semana))),
+        'Demanda': pd.DataFrame({'SEMANA': Semanas, 'DEMANDA': demanda}),
+        'CV_PDN': pd.DataFrame({'PLANTA': Plantas, 'CV_PDN': enteros(100000, 160000, len(Plantas))}),
+        'Cap_Planta': pd.DataFrame({'PLANTA': Plantas, 'CAP_PLANTA': capacidad}),
+        'CTransporteZF': zona_planta.assign(C_TRANS_ZF=enteros(800000, 1600000, len(zona_planta))),
+        'CTransporteZFC': zona_planta.assign(C_TRANS_ZF=enteros(800000, 1600000, len(zona_planta))),
+        'CTransporteE': pd.DataFrame({'PLANTA': Plantas, 'C_TRANS_E': enteros(3000000, 5000000, len(Plantas))}),
+        'RENDIMIENTO': zona_planta.assign(RDTO=generador.uniform(0.5, 0.6, len(zona_planta)).round(3)),
+        'PESORES': pd.DataFrame({'ZONA': Zonas, 'PESO': enteros(380, 450, len(Zonas))}),
+        'PRECIOKG': pd.DataFrame({'ZONA': Zonas, 'PRECIO': 8000}),
+        'CR_COMPRADA': pd.DataFrame({'ZONA': Zonas, 'CR_COMPRADA': enteros(2300000, 2700000, len(Zonas))}),
+        'CR_INTEGRADA': pd.DataFrame({'ZONA': Zonas, 'CR_INTEGRADA': enteros(1300000, 1700000, len(Zonas))}),
+    }
+
+
+def comparar_formulaciones(inputs_opt_res, valor_kg=22000.0, perfil='interactivo', tiempo_limite=None):
+    """Resuelve un libro con la formulación base y la reforzada y compara relajación, nodos y tiempo."""
+    from optimizacion import ejecutar_modelo
+
+    comparacion = {}
+    for modo, reforzada in (('base', False), ('reforzada', True)):
+        inicio = time.perf_counter()
+        _, contexto, _ = ejecutar_modelo(inputs_opt_res, valor_kg, perfil=perfil, tiempo_limite=tiempo_limite,
+                                         reforzada=reforzada)
+        solver = contexto['solver']
+        comparacion[modo] = {
+            'relajacion': solver['relajacion'],
+            'objetivo': solver['objetivo'],
+            'gap': solver['gap'],
+            'nodos': solver['nodos'],
+            'tiempo': round(time.perf_counter() - inicio, 2),
+        }
+    return comparacion
+
+
+def main():
+    from optimizacion import leer_libro
+    from perfiles import PERFILES
+
+    parser = argparse.ArgumentParser(description="Compara la formulación reforzada con la base.")
+    parser.add_argument('libros', nargs='*', help="Libros de parámetros (.xlsx/.xls)")
+    parser.add_argument('--generar', type=int, nargs='*', default=[],
+                        help="Números de zonas de las instancias aleatorias a generar")
+    parser.add_argument('--plantas', type=int, default=5, help="Plantas de las instancias generadas")
+    parser.add_argument('--semanas', type=int, default=4, help="Semanas de las instancias generadas")
+    parser.add_argument('--semillas', type=int, default=1, help="Instancias generadas por número de zonas")
+    parser.add_argument('--valor-kg', type=float, default=22000.0, help="Valor comercial de Kg de carne ($)")
+    parser.add_argument('--perfil', choices=list(PERFILES), default='interactivo', help="Perfil de solver")
+    parser.add_argument('--tiempo-limite', type=int, default=None, help="Tiempo límite por solución (reemplaza el del perfil)")
+    parser.add_argument('--salida', default=None, help="CSV donde guardar la comparación")
+    args = parser.parse_args()
+
+    instancias = [(libro, leer_libro(libro)) for libro in args.libros]
+    instancias += [
+        (f"generada_z{n_zonas}_s{semilla}", generar_instancia(n_zonas, args.plantas, args.semanas, semilla))
+        for n_zonas in args.generar for semilla in range(args.semillas)
+    ]
+    if not instancias:
+        parser.error("Indique libros o --generar")
+
+    filas = []
+    for nombre, inputs_opt_res in instancias:
+        comparacion = comparar_formulaciones(inputs_opt_res, args.valor_kg, args.perfil, args.tiempo_limite)
+        for modo, resultado in comparacion.items():
+            filas.append(dict(instancia=nombre, modo=modo, **resultado))
+        print(pd.DataFrame(filas[-2:]).to_string(index=False, header=len(filas) == 2))
+    tabla = pd.DataFrame(filas)
+    if args.salida:
+        tabla.to_csv(args.salida, index=False, encoding='utf-8-sig')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,376 @@
+"""
+Servicio HTTP local de solución del modelo de sacrificio.
+
+Recibe paquetes de entrada, los encola y los resuelve con un número acotado de
+procesos trabajadores, cada uno con tiempo límite propio. Los resultados se
+guardan en caché por contenido del paquete: enviar dos veces los mismos datos
+devuelve el mismo trabajo sin volver a resolver. La aplicación de Streamlit
+(variable de entorno SERVICIO_MODELO_URL) y otras herramientas internas
+actúan como clientes ligeros.
+
+Endpoints:
+    POST /trabajos                  Envía un paquete; responde {"id", "estado", ...}
+                                    - JSON: {"hojas": {hoja: [filas]}, "valor_kg": 22000,
+                                             "perfil": "interactivo", "tiempo_limite": null,
+                                             "portafolio": false, "sensibilidad": false,
+                                             "grupos_zonas": null, "plan_anterior": null,
+                                             "semanas_fijas": [], "arranque_heuristico": null}
+                                      (plan_anterior: filas del plan de la corrida
+                                      anterior para re-planificar, ver horizonte.py;
+                                      arranque_heuristico: null usa el del perfil)
+                                    - Libro Excel (application/octet-stream) con
+                                      ?valor_kg=...&perfil=...&tiempo_limite=...&arranque_heuristico=...
+                                    El tiempo límite, si se da, reemplaza el del perfil
+    GET  /trabajos/<id>             Estado del trabajo y posición en la cola
+    GET  /trabajos/<id>/resultado   Costos, cota y gap, plan y contexto de la solución
+    GET  /salud                     Trabajadores, cola y trabajos guardados
+
+Uso:
+    python servicio.py [--puerto 8600] [--trabajadores 2] [--max-cola 50]
+                       [--tiempo-maximo 14400]
+
+Un trabajo que pasa el tiempo máximo del servicio (o el tiempo límite del
+solver más un margen, si es menor) se detiene y queda como tiempo_agotado.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib import request as urllib_request
+from urllib.parse import parse_qs, urlparse
+
+import optimizacion
+from perfiles import configurar_perfil
+from portafolio import detener_proceso
+
+# Segundos de margen sobre el tiempo límite del solver antes de detener un trabajo
+MARGEN_TIEMPO = 30
+# Duración máxima por defecto de un trabajo (segundos de reloj), también sin
+# tiempo límite del solver (perfil exacto)
+TIEMPO_MAXIMO_TRABAJO = 4 * 3600
+
+
+class ColaLlena(Exception):
+    """La cola de trabajos alcanzó su capacidad máxima."""
+
+
+def _resolver_trabajo(paquete, conexion):
+    """Proceso trabajador: resuelve un paquete y envía el resultado por `conexion`."""
+    # Grupo de procesos propio para poder detener también el ejecutable del solver
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+
+    try:
+        import pandas as pd
+        from pulp import LpSolution, LpStatus
+
+        if 'excel' in paquete:
+            archivo = BytesIO(paquete['excel'])
+            archivo.name = 'paquete.xlsx'
+            inputs_opt_res = optimizacion.leer_libro(archivo)
+        else:
+            inputs_opt_res = {hoja: pd.DataFrame(filas) for hoja, filas in paquete['hojas'].items()}
+        plan_anterior = paquete.get('plan_anterior')
+
+        modelo, contexto, costos = optimizacion.ejecutar_modelo(
+            inputs_opt_res, paquete['valor_kg'],
+            portafolio=paquete['portafolio'], tiempo_limite=paquete['tiempo_limite'],
+            sensibilidad=paquete['sensibilidad'], perfil=paquete['perfil'],
+            grupos_zonas=paquete['grupos_zonas'],
+            plan_anterior=None if plan_anterior is None else pd.DataFrame(plan_anterior),
+            semanas_fijas=paquete.get('semanas_fijas'),
+            arranque_heuristico=paquete.get('arranque_heuristico')
+        )
+        conexion.send(('terminado', {
+            'estado_solver': LpStatus[modelo.status],
+            'solucion': LpSolution[modelo.sol_status],
+            'costos': {concepto: float(valor) for concepto, valor in costos.items()},
+            'solver': contexto['solver'],
+            'plan': json.loads(optimizacion.extraer_plan(contexto).to_json(orient='records')),
+            'contexto': optimizacion.contexto_a_json(contexto),
+        }))
+    except Exception as e:
+        conexion.send(('error', str(e)))
+    finally:
+        conexion.close()
+
+
+class ServicioSolucion:
+    """Cola de trabajos con un grupo acotado de trabajadores y caché de resultados."""
+
+    def __init__(self, trabajadores=2, max_cola=50, max_resultados=100, tiempo_maximo=TIEMPO_MAXIMO_TRABAJO):
+        self.trabajadores = trabajadores
+        self.max_cola = max_cola
+        self.max_resultados = max_resultados
+        self.tiempo_maximo = tiempo_maximo
+        self._ctx = mp.get_context('spawn')
+        self._lock = threading.Lock()
+        self._cola = queue.Queue()
+        self._trabajos = {}            # id -> datos del trabajo
+        self._cache = {}               # clave del paquete -> id
+        self._pendientes = deque()     # ids en cola, en orden de llegada
+        self._terminados = deque()     # ids terminados, para liberar los más antiguos
+        self._hilos = [
+            threading.Thread(target=self._atender, daemon=True, name=f"trabajador-{i}")
+            for i in range(trabajadores)
+        ]
+        for hilo in self._hilos:
+            hilo.start()
+
+    def enviar(self, paquete, clave):
+        """Encola un paquete (o reutiliza el trabajo con la misma clave) y devuelve su estado."""
+        with self._lock:
+            id_existente = self._cache.get(clave)
+            if id_existente is not None:
+                return dict(self._vista(id_existente), cacheado=True)
+            if len(self._pendientes) >= self.max_cola:
+                raise ColaLlena(f"La cola tiene {len(self._pendientes)} trabajos pendientes")
+
+            id_trabajo = uuid.uuid4().hex[:12]
+            self._trabajos[id_trabajo] = {
+                'estado': 'en_cola',
+                'clave': clave,
+                'paquete': paquete,
+                # Tiempo efectivo del solver (None: sin límite, perfil exacto)
+                'tiempo_limite': configurar_perfil(paquete['perfil'], tiempo_limite=paquete['tiempo_limite'])['tiempo_limite'],
+                'creado': time.time(),
+            }
+            self._cache[clave] = id_trabajo
+            self._pendientes.append(id_trabajo)
+            vista = self._vista(id_trabajo)
+        self._cola.put(id_trabajo)
+        return dict(vista, cacheado=False)
+
+    def estado(self, id_trabajo):
+        """Estado de un trabajo, o None si no existe."""
+        with self._lock:
+            return self._vista(id_trabajo) if id_trabajo in self._trabajos else None
+
+    def resultado(self, id_trabajo):
+        """Resultado de un trabajo terminado, o None si no existe o aún no termina."""
+        with self._lock:
+            trabajo = self._trabajos.get(id_trabajo)
+            return trabajo.get('resultado') if trabajo else None
+
+    def salud(self):
+        with self._lock:
+            return {
+                'trabajadores': self.trabajadores,
+                'tiempo_maximo': self.tiempo_maximo,
+                'en_cola': len(self._pendientes),
+                'ejecutando': sum(1 for t in self._trabajos.values() if t['estado'] == 'ejecutando'),
+                'guardados': len(self._terminados),
+                'max_cola': self.max_cola,
+            }
+
+    def _vista(self, id_trabajo):
+        """Resumen público de un trabajo (sin paquete ni resultado). Requiere el lock."""
+        trabajo = self._trabajos[id_trabajo]
+        vista = {'id': id_trabajo, 'estado': trabajo['estado'], 'creado': trabajo['creado']}
+        if trabajo['estado'] == 'en_cola':
+            vista['posicion'] = self._pendientes.index(id_trabajo) + 1
+        for campo in ('iniciado', 'terminado', 'error'):
+            if campo in trabajo:
+                vista[campo] = trabajo[campo]
+        if 'terminado' in trabajo:
+            vista['tiempo'] = round(trabajo['terminado'] - trabajo['iniciado'], 2)
+        return vista
+
+    def _atender(self):
+        """Hilo trabajador: toma trabajos de la cola y los resuelve en un proceso aparte."""
+        while True:
+            id_trabajo = self._cola.get()
+            with self._lock:
+                trabajo = self._trabajos[id_trabajo]
+                self._pendientes.remove(id_trabajo)
+                trabajo['estado'] = 'ejecutando'
+                trabajo['iniciado'] = time.time()
+
+            receptor, emisor = self._ctx.Pipe(duplex=False)
+            # No es daemon: en modo portafolio el trabajador lanza sus propios procesos
+            proceso = self._ctx.Process(target=_resolver_trabajo, args=(trabajo['paquete'], emisor))
+            proceso.start()
+            emisor.close()
+
+            tiempo_limite = trabajo['tiempo_limite']
+            if tiempo_limite is not None and tiempo_limite + MARGEN_TIEMPO <= self.tiempo_maximo:
+                espera, motivo = tiempo_limite + MARGEN_TIEMPO, f"el tiempo límite de {tiempo_limite} s"
+            else:
+                espera, motivo = self.tiempo_maximo, f"el tiempo máximo del servicio ({self.tiempo_maximo} s)"
+            if receptor.poll(espera):
+                try:
+                    estado, datos = receptor.recv()
+                except EOFError:
+                    estado, datos = 'error', "El proceso trabajador terminó sin enviar resultado"
+            else:
+                estado, datos = 'tiempo_agotado', f"Se superó {motivo}"
+            receptor.close()
+            detener_proceso(proceso)
+            proceso.join()
+
+            with self._lock:
+                trabajo['estado'] = estado
+                trabajo['terminado'] = time.time()
+                trabajo.pop('paquete', None)
+                if estado == 'terminado':
+                    trabajo['resultado'] = datos
+                else:
+                    # Los fallos no se guardan en caché: reenviar el paquete lo reintenta
+                    trabajo['error'] = datos
+                    self._cache.pop(trabajo['clave'], None)
+                self._terminados.append(id_trabajo)
+                while len(self._terminados) > self.max_resultados:
+                    id_antiguo = self._terminados.popleft()
+                    antiguo = self._trabajos.pop(id_antiguo)
+                    if self._cache.get(antiguo['clave']) == id_antiguo:
+                        del self._cache[antiguo['clave']]
+
+
+def clave_paquete(contenido, valor_kg, tiempo_limite, portafolio, sensibilidad=False, perfil='interactivo',
+                  grupos_zonas=None, arranque_heuristico=None):
+    """Huella del paquete: contenido más los parámetros que cambian la solución."""
+    huella = hashlib.sha256(contenido)
+    huella.update(json.dumps([valor_kg, tiempo_limite, portafolio, sensibilidad, perfil, grupos_zonas,
+                              arranque_heuristico]).encode())
+    return huella.hexdigest()
+
+
+class ManejadorHTTP(BaseHTTPRequestHandler):
+    """Traduce las peticiones HTTP a operaciones de ServicioSolucion."""
+
+    def _responder(self, codigo, datos):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode('utf-8')
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != '/trabajos':
+            return self._responder(404, {'error': 'Ruta no encontrada'})
+
+        contenido = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        try:
+            if self.headers.get('Content-Type', '').startswith('application/json'):
+                datos = json.loads(contenido)
+                paquete = {'hojas': datos['hojas'], 'plan_anterior': datos.get('plan_anterior'),
+                           'semanas_fijas': datos.get('semanas_fijas') or []}
+                opciones = datos
+            else:
+                paquete = {'excel': contenido}
+                opciones = {k: v[0] for k, v in parse_qs(url.query).items()}
+            paquete['valor_kg'] = float(opciones.get('valor_kg', 22000.0))
+            paquete['perfil'] = opciones.get('perfil') or 'interactivo'
+            tiempo_limite = opciones.get('tiempo_limite')
+            paquete['tiempo_limite'] = int(tiempo_limite) if tiempo_limite not in (None, '') else None
+            configurar_perfil(paquete['perfil'])  # valida el nombre del perfil
+            grupos_zonas = opciones.get('grupos_zonas')
+            paquete['grupos_zonas'] = int(grupos_zonas) if grupos_zonas not in (None, '') else None
+            paquete['portafolio'] = str(opciones.get('portafolio', False)).lower() in ('1', 'true')
+            paquete['sensibilidad'] = str(opciones.get('sensibilidad', False)).lower() in ('1', 'true')
+            arranque_heuristico = opciones.get('arranque_heuristico')
+            paquete['arranque_heuristico'] = (None if arranque_heuristico in (None, '')
+                                              else str(arranque_heuristico).lower() in ('1', 'true'))
+            optimizacion.validar_modos(paquete['portafolio'], paquete['grupos_zonas'],
+                                       paquete.get('plan_anterior'), paquete.get('semanas_fijas'))
+        except (ValueError, KeyError, TypeError) as e:
+            return self._responder(400, {'error': f"Paquete inválido: {e}"})
+
+        clave = clave_paquete(contenido, paquete['valor_kg'], paquete['tiempo_limite'],
+                              paquete['portafolio'], paquete['sensibilidad'], paquete['perfil'],
+                              paquete['grupos_zonas'], paquete['arranque_heuristico'])
+        try:
+            vista = self.server.servicio.enviar(paquete, clave)
+        except ColaLlena as e:
+            return self._responder(503, {'error': str(e)})
+        self._responder(202, vista)
+
+    def do_GET(self):
+        partes = [p for p in urlparse(self.path).path.split('/') if p]
+        servicio = self.server.servicio
+
+        if partes == ['salud']:
+            return self._responder(200, servicio.salud())
+        if len(partes) in (2, 3) and partes[0] == 'trabajos':
+            vista = servicio.estado(partes[1])
+            if vista is None:
+                return self._responder(404, {'error': 'Trabajo no encontrado'})
+            if len(partes) == 2:
+                return self._responder(200, vista)
+            if partes[2] == 'resultado':
+                resultado = servicio.resultado(partes[1])
+                if resultado is None:
+                    return self._responder(409, dict(vista, error='El trabajo no tiene resultado'))
+                return self._responder(200, resultado)
+        self._responder(404, {'error': 'Ruta no encontrada'})
+
+
+def iniciar_servidor(puerto=8600, trabajadores=2, max_cola=50, host='127.0.0.1',
+                     tiempo_maximo=TIEMPO_MAXIMO_TRABAJO):
+    """Crea el servidor HTTP con su servicio de solución (sin iniciar el bucle)."""
+    servidor = ThreadingHTTPServer((host, puerto), ManejadorHTTP)
+    servidor.servicio = ServicioSolucion(trabajadores=trabajadores, max_cola=max_cola, tiempo_maximo=tiempo_maximo)
+    return servidor
+
+
+# --- CLIENTE ---
+
+def _peticion(url, datos=None):
+    cuerpo = json.dumps(datos).encode('utf-8') if datos is not None else None
+    peticion = urllib_request.Request(url, data=cuerpo, headers={'Content-Type': 'application/json'})
+    with urllib_request.urlopen(peticion, timeout=30) as respuesta:
+        return json.loads(respuesta.read())
+
+def enviar_trabajo(url_servicio, inputs_opt_res, valor_kg, tiempo_limite=None, portafolio=False,
+                   sensibilidad=False, perfil='interactivo', grupos_zonas=None, plan_anterior=None,
+                   semanas_fijas=None, arranque_heuristico=None):
+    """Envía las hojas (DataFrames) y el plan anterior, si lo hay, al servicio y devuelve el estado del trabajo."""
+    hojas = {hoja: json.loads(df.to_json(orient='records')) for hoja, df in inputs_opt_res.items()}
+    return _peticion(f"{url_servicio.rstrip('/')}/trabajos", {
+        'hojas': hojas, 'valor_kg': valor_kg, 'tiempo_limite': tiempo_limite, 'portafolio': portafolio,
+        'sensibilidad': sensibilidad, 'perfil': perfil, 'grupos_zonas': grupos_zonas,
+        'plan_anterior': None if plan_anterior is None else json.loads(plan_anterior.to_json(orient='records')),
+        'semanas_fijas': list(semanas_fijas or []), 'arranque_heuristico': arranque_heuristico,
+    })
+
+def consultar_trabajo(url_servicio, id_trabajo):
+    return _peticion(f"{url_servicio.rstrip('/')}/trabajos/{id_trabajo}")
+
+def obtener_resultado(url_servicio, id_trabajo):
+    return _peticion(f"{url_servicio.rstrip('/')}/trabajos/{id_trabajo}/resultado")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio HTTP local de solución del modelo de sacrificio.")
+    parser.add_argument('--host', default='127.0.0.1', help="Dirección de escucha (por defecto, solo local)")
+    parser.add_argument('--puerto', type=int, default=8600)
+    parser.add_argument('--trabajadores', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Soluciones simultáneas (por defecto, la mitad de los núcleos)")
+    parser.add_argument('--max-cola', type=int, default=50, help="Trabajos pendientes admitidos")
+    parser.add_argument('--tiempo-maximo', type=int, default=TIEMPO_MAXIMO_TRABAJO,
+                        help="Segundos de reloj máximos por trabajo, aun sin tiempo límite del solver "
+                             f"(por defecto, {TIEMPO_MAXIMO_TRABAJO})")
+    args = parser.parse_args()
+
+    servidor = iniciar_servidor(args.puerto, args.trabajadores, args.max_cola, args.host, args.tiempo_maximo)
+    print(f"Servicio de solución en http://{args.host}:{args.puerto} ({args.trabajadores} trabajadores)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+import sys
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+
+# Los módulos del proyecto están en la raíz del repositorio (sin paquete)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import optimizacion
+
+
+@pytest.fixture(scope='session')
+def libro_plantilla():
+    """Bytes de la plantilla de Excel de la aplicación."""
+    return optimizacion.plantilla_excel()
+
+
+@pytest.fixture
+def inputs_plantilla(libro_plantilla):
+    """Hojas de la plantilla leídas como en la aplicación."""
+    archivo = BytesIO(libro_plantilla)
+    archivo.name = 'plantilla.xlsx'
+    return optimizacion.leer_libro(archivo)
@@ -0,0 +1,52 @@
+import optimizacion
+
+
+def _diff():
+    return {'editadas': {}, 'nuevas': {}, 'eliminadas': []}
+
+
+def test_registrar_y_aplicar_cambios(inputs_plantilla):
+    oferta = inputs_plantilla['Oferta']
+    # Segunda página de 10 filas: las posiciones del editor son relativas a la página
+    pagina = oferta.iloc[10:20]
+    diff = _diff()
+    optimizacion.registrar_cambios(diff, oferta, pagina, {
+        'edited_rows': {0: {'OFERTA': 40}},
+        'deleted_rows': [1],
+        'added_rows': [{'ZONA': 'NUEVA', 'SEMANA': '27.2025', 'OFERTA': 5}],
+    })
+    assert diff == {
+        'editadas': {10: {'OFERTA': 40}},
+        'nuevas': {len(oferta): {'ZONA': 'NUEVA', 'SEMANA': '27.2025', 'OFERTA': 5}},
+        'eliminadas': [11],
+    }
+
+    datos = optimizacion.aplicar_cambios(inputs_plantilla, {'Oferta': diff})
+    editada = datos['Oferta']
+    assert len(editada) == len(oferta)
+    assert editada.loc[10, 'OFERTA'] == 40
+    assert 11 not in editada.index
+    assert editada.loc[len(oferta), 'ZONA'] == 'NUEVA'
+    assert editada['OFERTA'].dtype.kind in 'if'
+    # Las hojas sin cambios no se copian y la original no se modifica
+    assert datos['Demanda'] is inputs_plantilla['Demanda']
+    assert oferta.loc[10, 'OFERTA'] != 40 and 11 in oferta.index
+
+
+def test_editar_y_eliminar_filas_nuevas(inputs_plantilla):
+    oferta = inputs_plantilla['Oferta']
+    diff = _diff()
+    optimizacion.registrar_cambios(diff, oferta, oferta.iloc[:0], {'added_rows': [{'OFERTA': 1}, {'OFERTA': 2}]})
+    nuevas = list(diff['nuevas'])
+    assert nuevas == [len(oferta), len(oferta) + 1]
+
+    # La página siguiente muestra las filas nuevas: se editan y eliminan en el diff
+    pagina = optimizacion.aplicar_cambios(inputs_plantilla, {'Oferta': diff})['Oferta'].loc[nuevas]
+    optimizacion.registrar_cambios(diff, oferta, pagina, {'edited_rows': {0: {'OFERTA': 7}}, 'deleted_rows': [1]})
+    assert diff['nuevas'] == {nuevas[0]: {'OFERTA': 7}}
+    assert diff['eliminadas'] == [] and diff['editadas'] == {}
+
+
+def test_sin_cambios_devuelve_las_mismas_hojas(inputs_plantilla):
+    datos = optimizacion.aplicar_cambios(inputs_plantilla, {})
+    assert all(datos[hoja] is df for hoja, df in inputs_plantilla.items())
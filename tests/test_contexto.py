@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+import optimizacion
+
+
+def _ida_y_vuelta(contexto):
+    return optimizacion.contexto_desde_json(json.loads(json.dumps(optimizacion.contexto_a_json(contexto))))
+
+
+@pytest.fixture(scope='module')
+def solucion(libro_plantilla):
+    from io import BytesIO
+
+    archivo = BytesIO(libro_plantilla)
+    archivo.name = 'plantilla.xlsx'
+    _, contexto, _ = optimizacion.ejecutar_modelo(optimizacion.leer_libro(archivo), 22000.0, sensibilidad=True,
+                                                  tiempo_limite=20)
+    return contexto
+
+
+def test_contexto_json_ida_y_vuelta(solucion):
+    copia = _ida_y_vuelta(solucion)
+    for conjunto in ('Zona', 'Planta_S', 'Semana'):
+        assert copia[conjunto] == list(solucion[conjunto])
+    for nombre, variables in solucion['variables'].items():
+        assert {clave: v.varValue for clave, v in copia['variables'][nombre].items()} == \
+               {clave: v.varValue for clave, v in variables.items()}
+    assert copia['parametros'] == solucion['parametros']
+    assert copia['solver'] == solucion['solver']
+    assert copia['sensibilidad'] == solucion['sensibilidad']
+
+
+def test_plan_desde_contexto_reconstruido(solucion):
+    original = optimizacion.extraer_plan(solucion)
+    assert optimizacion.extraer_plan(_ida_y_vuelta(solucion)).equals(original)
+
+
+def test_contexto_por_semanas(inputs_plantilla):
+    _, contexto, _ = optimizacion.ejecutar_modelo(inputs_plantilla, 22000.0, cache_semanas=optimizacion.CacheSemanas(),
+                                                  tiempo_limite=20)
+    copia = _ida_y_vuelta(contexto)
+    assert copia['semanas'] == contexto['semanas']
+    assert optimizacion.extraer_plan(copia).equals(optimizacion.extraer_plan(contexto))
@@ -0,0 +1,37 @@
+import pytest
+
+import optimizacion
+from heuristica import solucion_voraz
+from refuerzos import generar_instancia
+
+
+def _instancias(inputs_plantilla):
+    return [inputs_plantilla] + [generar_instancia(n, semilla=semilla) for n in (5, 20) for semilla in (0, 1)]
+
+
+def test_solucion_voraz_es_factible(inputs_plantilla):
+    for inputs in _instancias(inputs_plantilla):
+        modelo, contexto = optimizacion.preparar_modelo(inputs, 22000.0)
+        valores = solucion_voraz(contexto['Zona'], contexto['Planta_S'], contexto['Semana'],
+                                 contexto['parametros'], contexto['variables'])
+        assert valores is not None
+        modelo.assignVarsVals(valores)
+        assert all(v.varValue is not None for v in modelo.variables())
+        assert all(v.varValue == int(v.varValue) for v in modelo.variables())
+        assert modelo.valid(eps=1e-6)
+
+
+def test_sin_solucion_voraz_si_falta_oferta():
+    inputs = generar_instancia(3, n_plantas=2, n_semanas=2, semilla=0)
+    demanda = inputs['Demanda'].copy()
+    demanda.loc[0, 'DEMANDA'] = 10 ** 6
+    modelo, contexto = optimizacion.preparar_modelo(dict(inputs, Demanda=demanda), 22000.0)
+    assert solucion_voraz(contexto['Zona'], contexto['Planta_S'], contexto['Semana'],
+                          contexto['parametros'], contexto['variables']) is None
+
+
+@pytest.mark.parametrize('arranque', [False, True])
+def test_arranque_llega_al_solver(inputs_plantilla, arranque):
+    _, contexto, _ = optimizacion.ejecutar_modelo(inputs_plantilla, 22000.0, arranque_heuristico=arranque,
+                                                  tiempo_limite=20)
+    assert contexto['solver']['arranque'] == arranque
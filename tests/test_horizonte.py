@@ -0,0 +1,65 @@
+import pytest
+
+import optimizacion
+from horizonte import plan_factible, plan_por_semana
+from refuerzos import generar_instancia
+
+
+@pytest.fixture(scope='module')
+def corrida_anterior():
+    inputs = generar_instancia(3, n_plantas=2, n_semanas=3, semilla=1)
+    _, contexto, _ = optimizacion.ejecutar_modelo(inputs, 22000.0, tiempo_limite=10)
+    return inputs, contexto, optimizacion.extraer_plan(contexto)
+
+
+def test_plan_factible(corrida_anterior):
+    _, contexto, plan = corrida_anterior
+    Zona, Planta_S, Semana = contexto['Zona'], contexto['Planta_S'], contexto['Semana']
+    parametros = contexto['parametros']
+    reses = plan_por_semana(plan, Zona, Planta_S, Semana)
+    t = Semana[0]
+    assert plan_factible(reses[t], t, Zona, Planta_S, parametros)
+
+    # Con otra demanda el plan de la semana deja de servir
+    demanda = dict(parametros['Demanda'])
+    demanda[t] += 1
+    assert not plan_factible(reses[t], t, Zona, Planta_S, dict(parametros, Demanda=demanda))
+
+
+def test_plan_con_celdas_en_blanco(corrida_anterior):
+    _, contexto, plan = corrida_anterior
+    Zona, Planta_S, Semana = contexto['Zona'], contexto['Planta_S'], contexto['Semana']
+    # Celdas vaciadas en Excel: se leen como NaN
+    editado = plan.astype({'Reses integradas': float, 'Reses compradas': float})
+    editado.loc[editado.index[0], 'Reses compradas'] = float('nan')
+    editado.loc[editado.index[1], 'Reses integradas'] = float('nan')
+    reses = plan_por_semana(editado, Zona, Planta_S, Semana)
+    originales = plan_por_semana(plan, Zona, Planta_S, Semana)
+    for fila, vacia in ((0, 1), (1, 0)):
+        t, z, p = (editado.iloc[fila][columna] for columna in ('Semana', 'Zona', 'Planta'))
+        assert reses[t][z, p][vacia] == 0
+        assert reses[t][z, p][1 - vacia] == originales[t][z, p][1 - vacia]
+
+
+def test_semanas_fijas_conservan_el_plan_anterior(corrida_anterior):
+    inputs, contexto, plan = corrida_anterior
+    fija = contexto['Semana'][0]
+    _, nuevo, _ = optimizacion.ejecutar_modelo(inputs, 22000.0, tiempo_limite=10, plan_anterior=plan,
+                                               semanas_fijas=[fija])
+    assert nuevo['horizonte']['fijas'] == [fija]
+
+    columnas = ['Zona', 'Planta', 'Reses integradas', 'Reses compradas']
+    def semana(p):
+        filas = p[p['Semana'].astype(str) == str(fija)][columnas]
+        return filas.sort_values(columnas[:2]).reset_index(drop=True)
+    assert semana(optimizacion.extraer_plan(nuevo)).equals(semana(plan))
+
+
+def test_semana_fija_que_ya_no_es_factible(corrida_anterior):
+    inputs, contexto, plan = corrida_anterior
+    fija = contexto['Semana'][0]
+    demanda = inputs['Demanda'].copy()
+    demanda.loc[demanda['SEMANA'] == fija, 'DEMANDA'] += 1
+    with pytest.raises(ValueError, match="no es factible"):
+        optimizacion.ejecutar_modelo(dict(inputs, Demanda=demanda), 22000.0, tiempo_limite=10,
+                                     plan_anterior=plan, semanas_fijas=[fija])
@@ -0,0 +1,69 @@
+import optimizacion
+from jerarquico import agrupar_zonas, desagregar_grupo, parametros_agregados, resolver_jerarquico
+from perfiles import configurar_perfil
+from refuerzos import generar_instancia
+
+
+def _preparar(n_zonas=12, semilla=0):
+    return optimizacion.preparar_modelo(generar_instancia(n_zonas, n_plantas=3, n_semanas=2, semilla=semilla), 22000.0)
+
+
+def test_agrupacion_reproducible():
+    _, contexto = _preparar()
+    argumentos = (contexto['Zona'], contexto['Planta_S'], contexto['parametros'], 4)
+    grupos = agrupar_zonas(*argumentos)
+    assert grupos == agrupar_zonas(*argumentos)
+    assert sorted(z for zonas in grupos.values() for z in zonas) == sorted(contexto['Zona'])
+    assert len(grupos) <= 4
+
+
+def test_zonas_iguales_quedan_en_el_mismo_grupo():
+    _, contexto = _preparar()
+    Zona, Planta_S, parametros = list(contexto['Zona']), contexto['Planta_S'], dict(contexto['parametros'])
+    original = Zona[0]
+    # Copia de la primera zona con las mismas características
+    parametros['Peso_Res'] = dict(parametros['Peso_Res'], Copia=parametros['Peso_Res'][original])
+    for nombre in ('rdto', 'Costo_Viaje_Int'):
+        parametros[nombre] = dict(parametros[nombre])
+        for p in Planta_S:
+            parametros[nombre]['Copia', p] = parametros[nombre][original, p]
+    grupos = agrupar_zonas(Zona + ['Copia'], Planta_S, parametros, 4)
+    assert any(original in zonas and 'Copia' in zonas for zonas in grupos.values())
+
+
+def test_parametros_agregados_conservan_la_oferta():
+    _, contexto = _preparar()
+    Zona, Planta_S, Semana, parametros = (contexto[clave] for clave in ('Zona', 'Planta_S', 'Semana', 'parametros'))
+    grupos = agrupar_zonas(Zona, Planta_S, parametros, 4)
+    agregados = parametros_agregados(grupos, Planta_S, Semana, parametros)
+    for t in Semana:
+        for oferta in ('Oferta_Int', 'Oferta_Com'):
+            assert sum(agregados[oferta][g, t] for g in grupos) == sum(parametros[oferta].get((z, t), 0) for z in Zona)
+
+
+def test_desagregar_grupo_reparte_los_envios():
+    _, contexto = _preparar()
+    Zona, Planta_S, Semana, parametros = (contexto[clave] for clave in ('Zona', 'Planta_S', 'Semana', 'parametros'))
+    zonas = Zona[:3]
+    # Envía a la primera planta la mitad de la oferta del grupo
+    envios_int = {(Planta_S[0], t): sum(parametros['Oferta_Int'].get((z, t), 0) for z in zonas) // 2 for t in Semana}
+    valores = desagregar_grupo(zonas, Planta_S, Semana, parametros, envios_int, {}, configurar_perfil('exacto'))
+    for t in Semana:
+        enviadas = sum(valores[contexto['variables']['res_int'][z, Planta_S[0], t].name] for z in zonas)
+        assert enviadas == envios_int[Planta_S[0], t]
+
+
+def test_solucion_jerarquica_factible_y_sin_cota():
+    modelo, contexto = _preparar()
+    resultado, solver = resolver_jerarquico(modelo, contexto['Zona'], contexto['Planta_S'], contexto['Semana'],
+                                            contexto['parametros'], configurar_perfil('interactivo'), 4)
+    assert len(resultado['grupos']) <= 4
+    assert all(v.varValue is not None for v in modelo.variables())
+    assert modelo.valid(eps=1e-6)
+    assert solver['cota'] is None
+    assert solver['gap'] is None
+
+    _, contexto, _ = optimizacion.ejecutar_modelo(generar_instancia(12, n_plantas=3, n_semanas=2), 22000.0,
+                                                  grupos_zonas=4)
+    assert contexto['solver']['cota'] is None
+    assert contexto['solver']['gap'] is None
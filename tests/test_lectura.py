@@ -0,0 +1,76 @@
+from io import BytesIO
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+import optimizacion
+
+
+def _filas(*filas):
+    return iter(filas)
+
+
+def test_totales_de_la_plantilla(inputs_plantilla):
+    # 7 zonas x 4 semanas, 25 reses por clave
+    oferta = inputs_plantilla['Oferta']
+    assert len(oferta) == 28
+    assert oferta['OFERTA'].sum() == 28 * 25
+    assert inputs_plantilla['Compras']['DISPONIBLE'].sum() == 28 * 25
+
+
+def test_agrega_filas_por_zona_y_semana():
+    df = optimizacion.agregar_hoja_streaming(_filas(
+        ('ZONA', 'SEMANA', 'FINCA', 'OFERTA'),
+        ('A', 27.2025, 'F1', 10),
+        ('A', 27.2025, 'F2', 5),
+        ('B', 27.2025, 'F1', 7),
+        (None, 27.2025, 'F3', 99),
+    ), 'OFERTA')
+    assert dict(zip(df['ZONA'], df['OFERTA'])) == {'A': 15, 'B': 7}
+
+
+def test_convierte_texto_numerico_y_unifica_claves():
+    df = optimizacion.agregar_hoja_streaming(_filas(
+        ('ZONA', 'SEMANA', 'OFERTA'),
+        ('A', 27.2025, '10'),
+        ('A ', '27.2025', 5),
+        ('A', '27.2025', None),
+        ('A', '27.2025', ''),
+    ), 'OFERTA')
+    assert len(df) == 1
+    assert df.loc[0, 'SEMANA'] == 27.2025
+    assert df.loc[0, 'OFERTA'] == 15
+
+
+def test_valor_no_numerico_indica_la_fila():
+    with pytest.raises(ValueError, match="Fila 3"):
+        optimizacion.agregar_hoja_streaming(_filas(
+            ('ZONA', 'SEMANA', 'OFERTA'),
+            ('A', 27.2025, 10),
+            ('A', 27.2025, 'diez'),
+        ), 'OFERTA')
+
+
+def test_datos_diarios_se_agregan_por_semana():
+    df = optimizacion.agregar_hoja_streaming(_filas(
+        ('ZONA', 'FECHA', 'DISPONIBLE'),
+        ('A', pd.Timestamp('2025-06-30'), 3),
+        ('A', pd.Timestamp('2025-07-06'), 4),
+        ('A', pd.Timestamp('2025-07-07'), 5),
+    ), 'DISPONIBLE')
+    assert dict(zip(df['SEMANA'], df['DISPONIBLE'])) == {27.2025: 7, 28.2025: 5}
+
+
+def test_leer_libro_indica_la_hoja_con_error():
+    libro = Workbook()
+    hoja = libro.active
+    hoja.title = 'Oferta'
+    hoja.append(['ZONA', 'SEMANA', 'OFERTA'])
+    hoja.append(['A', '27.2025', 'n/d'])
+    archivo = BytesIO()
+    libro.save(archivo)
+    archivo.seek(0)
+    archivo.name = 'libro.xlsx'
+    with pytest.raises(ValueError, match="Hoja Oferta: Fila 2"):
+        optimizacion.leer_libro(archivo)
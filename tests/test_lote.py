@@ -0,0 +1,14 @@
+import pytest
+
+import lote
+
+
+def test_tiempo_maximo_del_perfil():
+    assert lote.calcular_tiempo_maximo('interactivo') == 60 + lote.MARGEN_TIEMPO_MAXIMO
+    assert lote.calcular_tiempo_maximo('interactivo', tiempo_limite=10) == 10 + lote.MARGEN_TIEMPO_MAXIMO
+    assert lote.calcular_tiempo_maximo('exacto', tiempo_maximo=30) == 30
+
+
+def test_perfil_sin_tiempo_limite_exige_un_limite():
+    with pytest.raises(ValueError):
+        lote.calcular_tiempo_maximo('exacto')
@@ -0,0 +1,30 @@
+import pandas as pd
+import pytest
+
+import optimizacion
+from horizonte import COLUMNAS_PLAN
+
+
+def test_portafolio_y_jerarquico_son_excluyentes(inputs_plantilla):
+    with pytest.raises(ValueError, match="no se pueden combinar"):
+        optimizacion.ejecutar_modelo(inputs_plantilla, 22000.0, portafolio=True, grupos_zonas=3)
+
+
+def test_un_solo_modo_es_valido():
+    optimizacion.validar_modos()
+    optimizacion.validar_modos(portafolio=True)
+    optimizacion.validar_modos(grupos_zonas=3)
+    optimizacion.validar_modos(plan_anterior=pd.DataFrame(), semanas_fijas=['27.2025'])
+
+
+def test_plan_anterior_no_se_combina_con_otros_modos(inputs_plantilla):
+    plan = pd.DataFrame(columns=list(COLUMNAS_PLAN))
+    with pytest.raises(ValueError, match="no se pueden combinar"):
+        optimizacion.ejecutar_modelo(inputs_plantilla, 22000.0, portafolio=True, plan_anterior=plan)
+    with pytest.raises(ValueError, match="no se pueden combinar"):
+        optimizacion.ejecutar_modelo(inputs_plantilla, 22000.0, grupos_zonas=3, plan_anterior=plan)
+
+
+def test_semanas_fijas_requieren_plan_anterior(inputs_plantilla):
+    with pytest.raises(ValueError, match="requieren el plan anterior"):
+        optimizacion.ejecutar_modelo(inputs_plantilla, 22000.0, semanas_fijas=['27.2025'])
@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+import montecarlo
+import optimizacion
+from perfiles import configurar_perfil
+from refuerzos import generar_instancia
+
+INCERTIDUMBRE = {'Oferta': ('normal', 0.1), 'Compras': ('uniforme', 0.1), 'PESORES': ('triangular', 0.05)}
+
+
+def _instancia():
+    return generar_instancia(5, n_plantas=2, n_semanas=2, semilla=3)
+
+
+def test_simulacion_reproducible():
+    argumentos = dict(n_muestras=3, incertidumbre=INCERTIDUMBRE, procesos=1, perfil='exacto', semilla=5)
+    muestras = montecarlo.simular(_instancia(), 22000.0, **argumentos)
+    assert len(muestras) == 3
+    assert (muestras['estado'] == 'Optimal Solution Found').all()
+    pd.testing.assert_frame_equal(muestras, montecarlo.simular(_instancia(), 22000.0, **argumentos))
+
+
+def test_modelo_reutilizado_igual_al_reconstruido(monkeypatch):
+    from pulp import value
+    from perfiles import crear_solver
+
+    inputs, config = _instancia(), configurar_perfil('exacto')
+    monkeypatch.setattr(montecarlo, '_BASE', {})
+    montecarlo._iniciar_trabajador(inputs, 22000.0, config)
+    contexto = montecarlo._BASE['contexto']
+    escenarios = montecarlo.generar_escenarios(contexto['parametros'], 3, INCERTIDUMBRE, semilla=5)
+
+    # Cada escenario se resuelve sobre el modelo que dejó el anterior
+    for escenario in escenarios:
+        metricas = montecarlo._resolver_escenario(escenario)
+        reutilizado = value(montecarlo._BASE['modelo'].objective)
+
+        parametros = dict(contexto['parametros'], **escenario)
+        modelo, variables, restricciones = optimizacion.construir_modelo(
+            contexto['Zona'], contexto['Planta_S'], contexto['Semana'], parametros
+        )
+        modelo.solve(crear_solver(config))
+        assert reutilizado == pytest.approx(value(modelo.objective), rel=1e-9)
+        costos = optimizacion.calcular_costos(dict(contexto, parametros=parametros, variables=variables,
+                                                   restricciones=restricciones))
+        assert metricas['Valorización Total'] == pytest.approx(costos['Valorización Total'], rel=1e-9)
@@ -0,0 +1,72 @@
+from pathlib import Path
+
+import pytest
+from pulp import LpMaximize, value
+
+import optimizacion
+import perfiles
+from heuristica import aplicar_arranque_voraz
+from refuerzos import generar_instancia
+
+# Log de CBC capturado de la plantilla (minimización con arranque, detenida por tiempo)
+LOG_TIEMPO_AGOTADO = Path(__file__).with_name('datos') / 'cbc_tiempo_agotado.log'
+
+
+def test_perfil_desconocido():
+    with pytest.raises(ValueError, match="Perfil de solver desconocido: rapido"):
+        perfiles.configurar_perfil('rapido')
+
+
+def test_configurar_perfil_ignora_cambios_none():
+    config = perfiles.configurar_perfil('interactivo', tiempo_limite=None, hilos=2)
+    assert config['tiempo_limite'] == perfiles.PERFILES['interactivo']['tiempo_limite']
+    assert config['hilos'] == 2
+    assert config['perfil'] == 'interactivo'
+
+
+def test_leer_log_cbc():
+    log = perfiles.leer_log_cbc(LOG_TIEMPO_AGOTADO)
+    assert log['resultado'] == 'Stopped on time limit'
+    assert log['relajacion'] == -1.11638e9
+    assert log['objetivo'] == -1019200000.0
+    assert log['cota'] == -1025714285.714
+    assert log['nodos'] == 1436
+    assert log['incumbentes'][0] == 0.01
+    assert len(log['incumbentes']) == 10
+    assert log['arranque_aceptado']
+
+
+def _modelo_con_arranque():
+    modelo, contexto = optimizacion.preparar_modelo(generar_instancia(4, n_plantas=2, n_semanas=2), 22000.0)
+    assert aplicar_arranque_voraz(modelo, contexto['Zona'], contexto['Planta_S'], contexto['Semana'],
+                                  contexto['parametros'], contexto['variables'])
+    return modelo
+
+
+def test_arranque_conserva_el_signo_de_la_maximizacion():
+    config = perfiles.configurar_perfil('exacto')
+    sin_arranque = perfiles.resolver_con_perfil(_modelo_con_arranque(), config)
+    modelo = _modelo_con_arranque()
+    con_arranque = perfiles.resolver_con_perfil(modelo, config, arranque=True)
+
+    assert modelo.sense == LpMaximize
+    assert con_arranque['arranque']
+    assert con_arranque['objetivo'] > 0
+    assert con_arranque['objetivo'] == pytest.approx(value(modelo.objective))
+    assert con_arranque['objetivo'] == pytest.approx(sin_arranque['objetivo'])
+    assert con_arranque['relajacion'] == pytest.approx(sin_arranque['relajacion'])
+    assert con_arranque['relajacion'] >= con_arranque['objetivo']
+    assert con_arranque['cota'] >= con_arranque['objetivo']
+
+
+def test_arranque_invierte_la_cota_del_log(monkeypatch):
+    # Búsqueda detenida por tiempo: objetivo, cota y relajación vienen del log de la minimización
+    leer_log_cbc = perfiles.leer_log_cbc
+    monkeypatch.setattr(perfiles, 'leer_log_cbc', lambda ruta: leer_log_cbc(LOG_TIEMPO_AGOTADO))
+    resumen = perfiles.resolver_con_perfil(_modelo_con_arranque(), perfiles.configurar_perfil('interactivo'),
+                                           arranque=True)
+    assert resumen['objetivo'] == 1019200000.0
+    assert resumen['cota'] == 1025714285.714
+    assert resumen['relajacion'] == 1.11638e9
+    assert resumen['gap'] == pytest.approx((1025714285.714 - 1019200000.0) / 1019200000.0)
+    assert resumen['primer_incumbente'] == 0.01
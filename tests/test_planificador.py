@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+
+from planificador import PlanificadorSolver
+
+
+class Interrupcion(BaseException):
+    """Como las excepciones de control de Streamlit (rerun, stop)."""
+
+
+def _en_hilo(funcion):
+    resultado = {}
+
+    def ejecutar():
+        try:
+            resultado['valor'] = funcion()
+        except BaseException as e:
+            resultado['error'] = e
+
+    hilo = threading.Thread(target=ejecutar)
+    hilo.start()
+    return hilo, resultado
+
+
+def _esperar_en_curso(planificador, clave):
+    while clave not in planificador._en_curso:
+        time.sleep(0.01)
+
+
+def test_solicitudes_identicas_se_resuelven_una_vez():
+    planificador = PlanificadorSolver(max_simultaneos=1, nucleos=2)
+    llamadas = []
+    liberar = threading.Event()
+
+    def funcion(hilos):
+        llamadas.append(hilos)
+        liberar.wait(5)
+        return 'plan'
+
+    dueno, resultado_dueno = _en_hilo(lambda: planificador.resolver('datos', funcion))
+    _esperar_en_curso(planificador, 'datos')
+    otro, resultado_otro = _en_hilo(lambda: planificador.resolver('datos', funcion))
+    time.sleep(0.1)
+    liberar.set()
+    dueno.join(5)
+    otro.join(5)
+
+    assert llamadas == [2]
+    assert resultado_dueno['valor'] == resultado_otro['valor'] == 'plan'
+    assert planificador.estado()['activos'] == 0
+
+
+def test_los_errores_de_la_solucion_llegan_a_quien_espera():
+    planificador = PlanificadorSolver(max_simultaneos=1, nucleos=1)
+    liberar = threading.Event()
+
+    def falla(hilos):
+        liberar.wait(5)
+        raise ValueError("datos inválidos")
+
+    dueno, resultado_dueno = _en_hilo(lambda: planificador.resolver('datos', falla))
+    _esperar_en_curso(planificador, 'datos')
+    otro, resultado_otro = _en_hilo(lambda: planificador.resolver('datos', falla))
+    time.sleep(0.1)
+    liberar.set()
+    dueno.join(5)
+    otro.join(5)
+
+    assert isinstance(resultado_dueno['error'], ValueError)
+    assert isinstance(resultado_otro['error'], ValueError)
+
+
+def test_una_interrupcion_del_dueno_no_llega_a_quien_espera():
+    planificador = PlanificadorSolver(max_simultaneos=1, nucleos=1)
+    liberar = threading.Event()
+    llamadas = []
+
+    def interrumpida(hilos):
+        llamadas.append('dueño')
+        liberar.wait(5)
+        raise Interrupcion()
+
+    def completa(hilos):
+        llamadas.append('espera')
+        return 'plan'
+
+    dueno, resultado_dueno = _en_hilo(lambda: planificador.resolver('datos', interrumpida))
+    _esperar_en_curso(planificador, 'datos')
+    otro, resultado_otro = _en_hilo(lambda: planificador.resolver('datos', completa))
+    time.sleep(0.1)
+    liberar.set()
+    dueno.join(5)
+    otro.join(5)
+
+    assert isinstance(resultado_dueno['error'], Interrupcion)
+    # La sesión que esperaba tomó la solicitud y la resolvió
+    assert resultado_otro == {'valor': 'plan'}
+    assert llamadas == ['dueño', 'espera']
+    estado = planificador.estado()
+    assert (estado['activos'], estado['en_cola'], estado['hilos_en_uso']) == (0, 0, 0)
+    assert not planificador._en_curso
+
+
+def test_interrupcion_en_cola_libera_el_turno():
+    planificador = PlanificadorSolver(max_simultaneos=1, nucleos=1)
+    liberar = threading.Event()
+
+    def lenta(hilos):
+        liberar.wait(5)
+        return 'a'
+
+    def interrumpir(posicion):
+        raise Interrupcion()
+
+    primero, _ = _en_hilo(lambda: planificador.resolver('a', lenta))
+    _esperar_en_curso(planificador, 'a')
+    with pytest.raises(Interrupcion):
+        planificador.resolver('b', lambda hilos: 'b', interrumpir)
+    assert planificador.estado()['en_cola'] == 0
+    liberar.set()
+    primero.join(5)
+    assert planificador.resolver('b', lambda hilos: 'b') == 'b'
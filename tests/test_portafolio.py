@@ -0,0 +1,63 @@
+import json
+
+import portafolio
+
+
+def _config(nombre):
+    return next(c for c in portafolio.CONFIGURACIONES if c['nombre'] == nombre)
+
+
+def test_aplica_las_tolerancias_del_perfil():
+    opciones = portafolio.opciones_solver(_config('cbc_semilla_7'), gap_relativo=0.005)
+    assert opciones['gapRel'] == 0.005
+    assert 'gapAbs' not in opciones
+    assert opciones['options'] == ['randomSeed 7', 'randomCbcSeed 7']
+
+
+def test_solvers_sin_gap_no_reciben_tolerancias():
+    assert portafolio.opciones_solver(_config('glpk'), gap_relativo=0.005, gap_absoluto=1) == {}
+
+
+def test_limita_los_hilos_de_cada_configuracion():
+    config = _config('cbc_2_hilos')
+    assert portafolio.opciones_solver(config, max_hilos=1)['threads'] == 1
+    assert portafolio.opciones_solver(config, max_hilos=4)['threads'] == 2
+    # La configuración original no se modifica
+    assert config['opciones'] == {'threads': 2}
+
+
+def test_ruta_del_historial_configurable(monkeypatch, tmp_path):
+    monkeypatch.setenv('HISTORIAL_PORTAFOLIO', str(tmp_path / 'historial.jsonl'))
+    assert portafolio.ruta_historial() == tmp_path / 'historial.jsonl'
+    monkeypatch.delenv('HISTORIAL_PORTAFOLIO')
+    monkeypatch.setenv('XDG_DATA_HOME', str(tmp_path))
+    assert portafolio.ruta_historial() == tmp_path / 'modelo_sacrificio' / portafolio.NOMBRE_HISTORIAL
+
+
+def _registrar_varias(nombre, veces):
+    # Los procesos heredan HISTORIAL_PORTAFOLIO del entorno de la prueba. Registros de más de una página para que una escritura no atómica se note
+    resultados = [{'nombre': nombre, 'error': 'x' * 200}] * 50
+    for _ in range(veces):
+        portafolio._registrar({'nombre': nombre, 'objetivo': 1.0, 'tiempo': 0.1}, resultados)
+
+
+def test_registros_concurrentes_quedan_completos(monkeypatch, tmp_path):
+    import multiprocessing as mp
+    import threading
+
+    ruta = tmp_path / 'datos' / 'historial.jsonl'
+    monkeypatch.setenv('HISTORIAL_PORTAFOLIO', str(ruta))
+    ctx = mp.get_context('spawn')
+    procesos = [ctx.Process(target=_registrar_varias, args=(f'proceso_{i}', 20)) for i in range(3)]
+    hilos = [threading.Thread(target=_registrar_varias, args=(f'hilo_{i}', 20)) for i in range(3)]
+    for tarea in procesos + hilos:
+        tarea.start()
+    for tarea in procesos + hilos:
+        tarea.join()
+
+    with open(ruta, encoding='utf-8') as archivo:
+        registros = [json.loads(linea) for linea in archivo]
+    assert len(registros) == 120
+    assert portafolio.victorias_historicas() == {
+        **{f'proceso_{i}': 20 for i in range(3)}, **{f'hilo_{i}': 20 for i in range(3)}
+    }
@@ -0,0 +1,13 @@
+import pytest
+
+from refuerzos import comparar_formulaciones, generar_instancia
+
+
+@pytest.mark.parametrize('semilla', [0, 1])
+def test_formulacion_reforzada_mismo_optimo_y_relajacion_no_mas_floja(semilla):
+    comparacion = comparar_formulaciones(generar_instancia(6, n_plantas=3, n_semanas=2, semilla=semilla),
+                                         perfil='exacto')
+    base, reforzada = comparacion['base'], comparacion['reforzada']
+    assert reforzada['objetivo'] == pytest.approx(base['objetivo'], rel=1e-9)
+    # Maximización: una relajación más ajustada es menor o igual
+    assert reforzada['relajacion'] <= base['relajacion'] + 1e-6 * abs(base['relajacion'])
@@ -0,0 +1,109 @@
+import pytest
+
+import optimizacion
+from perfiles import configurar_perfil
+from refuerzos import generar_instancia
+
+
+def _solucion(objetivo, cota):
+    return {'valores': {'x': 1}, 'estado': (1, 1), 'solver': {'objetivo': objetivo, 'cota': cota}}
+
+
+def test_cache_reutiliza_el_mismo_perfil_aunque_no_sea_optimo():
+    cache = optimizacion.CacheSemanas()
+    interactivo = configurar_perfil('interactivo')
+    # Incumbente con gap de 10 % (tiempo límite agotado)
+    solucion = _solucion(100.0, 110.0)
+    cache.guardar('semana', interactivo, solucion)
+    assert cache.obtener('semana', interactivo) is solucion
+    assert cache.obtener('otra', interactivo) is None
+    # Otro tiempo límite es otro perfil efectivo
+    assert cache.obtener('semana', configurar_perfil('interactivo', tiempo_limite=5)) is None
+
+
+def test_cache_reutiliza_soluciones_dentro_de_la_tolerancia():
+    cache = optimizacion.CacheSemanas()
+    exacta = _solucion(100.0, 100.0)
+    cache.guardar('semana', configurar_perfil('exacto'), exacta)
+    # Un perfil más flojo reutiliza la solución exacta
+    assert cache.obtener('semana', configurar_perfil('interactivo')) is exacta
+
+    cache = optimizacion.CacheSemanas()
+    cache.guardar('semana', configurar_perfil('interactivo'), _solucion(100.0, 100.4))
+    # Un perfil más estricto no reutiliza un gap de 0.4 %, pero lo usa como arranque
+    assert cache.obtener('semana', configurar_perfil('nocturno')) is None
+    assert cache.mejor_incumbente('semana')['solver']['objetivo'] == 100.0
+
+
+def test_cache_acotada():
+    cache = optimizacion.CacheSemanas(max_semanas=2)
+    config = configurar_perfil('interactivo')
+    for huella in ('a', 'b', 'c'):
+        cache.guardar(huella, config, _solucion(1.0, 1.0))
+    assert cache.obtener('a', config) is None
+    assert cache.obtener('c', config) is not None
+
+
+def _instancia():
+    return generar_instancia(3, n_plantas=2, n_semanas=3, semilla=1)
+
+
+def test_solo_se_resuelven_las_semanas_modificadas():
+    inputs = _instancia()
+    cache = optimizacion.CacheSemanas()
+    _, contexto, costos = optimizacion.ejecutar_modelo(inputs, 22000.0, cache_semanas=cache, tiempo_limite=10)
+    assert len(contexto['semanas']['resueltas']) == 3
+
+    _, contexto, repetidos = optimizacion.ejecutar_modelo(inputs, 22000.0, cache_semanas=cache, tiempo_limite=10)
+    assert contexto['semanas']['resueltas'] == []
+    assert repetidos == costos
+
+    demanda = inputs['Demanda'].copy()
+    demanda.loc[0, 'DEMANDA'] -= 1
+    editados = dict(inputs, Demanda=demanda)
+    _, contexto, _ = optimizacion.ejecutar_modelo(editados, 22000.0, cache_semanas=cache, tiempo_limite=10)
+    assert contexto['semanas']['resueltas'] == [demanda.loc[0, 'SEMANA']]
+    assert len(contexto['semanas']['reutilizadas']) == 2
+
+
+def test_semana_sin_solucion_es_un_error_claro():
+    inputs = _instancia()
+    demanda = inputs['Demanda'].copy()
+    demanda.loc[0, 'DEMANDA'] = 10 ** 6
+    with pytest.raises(RuntimeError, match="no tiene solución factible"):
+        optimizacion.ejecutar_modelo(dict(inputs, Demanda=demanda), 22000.0,
+                                     cache_semanas=optimizacion.CacheSemanas(), tiempo_limite=10)
+
+
+def test_resumen_por_semana_informa_arranque_y_primer_incumbente():
+    _, contexto, _ = optimizacion.ejecutar_modelo(_instancia(), 22000.0, cache_semanas=optimizacion.CacheSemanas(),
+                                                  tiempo_limite=10, arranque_heuristico=True)
+    solver = contexto['solver']
+    assert solver['arranque'] is True
+    assert solver['primer_incumbente'] is not None
+    assert 0 <= solver['primer_incumbente'] <= solver['tiempo']
+
+
+def test_tiempo_limite_es_para_todo_el_horizonte(monkeypatch):
+    import time
+
+    import perfiles
+
+    resolver = perfiles.resolver_con_perfil
+    llamadas = []
+
+    def resolver_registrando(modelo, config, arranque=False):
+        llamadas.append((time.monotonic(), config['tiempo_limite']))
+        return resolver(modelo, config, arranque=arranque)
+
+    monkeypatch.setattr(perfiles, 'resolver_con_perfil', resolver_registrando)
+    tiempo_limite = 6
+    inicio = time.monotonic()
+    optimizacion.ejecutar_modelo(_instancia(), 22000.0, cache_semanas=optimizacion.CacheSemanas(),
+                                 tiempo_limite=tiempo_limite)
+    assert len(llamadas) == 3
+    # Ninguna semana puede pasarse del tiempo que le queda al horizonte
+    for instante, limite in llamadas:
+        assert instante - inicio + limite <= tiempo_limite + 1
+    assert llamadas[0][1] <= tiempo_limite // 3
+    assert time.monotonic() - inicio <= tiempo_limite + 1
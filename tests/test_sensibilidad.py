@@ -0,0 +1,51 @@
+import pytest
+
+import optimizacion
+from perfiles import configurar_perfil, crear_solver
+
+
+def _estado_modelo(modelo):
+    """Todo lo que analisis_sensibilidad cambia y debe restaurar."""
+    return (
+        {v.name: c for v, c in modelo.objective.items()},
+        {nombre: ({v.name: c for v, c in r.items()}, r.constant, r.sense) for nombre, r in modelo.constraints.items()},
+        {v.name: (v.lowBound, v.upBound, v.cat, v.varValue) for v in modelo.variables()},
+        (modelo.status, modelo.sol_status),
+    )
+
+
+@pytest.mark.parametrize('valor_kg', [22000.0, 1000.0])
+def test_analisis_sensibilidad(inputs_plantilla, valor_kg):
+    modelo, contexto = optimizacion.preparar_modelo(inputs_plantilla, valor_kg)
+    modelo.solve(crear_solver(configurar_perfil('interactivo', tiempo_limite=10)))
+    antes = _estado_modelo(modelo)
+
+    sensibilidad = optimizacion.analisis_sensibilidad(modelo, contexto)
+    assert _estado_modelo(modelo) == antes
+
+    # La plantilla tiene el mismo margen por res en todas las rutas de cada tipo:
+    # una res más de demanda vale a lo sumo ese margen, con su signo (con margen
+    # positivo el dual puede ser 0 si no cabe otra res en los camiones fijados)
+    parametros = contexto['parametros']
+    margenes = [
+        parametros['Peso_Res'].get(z, 0) * parametros['rdto'].get((z, p), 0) * valor_kg
+        - parametros[precio].get(z, 0) - parametros['Costo_Sac'].get(p, 0)
+        for precio in ('Precio_Int', 'Precio_Comp') for z in contexto['Zona'] for p in contexto['Planta_S']
+    ]
+    assert min(margenes) > 0 or max(margenes) < 0
+    for fila in sensibilidad['Demanda']:
+        if max(margenes) < 0:
+            assert min(margenes) <= fila['Precio sombra'] < 0
+        else:
+            assert 0 <= fila['Precio sombra'] <= max(margenes)
+
+    # Costo reducido de cada ruta sin reses, y solo de esas
+    sin_reses = {
+        (tipo, z, p, t)
+        for nombre, tipo in (('res_int', 'Integrada'), ('res_comp', 'Comprada'))
+        for (z, p, t), v in contexto['variables'][nombre].items() if not v.varValue
+    }
+    assert sin_reses
+    assert {(r['Tipo'], r['Zona'], r['Planta'], r['Semana']) for r in sensibilidad['Rutas']} == sin_reses
+    assert all(r['Valor neto por res'] == pytest.approx(r['Costo reducido'] - r['Flete por res'])
+               for r in sensibilidad['Rutas'])
@@ -0,0 +1,48 @@
+import json
+import time
+
+import servicio
+from refuerzos import generar_instancia
+
+
+def _paquete(inputs, perfil, tiempo_limite=None):
+    return {
+        'hojas': {hoja: json.loads(df.to_json(orient='records')) for hoja, df in inputs.items()},
+        'plan_anterior': None, 'semanas_fijas': [], 'valor_kg': 22000.0, 'perfil': perfil,
+        'tiempo_limite': tiempo_limite, 'grupos_zonas': None, 'portafolio': False, 'sensibilidad': False,
+        'arranque_heuristico': None,
+    }
+
+
+def _esperar(servicio_solucion, id_trabajo, segundos=120):
+    limite = time.monotonic() + segundos
+    while time.monotonic() < limite:
+        vista = servicio_solucion.estado(id_trabajo)
+        if vista['estado'] not in ('en_cola', 'ejecutando'):
+            return vista
+        time.sleep(0.2)
+    raise AssertionError(f"El trabajo {id_trabajo} no terminó en {segundos} s")
+
+
+def test_trabajo_sin_tiempo_limite_se_detiene_en_el_tiempo_maximo():
+    servicio_solucion = servicio.ServicioSolucion(trabajadores=1, tiempo_maximo=1)
+    assert servicio_solucion.salud()['tiempo_maximo'] == 1
+    inputs = generar_instancia(60, semilla=0)
+    inicio = time.monotonic()
+    vista = servicio_solucion.enviar(_paquete(inputs, 'exacto'), 'exacto')
+    vista = _esperar(servicio_solucion, vista['id'])
+    assert vista['estado'] == 'tiempo_agotado'
+    assert 'tiempo máximo del servicio (1 s)' in vista['error']
+    assert time.monotonic() - inicio < 1 + servicio.MARGEN_TIEMPO
+    # Los trabajos detenidos no quedan en caché
+    vista = servicio_solucion.enviar(_paquete(inputs, 'exacto'), 'exacto')
+    assert vista['cacheado'] is False
+    assert _esperar(servicio_solucion, vista['id'])['estado'] == 'tiempo_agotado'
+
+
+def test_trabajo_dentro_del_tiempo_maximo_termina():
+    servicio_solucion = servicio.ServicioSolucion(trabajadores=1, tiempo_maximo=120)
+    vista = servicio_solucion.enviar(_paquete(generar_instancia(3, n_plantas=2, n_semanas=2), 'exacto'), 'corto')
+    vista = _esperar(servicio_solucion, vista['id'])
+    assert vista['estado'] == 'terminado'
+    assert servicio_solucion.resultado(vista['id'])['solucion'] == 'Optimal Solution Found'